@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+Single batch entry point for every generated asset
+
+ASSET_SPEC declares which generator step owns which group of assets. The
+pipeline imports every generator into one process, so decoded sources and
+resize pyramids are shared, then plans the run from the outputs and sources
+each step declares through @incremental. Every output must have exactly one
+owner, and a step that reads another step's output always runs after it, so
+results no longer depend on which scripts were run in which order.
+
+--watch keeps the process running after the first pass and re-renders only
+the asset groups a change affects: a step is affected when one of its
+declared sources changes, when its generator script or a helper module it
+uses changes, or when it reads the output of an affected step. Bursts of
+edits are debounced into one rebuild. A changed script is syntax-checked
+and the watcher re-executes itself to load it, like the render daemon does.
+
+Usage:
+    python scripts/asset_pipeline.py             # render everything
+    python scripts/asset_pipeline.py --list      # show the plan
+    python scripts/asset_pipeline.py --only store-screenshots docs-tech-stack
+    python scripts/asset_pipeline.py --release   # smallest PNGs, for CI and release builds
+    python scripts/asset_pipeline.py --trace trace.json   # per-stage timing
+    python scripts/asset_pipeline.py --watch     # re-render on every edit
+"""
+
+# Hand the run to the warm render daemon if one is running (see render_daemon.py)
+from render_client import delegate_to_daemon
+delegate_to_daemon(__name__, __file__)
+
+import argparse
+import importlib
+import os
+import sys
+import time
+import traceback
+
+from file_watch import DEFAULT_DEBOUNCE, next_batch, watch_files
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+
+# Every target asset group and the generator step that renders it. The node
+# design in create_linknode_app_icon and the placeholder "L" in
+# fix_launcher_icons are alternative launcher icons that would overwrite these,
+# so they stay standalone scripts.
+ASSET_SPEC = [
+    # Launcher icons and Play Store icon, straight from linknode_logo.jpg
+    {"name": "launcher-adaptive", "step": "create_exact_linknode_icon:create_adaptive_icon_direct"},
+    {"name": "launcher-legacy", "step": "create_exact_linknode_icon:create_legacy_icons_direct"},
+    {"name": "play-store-icon", "step": "create_exact_linknode_icon:create_play_store_icon_direct"},
+
+    # Fastlane listing graphics
+    {"name": "fastlane-feature-graphic", "step": "create_play_store_graphics:create_feature_graphic"},
+    {"name": "fastlane-screenshots", "step": "create_play_store_graphics:create_screenshots"},
+
+    # store_graphics/ upload set
+    {"name": "store-app-icon", "step": "create_store_graphics:create_app_icon"},
+    {"name": "store-feature-graphic", "step": "create_store_graphics:create_feature_graphic"},
+    {"name": "store-screenshots", "step": "create_store_graphics:create_screenshots"},
+
+    # Documentation diagrams
+    {"name": "docs-workflow-diagram", "step": "create_workflow_diagram:create_workflow_diagram"},
+    {"name": "docs-tech-stack", "step": "create_workflow_diagram:create_tech_stack_infographic"},
+]
+
+
+class PipelineError(Exception):
+    """The asset spec is inconsistent"""
+
+
+def _relpath(path):
+    return os.path.relpath(os.path.abspath(path), project_root)
+
+
+def load_step(spec):
+    """Import a generator step and return (function, outputs, sources)"""
+    module_name, func_name = spec["step"].split(":")
+    func = getattr(importlib.import_module(module_name), func_name)
+    if not hasattr(func, "outputs"):
+        raise PipelineError(f"{spec['step']} does not declare its outputs with @incremental")
+    return func, [_relpath(p) for p in func.outputs], [_relpath(p) for p in func.sources]
+
+
+def plan(spec=ASSET_SPEC, only=None):
+    """Return the steps to run in dependency order as (spec, func, outputs, sources)"""
+    steps = [(entry,) + load_step(entry) for entry in spec]
+
+    # Every output has exactly one owner
+    owners = {}
+    for entry, _, outputs, _ in steps:
+        for output in outputs:
+            if output in owners:
+                raise PipelineError(f"{output} is written by both {owners[output]} and {entry['name']}")
+            owners[output] = entry["name"]
+
+    # A step that reads another step's output runs after it; otherwise keep spec order
+    by_name = {step[0]["name"]: step for step in steps}
+    ordered = []
+    visiting = set()
+    done = set()
+
+    def visit(step):
+        name = step[0]["name"]
+        if name in done:
+            return
+        if name in visiting:
+            raise PipelineError(f"dependency cycle involving {name}")
+        visiting.add(name)
+        for source in step[3]:
+            if source in owners and owners[source] != name:
+                visit(by_name[owners[source]])
+        visiting.discard(name)
+        done.add(name)
+        ordered.append(step)
+
+    for step in steps:
+        visit(step)
+
+    if only:
+        unknown = set(only) - set(by_name)
+        if unknown:
+            raise PipelineError(f"unknown asset group(s): {', '.join(sorted(unknown))}")
+        ordered = [step for step in ordered if step[0]["name"] in only]
+    return ordered
+
+
+def run(steps):
+    """Render planned asset groups in one process, then prune the output store"""
+    from output_store import prune_unused
+
+    started = time.time()
+    for entry, func, outputs, _ in steps:
+        print(f"▶ {entry['name']} ({len(outputs)} outputs)")
+        func()
+    # Blobs and encodings of outputs that have since changed are never used again
+    removed, freed = prune_unused(before=started)
+    if removed:
+        print(f"🧹 Pruned {removed} unused file(s) from the output store ({freed / 1024:.0f} KB)")
+
+
+def affected_steps(steps, changed):
+    """The planned steps a set of changed files makes stale, in plan order"""
+    from build_manifest import generator_files
+
+    changed = {_relpath(path) for path in changed}
+    stale_outputs = set()
+    affected = []
+    for step in steps:
+        _, func, outputs, sources = step
+        code = {_relpath(path) for path in generator_files(func.__module__)}
+        if changed & (set(sources) | code) or stale_outputs & set(sources):
+            affected.append(step)
+            stale_outputs.update(outputs)
+    return affected
+
+
+def watched_files(steps):
+    """(sources, scripts): every declared source and every generator module the steps use"""
+    from build_manifest import generator_files
+
+    sources = set()
+    scripts = set()
+    for _, func, _, step_sources in steps:
+        sources.update(os.path.join(project_root, source) for source in step_sources)
+        scripts.update(generator_files(func.__module__))
+    return sources, scripts
+
+
+def rebuild(steps):
+    """Run steps after a change; return the outputs they wrote"""
+    from build_manifest import reset_manifest
+
+    # Same per-job refresh as the render daemon: outputs may have changed on disk
+    reset_manifest()
+    started = time.perf_counter()
+    try:
+        run(steps)
+    except Exception:
+        traceback.print_exc()
+        print("❌ Rebuild failed; waiting for the next change")
+    else:
+        print(f"✅ Rebuilt {len(steps)} asset group(s) in {time.perf_counter() - started:.2f}s")
+    return {os.path.join(project_root, output) for _, _, outputs, _ in steps for output in outputs}
+
+
+def _syntax_errors(paths):
+    """Messages for changed scripts that do not compile"""
+    errors = []
+    for path in sorted(paths):
+        try:
+            with open(path) as f:
+                compile(f.read(), path, "exec")
+        except SyntaxError as e:
+            errors.append(f"{_relpath(path)}:{e.lineno}: {e.msg}")
+    return errors
+
+
+def watch(steps, debounce, poll=False, changed=()):
+    """Re-render the steps affected by every change until interrupted
+
+    changed holds the files that made a previous watch process restart; their
+    new code is already loaded here.
+    """
+    sources, scripts = watched_files(steps)
+    watcher = watch_files(sources | scripts, poll=poll)
+    print(f"\n👀 Watching {len(sources)} sources and {len(scripts)} scripts ({watcher.kind}); Ctrl+C to stop")
+
+    pending = {os.path.abspath(path) for path in changed}
+    reloaded = bool(pending)
+    while True:
+        if not pending:
+            pending = next_batch(watcher, debounce)
+            reloaded = False
+
+        changed_scripts = pending & scripts
+        if changed_scripts and not reloaded:
+            errors = _syntax_errors(changed_scripts)
+            if errors:
+                for error in errors:
+                    print(f"❌ {error}")
+                pending = set()
+                continue
+            # Load the new code in a fresh process and rebuild from there
+            print(f"\n🔄 {', '.join(sorted(_relpath(p) for p in changed_scripts))} changed, reloading")
+            watcher.close()
+            argv = sys.argv[1:sys.argv.index("--changed")] if "--changed" in sys.argv else sys.argv[1:]
+            os.execv(sys.executable, [sys.executable, os.path.abspath(__file__)] + argv
+                     + ["--changed"] + sorted(pending))
+
+        affected = affected_steps(steps, pending)
+        names = ", ".join(sorted(_relpath(p) for p in pending))
+        if not affected:
+            pending = set()
+            continue
+        print(f"\n✏️  {names} changed: {', '.join(step[0]['name'] for step in affected)}")
+        written = rebuild(affected)
+
+        # Ignore the events for files this rebuild wrote itself
+        pending = watcher.poll(0) - written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate all Linknode app and store assets")
+    parser.add_argument("--list", action="store_true", help="print the plan without rendering")
+    parser.add_argument("--only", nargs="+", metavar="GROUP", help="render only these asset groups")
+    encoding = parser.add_mutually_exclusive_group()
+    encoding.add_argument("--fast", action="store_true",
+                          help="encode PNGs with low compression effort (the default; see png_encode.py)")
+    encoding.add_argument("--release", action="store_true",
+                          help="encode PNGs as small as possible, for CI and release builds")
+    parser.add_argument("--trace", metavar="FILE",
+                        help="record per-stage timing to a Chrome trace file (see stage_timing.py)")
+    parser.add_argument("--watch", action="store_true",
+                        help="keep running and re-render the groups affected by each change")
+    parser.add_argument("--debounce", type=float, default=DEFAULT_DEBOUNCE, metavar="SECONDS",
+                        help=f"quiet time that ends a burst of edits in watch mode (default: {DEFAULT_DEBOUNCE})")
+    parser.add_argument("--poll", action="store_true", help="watch by polling instead of inotify")
+    parser.add_argument("--changed", nargs="+", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.fast:
+        os.environ["LINKNODE_PNG_MODE"] = "fast"
+    if args.release:
+        os.environ["LINKNODE_PNG_MODE"] = "release"
+    if args.trace:
+        os.environ["LINKNODE_TRACE"] = args.trace
+
+    try:
+        steps = plan(only=args.only)
+    except PipelineError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    if args.list:
+        for entry, _, outputs, sources in steps:
+            print(f"{entry['name']}  ({entry['step']})")
+            for source in sources:
+                print(f"    < {source}")
+            for output in outputs:
+                print(f"    > {output}")
+        return 0
+
+    if args.changed:
+        # Restarted by watch mode after a script changed
+        try:
+            return watch(steps, args.debounce, args.poll, args.changed)
+        except KeyboardInterrupt:
+            print()
+            return 0
+
+    print("🎨 Generating Linknode assets...")
+    run(steps)
+    print("\n✅ All assets generated!")
+
+    if args.watch:
+        try:
+            return watch(steps, args.debounce, args.poll)
+        except KeyboardInterrupt:
+            print()
+            return 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the asset generators
+
+Each benchmark calls one generator entry point in a fresh Python process,
+inside a scratch copy of the project (scripts/ plus linknode_logo.jpg), so
+runs never touch the real assets and do not share caches with each other.
+For every case it records the wall time of the call, the peak RSS of the
+process and the bytes written. A case whose function returns an image or a
+TiledCanvas instead of writing a file (the screenshot templates) has the
+result saved as a PNG inside the timed call, so it is measured the same
+way. Nothing needs network access.
+
+The baseline file stores the measurements from a reference run together with
+thresholds derived from them; a later run fails (exit status 1) when any case
+exceeds its threshold, has no thresholds in the baseline, or when there is no
+baseline file at all.
+
+Usage:
+    python scripts/benchmark_assets.py                    # run and check the baseline
+    python scripts/benchmark_assets.py --update-baseline  # record a new baseline
+    python scripts/benchmark_assets.py --only store-screenshot-4k --repeat 5
+    python scripts/benchmark_assets.py --results out.json # also save this run
+"""
+
+import argparse
+import importlib
+import json
+import os
+import platform
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import PIL
+from PIL import Image
+
+from png_encode import encode_mode, save_png
+from tiled_canvas import TiledCanvas
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+baseline_path = os.path.join(project_root, "benchmarks", "asset_baseline.json")
+
+# Files a generator may read from the project
+SOURCE_FILES = ["linknode_logo.jpg"]
+
+# Screen sizes for the size-parametrized screenshot generators
+SCREEN_SIZES = [
+    ("phone", 1080, 1920),
+    ("tablet-7", 1200, 1920),
+    ("tablet-10", 1600, 2560),
+    ("4k", 2160, 3840),
+]
+
+# Entry points, in the same "module:function" form as asset_pipeline.ASSET_SPEC
+BENCHMARKS = [
+    {"name": "store-feature-graphic", "step": "create_store_graphics:create_feature_graphic"},
+    {"name": "store-screenshots", "step": "create_store_graphics:create_screenshots"},
+    {"name": "store-app-icon", "step": "create_store_graphics:create_app_icon"},
+    {"name": "fastlane-feature-graphic", "step": "create_play_store_graphics:create_feature_graphic"},
+    {"name": "fastlane-screenshots", "step": "create_play_store_graphics:create_screenshots"},
+    {"name": "launcher-adaptive", "step": "create_exact_linknode_icon:create_adaptive_icon_direct"},
+    {"name": "launcher-legacy", "step": "create_exact_linknode_icon:create_legacy_icons_direct"},
+    {"name": "play-store-icon", "step": "create_exact_linknode_icon:create_play_store_icon_direct"},
+    {"name": "node-icon-legacy", "step": "create_linknode_app_icon:create_legacy_icons"},
+    {"name": "docs-workflow-diagram", "step": "create_workflow_diagram:create_workflow_diagram"},
+    {"name": "docs-tech-stack", "step": "create_workflow_diagram:create_tech_stack_infographic"},
+] + [
+    {"name": f"store-screenshot-{size_name}", "step": "create_store_graphics:create_screenshot",
+     "args": [size_name, width, height, 0]}
+    for size_name, width, height in SCREEN_SIZES
+] + [
+    {"name": f"fastlane-dashboard-{size_name}", "step": "create_play_store_graphics:dashboard_template",
+     "args": [width, height]}
+    for size_name, width, height in SCREEN_SIZES
+]
+
+# Allowed slowdown before a case fails: measured * factor + slack
+WALL_FACTOR = 1.5
+WALL_SLACK_S = 0.05
+RSS_FACTOR = 1.25
+RSS_SLACK_KB = 8 * 1024
+BYTES_FACTOR = 1.05
+
+
+class BenchmarkError(Exception):
+    """A benchmark case could not be run"""
+
+
+def _snapshot(root):
+    """Return {path: (size, mtime_ns)} for every file under root"""
+    files = {}
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            path = os.path.join(dirpath, filename)
+            st = os.stat(path)
+            files[path] = (st.st_size, st.st_mtime_ns)
+    return files
+
+
+def run_case(name):
+    """Run one benchmark in this process and return its measurements"""
+    case = next((c for c in BENCHMARKS if c["name"] == name), None)
+    if case is None:
+        raise BenchmarkError(f"unknown benchmark: {name}")
+
+    module_name, func_name = case["step"].split(":")
+    func = getattr(importlib.import_module(module_name), func_name)
+    args = case.get("args", [])
+
+    before = _snapshot(project_root)
+    start = time.perf_counter()
+    result = func(*args)
+    path = os.path.join(project_root, "benchmark-output", f"{name}.png")
+    if isinstance(result, TiledCanvas):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        result.save(path)
+    elif isinstance(result, Image.Image):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        save_png(result, path)
+    wall = time.perf_counter() - start
+    after = _snapshot(project_root)
+
+    # Count generated assets only, not bytecode, the build manifest or the output store
+    store = os.path.join(project_root, ".asset-store")
+    written = {path: size for path, (size, mtime) in after.items()
+               if before.get(path) != (size, mtime) and not path.startswith((script_dir, store))
+               and not os.path.basename(path).startswith(".asset-manifest.json")}
+    return {
+        "wall_s": wall,
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "output_files": len(written),
+        "output_bytes": sum(written.values()),
+    }
+
+
+def make_scratch_project():
+    """Copy the generators and their sources into a temporary project root"""
+    root = tempfile.mkdtemp(prefix="linknode-bench-")
+    shutil.copytree(script_dir, os.path.join(root, "scripts"),
+                    ignore=shutil.ignore_patterns("__pycache__"))
+    for source in SOURCE_FILES:
+        shutil.copy2(os.path.join(project_root, source), os.path.join(root, source))
+    return root
+
+
+def measure(root, name, repeat):
+    """Run a case repeat times in fresh processes; keep the median time and the peak RSS"""
+    env = dict(os.environ, LINKNODE_ASSETS_FORCE="1")
+    env.setdefault("LINKNODE_RENDER_WORKERS", "1")
+    script = os.path.join(root, "scripts", os.path.basename(__file__))
+
+    runs = []
+    for _ in range(repeat):
+        # Start every run cold, without the outputs or encodings of the last one;
+        # identical outputs are not rewritten and would not be counted
+        for entry in os.listdir(root):
+            if entry != "scripts" and entry not in SOURCE_FILES:
+                path = os.path.join(root, entry)
+                if os.path.isdir(path):
+                    shutil.rmtree(path)
+                else:
+                    os.remove(path)
+        proc = subprocess.run([sys.executable, script, "--run-case", name],
+                              capture_output=True, text=True, env=env, cwd=root)
+        if proc.returncode != 0:
+            raise BenchmarkError(f"{name} failed:\n{proc.stderr.strip() or proc.stdout.strip()}")
+        runs.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+
+    return {
+        "wall_s": round(statistics.median(r["wall_s"] for r in runs), 4),
+        "peak_rss_kb": max(r["peak_rss_kb"] for r in runs),
+        "output_files": runs[-1]["output_files"],
+        "output_bytes": runs[-1]["output_bytes"],
+    }
+
+
+def thresholds(result):
+    """Limits a later run of the same case must stay within"""
+    return {
+        "max_wall_s": round(result["wall_s"] * WALL_FACTOR + WALL_SLACK_S, 4),
+        "max_peak_rss_kb": int(result["peak_rss_kb"] * RSS_FACTOR + RSS_SLACK_KB),
+        "max_output_bytes": int(result["output_bytes"] * BYTES_FACTOR),
+    }
+
+
+def check(results, baseline):
+    """Return a list of threshold violations"""
+    failures = []
+    for name, result in results.items():
+        limits = baseline.get("cases", {}).get(name, {}).get("thresholds")
+        if not limits:
+            failures.append(f"{name}: no thresholds in the baseline")
+            continue
+        for metric in ("wall_s", "peak_rss_kb", "output_bytes"):
+            limit = limits[f"max_{metric}"]
+            if result[metric] > limit:
+                failures.append(f"{name}: {metric} {result[metric]} exceeds {limit}")
+    return failures
+
+
+def environment():
+    """Describe the machine and library versions a run was taken on"""
+    return {
+        "python": platform.python_version(),
+        "pillow": PIL.__version__,
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "render_workers": os.environ.get("LINKNODE_RENDER_WORKERS", "1"),
+        "png_mode": encode_mode(),
+        "image_format": os.environ.get("LINKNODE_IMAGE_FORMAT", "png"),
+    }
+
+
+def _write_json(path, data):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Linknode asset generators")
+    parser.add_argument("--only", nargs="+", metavar="NAME", help="run only these benchmarks")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per benchmark (default: 3)")
+    parser.add_argument("--baseline", default=baseline_path, help="baseline file to check or update")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="record this run as the new baseline instead of checking it")
+    parser.add_argument("--results", help="also write this run's measurements to a JSON file")
+    parser.add_argument("--list", action="store_true", help="list the benchmarks")
+    parser.add_argument("--run-case", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.run_case:
+        # Child process: measure one case and report it on the last line of stdout
+        result = run_case(args.run_case)
+        print(json.dumps(result))
+        return 0
+
+    if args.list:
+        for case in BENCHMARKS:
+            print(f"{case['name']}  ({case['step']}{tuple(case.get('args', ()))})")
+        return 0
+
+    names = [case["name"] for case in BENCHMARKS]
+    if args.only:
+        unknown = set(args.only) - set(names)
+        if unknown:
+            print(f"Error: unknown benchmark(s): {', '.join(sorted(unknown))}", file=sys.stderr)
+            return 1
+        names = [name for name in names if name in args.only]
+
+    baseline = None
+    if not args.update_baseline:
+        try:
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        except FileNotFoundError:
+            print(f"Error: no baseline at {args.baseline}; run with --update-baseline to record one",
+                  file=sys.stderr)
+            return 1
+
+    root = make_scratch_project()
+    results = {}
+    try:
+        print(f"{'benchmark':32} {'wall s':>8} {'peak RSS MB':>12} {'bytes':>11}")
+        for name in names:
+            result = measure(root, name, args.repeat)
+            results[name] = result
+            print(f"{name:32} {result['wall_s']:8.3f} {result['peak_rss_kb'] / 1024:12.1f} "
+                  f"{result['output_bytes']:11,}")
+    except BenchmarkError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    run = {"environment": environment(), "cases": results}
+    if args.results:
+        _write_json(args.results, run)
+
+    if args.update_baseline:
+        try:
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        except FileNotFoundError:
+            baseline = {"cases": {}}
+        baseline["environment"] = run["environment"]
+        for name, result in results.items():
+            baseline["cases"][name] = dict(result, thresholds=thresholds(result))
+        _write_json(args.baseline, baseline)
+        print(f"\n✅ Baseline written to {args.baseline}")
+        return 0
+
+    failures = check(results, baseline)
+    if failures:
+        print("\n❌ Benchmark thresholds exceeded:")
+        for failure in failures:
+            print(f"  {failure}")
+        return 1
+    print("\n✅ All benchmarks within thresholds")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,258 @@
+"""
+Content-hash incremental build manifest for generated assets
+
+Every output written by a generator is recorded in .asset-manifest.json at the
+project root together with a hash of its inputs: the source file bytes, the
+render parameters, the PNG encode settings and the generator version (the
+generator script plus the shared helper modules it uses, and the
+Pillow/numpy versions). When a generator step runs again and the input hash still matches, and its outputs
+are still on disk unchanged, the step is skipped.
+
+Set LINKNODE_ASSETS_FORCE=1 to rebuild everything regardless.
+"""
+
+from functools import wraps
+import hashlib
+import json
+import os
+import sys
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+import numpy as np
+import PIL
+from PIL import Image
+
+from output_store import force_rebuild
+from png_encode import encode_settings, written_path
+from stage_timing import stage
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+manifest_path = os.path.join(project_root, ".asset-manifest.json")
+
+MANIFEST_FORMAT = 1
+
+
+def file_digest(path):
+    """Return the SHA-256 of a file, or a marker if it does not exist"""
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except FileNotFoundError:
+        return "missing"
+
+
+_generator_digests = {}
+
+
+def _script_modules(module):
+    """Return the module and every scripts/ module it depends on, transitively"""
+    found = {}
+    pending = [module]
+    while pending:
+        mod = pending.pop()
+        path = getattr(mod, "__file__", None)
+        if not path or os.path.dirname(os.path.abspath(path)) != script_dir:
+            continue
+        if mod.__name__ in found:
+            continue
+        found[mod.__name__] = os.path.abspath(path)
+        for value in vars(mod).values():
+            if isinstance(value, type(sys)):
+                pending.append(value)
+            elif getattr(value, "__module__", None) in sys.modules:
+                pending.append(sys.modules[value.__module__])
+    return found.values()
+
+
+def script_name(module_name):
+    """Importable name of a module, also when it runs as a script (__main__)
+
+    A generator run directly and the same generator imported by the pipeline
+    or the render daemon must produce the same manifest keys.
+    """
+    if module_name != "__main__":
+        return module_name
+    module = sys.modules[module_name]
+    spec = getattr(module, "__spec__", None)
+    if spec is not None and spec.name != "__main__":
+        return spec.name
+    return os.path.splitext(os.path.basename(module.__file__))[0]
+
+
+def generator_files(module_name):
+    """Sorted paths of the generator module and the helper modules in scripts/ it uses"""
+    return sorted(_script_modules(sys.modules[module_name]))
+
+
+def generator_version(module_name):
+    """Hash of the generator module and the helper modules in scripts/ it uses"""
+    digest = _generator_digests.get(script_name(module_name))
+    if digest is None:
+        h = hashlib.sha256()
+        h.update(f"pillow={PIL.__version__};numpy={np.__version__}".encode())
+        for path in generator_files(module_name):
+            h.update(os.path.basename(path).encode())
+            h.update(file_digest(path).encode())
+        digest = h.hexdigest()
+        _generator_digests[script_name(module_name)] = digest
+    return digest
+
+
+def _relpath(path):
+    """Manifest keys are project-relative so runs from any directory agree"""
+    return os.path.relpath(os.path.abspath(path), project_root)
+
+
+class BuildManifest:
+    """Input hashes and output fingerprints for every generated asset"""
+
+    def __init__(self, path=manifest_path):
+        self.path = path
+        self.force = force_rebuild()
+        self.entries = self._read()
+        # Keys recorded by this process; only these are written back
+        self._recorded = set()
+
+    def _read(self):
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+        if data.get("format") != MANIFEST_FORMAT:
+            return {}
+        return data.get("outputs", {})
+
+    def input_key(self, generator, sources=(), params=None):
+        """Hash together source bytes, parameters and generator version"""
+        h = hashlib.sha256()
+        h.update(generator.encode())
+        for source in sources:
+            h.update(_relpath(source).encode())
+            h.update(file_digest(source).encode())
+        h.update(json.dumps(params, sort_keys=True, default=repr).encode())
+        return h.hexdigest()
+
+    def is_fresh(self, outputs, key):
+        """True if every output was built from key and is unchanged on disk"""
+        if self.force:
+            return False
+        for output in outputs:
+            entry = self.entries.get(_relpath(output))
+            if entry is None or entry["inputs"] != key:
+                return False
+            # A declared PNG may have been stored as WebP (see png_encode.save_image)
+            output = written_path(output)
+            try:
+                st = os.stat(output)
+            except FileNotFoundError:
+                return False
+            if st.st_size != entry["size"]:
+                return False
+            # Only rehash when the file was touched since it was recorded
+            if st.st_mtime_ns != entry["mtime_ns"] and file_digest(output) != entry["sha256"]:
+                return False
+        return True
+
+    def record(self, outputs, key):
+        """Record freshly written outputs and persist the manifest"""
+        for output in outputs:
+            path = written_path(output)
+            if not os.path.exists(path):
+                continue
+            st = os.stat(path)
+            self._recorded.add(_relpath(output))
+            self.entries[_relpath(output)] = {
+                "inputs": key,
+                "sha256": file_digest(path),
+                "size": st.st_size,
+                "mtime_ns": st.st_mtime_ns,
+            }
+        self.save()
+
+    def save(self):
+        """Merge into whatever other generators wrote and replace the file atomically
+
+        Only keys recorded here since the last save are merged: the rest of
+        self.entries may be a stale copy (a forked render worker, another
+        running generator) and must not overwrite newer records on disk.
+        """
+        with open(self.path + ".lock", "w") as lock:
+            if fcntl:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            merged = self._read()
+            merged.update({key: self.entries[key] for key in self._recorded})
+            self.entries = merged
+
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({"format": MANIFEST_FORMAT, "outputs": merged}, f, indent=1, sort_keys=True)
+            os.replace(tmp_path, self.path)
+            self._recorded = set()
+
+
+_manifest = None
+
+
+def get_manifest():
+    """Return the manifest shared by every generator in this process"""
+    global _manifest
+    if _manifest is None:
+        _manifest = BuildManifest()
+    return _manifest
+
+
+def reset_manifest():
+    """Reread the manifest on next use, e.g. between jobs in a long-running process"""
+    global _manifest
+    _manifest = None
+
+
+def reload_output(outputs):
+    """on_skip helper for steps that return their (single) rendered RGBA image"""
+    # The encoder may have stored it as RGB, gray or palette
+    with Image.open(written_path(outputs[0])) as img:
+        return img.convert("RGBA")
+
+
+def incremental(outputs, sources=(), params=None, on_skip=None):
+    """Skip a generator step when its outputs were already built from the same inputs
+
+    outputs and sources are file paths; params is any JSON-serializable value
+    that affects rendering beyond the generator code itself. The step's call
+    arguments are folded into the parameters automatically. When the step is
+    skipped it returns on_skip(outputs) if given, otherwise None.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            step = f"{script_name(func.__module__)}:{func.__qualname__}"
+            with stage("step", target=step):
+                manifest = get_manifest()
+                with stage("manifest"):
+                    key = manifest.input_key(
+                        generator_version(func.__module__),
+                        sources,
+                        {"step": step, "params": params, "args": args, "kwargs": kwargs,
+                         "encode": encode_settings(outputs)},
+                    )
+                    fresh = manifest.is_fresh(outputs, key)
+                if fresh:
+                    print(f"⏭  {func.__name__}: up to date")
+                    return on_skip(outputs) if on_skip else None
+
+                result = func(*args, **kwargs)
+                with stage("manifest"):
+                    manifest.record(outputs, key)
+                return result
+
+        # Let the asset pipeline plan steps without running them
+        wrapper.outputs = list(outputs)
+        wrapper.sources = list(sources)
+        return wrapper
+    return decorator
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Check the ImageMagick branch of create_exact_linknode_icon.py
+
+ImageMagick is optional, so the branch that uses it is easy to break without
+noticing. This runs the generator in a scratch copy of the project with a stub
+"magick" first on PATH. The stub writes an opaque 8-bit RGB PNG of the
+requested size to every -write target, as a real ImageMagick run does for
+the white-padded icons. The check then requires that each icon exists and
+that the Play Store icon.png is still a 32-bit RGBA PNG afterwards.
+
+Usage:
+    python scripts/check_imagemagick_icons.py
+"""
+
+import os
+import shutil
+import stat
+import subprocess
+import sys
+import tempfile
+
+from validate_assets import HeaderError, read_header
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+
+SOURCE_FILES = ["linknode_logo.jpg"]
+
+PLAY_ICON = os.path.join("fastlane", "metadata", "android", "en-US", "images", "icon.png")
+DENSITIES = ["mdpi", "hdpi", "xhdpi", "xxhdpi", "xxxhdpi"]
+
+STUB_MAGICK = '''#!{python}
+import sys
+from PIL import Image
+
+args = sys.argv[1:]
+if "-version" in args:
+    print("Version: ImageMagick 7 (stub)")
+    sys.exit(0)
+size = (1, 1)
+for flag, value in zip(args, args[1:]):
+    if flag == "-extent":
+        size = tuple(int(n) for n in value.split("x"))
+    elif flag == "-write" and not value.startswith("mpr:"):
+        Image.new("RGB", size, (255, 255, 255)).save(value)
+'''
+
+
+def make_scratch_project():
+    """Copy the generators and their sources into a temporary project root, with a stub magick"""
+    root = tempfile.mkdtemp(prefix="linknode-magick-check-")
+    shutil.copytree(script_dir, os.path.join(root, "scripts"),
+                    ignore=shutil.ignore_patterns("__pycache__"))
+    for source in SOURCE_FILES:
+        shutil.copy2(os.path.join(project_root, source), os.path.join(root, source))
+
+    bin_dir = os.path.join(root, "bin")
+    os.makedirs(bin_dir)
+    magick = os.path.join(bin_dir, "magick")
+    with open(magick, "w") as f:
+        f.write(STUB_MAGICK.format(python=sys.executable))
+    os.chmod(magick, os.stat(magick).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    return root
+
+
+def check(root):
+    """Run the generator in root; return a list of problems"""
+    env = dict(os.environ, LINKNODE_ASSETS_FORCE="1", LINKNODE_NO_DAEMON="1")
+    env["PATH"] = os.pathsep.join([os.path.join(root, "bin"), env.get("PATH", "")])
+    proc = subprocess.run([sys.executable, os.path.join("scripts", "create_exact_linknode_icon.py")],
+                          capture_output=True, text=True, env=env, cwd=root)
+    if proc.returncode != 0:
+        return [f"generator failed:\n{proc.stderr.strip() or proc.stdout.strip()}"]
+    if "All icons created with ImageMagick" not in proc.stdout:
+        return [f"generator did not use the ImageMagick branch:\n{proc.stdout.strip()}"]
+
+    problems = []
+    res_dir = os.path.join(root, "android", "app", "src", "main", "res")
+    expected = [os.path.join(root, PLAY_ICON)] + [
+        os.path.join(res_dir, f"mipmap-{density}", name)
+        for density in DENSITIES for name in ("ic_launcher.png", "ic_launcher_round.png")
+    ]
+    for path in expected:
+        if not os.path.exists(path):
+            problems.append(f"missing {os.path.relpath(path, root)}")
+
+    try:
+        fmt, width, height, _, details = read_header(os.path.join(root, PLAY_ICON))
+    except (OSError, HeaderError) as e:
+        return problems + [f"{PLAY_ICON}: {e}"]
+    if (fmt, width, height) != ("png", 512, 512):
+        problems.append(f"{PLAY_ICON} must be a 512x512 PNG, not {width}x{height} {fmt.upper()}")
+    elif (details["bit_depth"], details["color_type"]) != (8, "RGBA"):
+        problems.append(f"{PLAY_ICON} must be a 32-bit RGBA PNG, "
+                        f"not {details['bit_depth']}-bit {details['color_type']}")
+    return problems
+
+
+def main():
+    root = make_scratch_project()
+    try:
+        problems = check(root)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    if problems:
+        print("❌ ImageMagick icon check failed:")
+        for problem in problems:
+            print(f"  {problem}")
+        return 1
+    print("✅ ImageMagick branch wrote every icon; icon.png is a 32-bit RGBA PNG")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,21 @@
 #!/usr/bin/env python3
 
+# Hand the run to the warm render daemon if one is running (see render_daemon.py)
+from render_client import delegate_to_daemon
+delegate_to_daemon(__name__, __file__)
+
 import os
+import shutil
 import subprocess
-from PIL import Image, ImageDraw
+import tempfile
+from PIL import Image
+
+from build_manifest import incremental
+from output_store import link_file
+from png_encode import optimize_files, save_image, save_png
+from render_pool import run_tasks, task
+from resize_pyramid import source_pyramid
+from shapes import circle_mask
 
 # Paths
 script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -28,136 +41,144 @@ foreground_sizes = {
     "xxxhdpi": 432
 }
 
+play_store_icon_path = os.path.join(project_root, "fastlane", "metadata", "android", "en-US", "images", "icon.png")
+
+adaptive_outputs = [
+    os.path.join(android_res_dir, f"mipmap-{density}", name)
+    for density in foreground_sizes
+    for name in ("ic_launcher_background.png", "ic_launcher_foreground.png")
+]
+
+legacy_outputs = [
+    os.path.join(android_res_dir, f"mipmap-{density}", name)
+    for density in icon_sizes
+    for name in ("ic_launcher.png", "ic_launcher_round.png")
+]
+
+def create_adaptive_background(density, size):
+    """Create the white background layer for one density"""
+    background = Image.new("RGBA", (size, size), (255, 255, 255, 255))
+    
+    # Save background
+    bg_dir = os.path.join(android_res_dir, f"mipmap-{density}")
+    os.makedirs(bg_dir, exist_ok=True)
+    save_image(background, os.path.join(bg_dir, "ic_launcher_background.png"))
+
+def create_adaptive_foreground(density, size):
+    """Create the logo foreground layer for one density"""
+    logo_pyramid = source_pyramid(original_logo_path)
+    orig_width, orig_height = logo_pyramid.source.size
+    
+    # Create transparent foreground
+    foreground = Image.new("RGBA", (size, size), (0, 0, 0, 0))
+    
+    # Calculate safe zone (72dp of 108dp total)
+    # This gives us more room than the strict 66dp safe zone
+    safe_zone_ratio = 72 / 108
+    safe_size = int(size * safe_zone_ratio)
+    
+    # Calculate scaling to fit the logo in safe zone
+    scale_x = safe_size / orig_width
+    scale_y = safe_size / orig_height
+    scale = min(scale_x, scale_y)  # Use smaller scale to fit both dimensions
+    
+    new_width = int(orig_width * scale)
+    new_height = int(orig_height * scale)
+    
+    # Resize using high-quality Lanczos resampling
+    resized_logo = logo_pyramid.resize((new_width, new_height))
+    
+    # Center the logo in the foreground
+    x = (size - new_width) // 2
+    y = (size - new_height) // 2
+    
+    # Paste the logo onto the foreground
+    foreground.paste(resized_logo, (x, y), resized_logo)
+    
+    # Save foreground
+    fg_dir = os.path.join(android_res_dir, f"mipmap-{density}")
+    os.makedirs(fg_dir, exist_ok=True)
+    save_image(foreground, os.path.join(fg_dir, "ic_launcher_foreground.png"))
+
+@incremental(adaptive_outputs, sources=[original_logo_path])
 def create_adaptive_icon_direct():
     """Create adaptive icon layers using the original logo directly"""
     
-    # Load the original logo without any interpretation
-    original = Image.open(original_logo_path)
+    # Load the original logo without any interpretation (decoded once, as RGBA)
+    original = source_pyramid(original_logo_path).source
     
     # Get original dimensions
     orig_width, orig_height = original.size
     print(f"Original logo dimensions: {orig_width}x{orig_height}")
     
-    # Convert to RGBA for transparency support
-    if original.mode != 'RGBA':
-        # Create a new RGBA image with white background
-        rgba_original = Image.new('RGBA', original.size, (255, 255, 255, 255))
-        # Paste the original image
-        rgba_original.paste(original, (0, 0))
-        original = rgba_original
-    
-    # Create background layer (white)
-    for density, size in foreground_sizes.items():
-        background = Image.new("RGBA", (size, size), (255, 255, 255, 255))
-        
-        # Save background
-        bg_dir = os.path.join(android_res_dir, f"mipmap-{density}")
-        os.makedirs(bg_dir, exist_ok=True)
-        background.save(os.path.join(bg_dir, "ic_launcher_background.png"))
-    
-    # Create foreground layer - directly use the original logo
-    for density, size in foreground_sizes.items():
-        # Create transparent foreground
-        foreground = Image.new("RGBA", (size, size), (0, 0, 0, 0))
-        
-        # Calculate safe zone (72dp of 108dp total)
-        # This gives us more room than the strict 66dp safe zone
-        safe_zone_ratio = 72 / 108
-        safe_size = int(size * safe_zone_ratio)
-        
-        # Calculate scaling to fit the logo in safe zone
-        scale_x = safe_size / orig_width
-        scale_y = safe_size / orig_height
-        scale = min(scale_x, scale_y)  # Use smaller scale to fit both dimensions
-        
-        new_width = int(orig_width * scale)
-        new_height = int(orig_height * scale)
-        
-        # Resize using high-quality Lanczos resampling
-        resized_logo = original.resize((new_width, new_height), Image.Resampling.LANCZOS)
-        
-        # Center the logo in the foreground
-        x = (size - new_width) // 2
-        y = (size - new_height) // 2
-        
-        # Paste the logo onto the foreground
-        foreground.paste(resized_logo, (x, y), resized_logo)
-        
-        # Save foreground
-        fg_dir = os.path.join(android_res_dir, f"mipmap-{density}")
-        foreground.save(os.path.join(fg_dir, "ic_launcher_foreground.png"))
+    # Background layer (white) and foreground layer (original logo) for every density
+    run_tasks(
+        [task(create_adaptive_background, density, size) for density, size in foreground_sizes.items()]
+        + [task(create_adaptive_foreground, density, size) for density, size in foreground_sizes.items()]
+    )
 
-def create_legacy_icons_direct():
-    """Create legacy icons using the original logo directly"""
+def create_legacy_icons_for_density(density, size):
+    """Create square and round legacy icons for one density"""
+    logo_pyramid = source_pyramid(original_logo_path)
+    orig_width, orig_height = logo_pyramid.source.size
     
-    original = Image.open(original_logo_path)
+    # Create white background
+    icon_bg = Image.new("RGBA", (size, size), (255, 255, 255, 255))
     
-    # Convert to RGBA
-    if original.mode != 'RGBA':
-        rgba_original = Image.new('RGBA', original.size, (255, 255, 255, 255))
-        rgba_original.paste(original, (0, 0))
-        original = rgba_original
+    # Calculate scaling (85% of icon size for some padding)
+    max_logo_size = int(size * 0.85)
     
-    orig_width, orig_height = original.size
+    scale_x = max_logo_size / orig_width
+    scale_y = max_logo_size / orig_height
+    scale = min(scale_x, scale_y)
     
-    for density, size in icon_sizes.items():
-        # Create white background
-        icon_bg = Image.new("RGBA", (size, size), (255, 255, 255, 255))
-        
-        # Calculate scaling (85% of icon size for some padding)
-        max_logo_size = int(size * 0.85)
-        
-        scale_x = max_logo_size / orig_width
-        scale_y = max_logo_size / orig_height
-        scale = min(scale_x, scale_y)
-        
-        new_width = int(orig_width * scale)
-        new_height = int(orig_height * scale)
-        
-        # Resize the logo
-        resized_logo = original.resize((new_width, new_height), Image.Resampling.LANCZOS)
-        
-        # Center the logo
-        x = (size - new_width) // 2
-        y = (size - new_height) // 2
-        
-        # Create square icon
-        square_icon = icon_bg.copy()
-        square_icon.paste(resized_logo, (x, y), resized_logo)
-        
-        # Create round icon
-        round_icon_bg = Image.new("RGBA", (size, size), (0, 0, 0, 0))
-        
-        # Create circular mask
-        mask = Image.new("L", (size, size), 0)
-        draw = ImageDraw.Draw(mask)
-        draw.ellipse((0, 0, size, size), fill=255)
-        
-        # Apply white background circle
-        round_base = Image.new("RGBA", (size, size), (255, 255, 255, 255))
-        round_base.putalpha(mask)
-        
-        # Composite the logo on top
-        round_icon_bg.paste(round_base, (0, 0), round_base)
-        round_icon_bg.paste(resized_logo, (x, y), resized_logo)
-        
-        # Save icons
-        icon_dir = os.path.join(android_res_dir, f"mipmap-{density}")
-        os.makedirs(icon_dir, exist_ok=True)
-        
-        square_icon.save(os.path.join(icon_dir, "ic_launcher.png"))
-        round_icon_bg.save(os.path.join(icon_dir, "ic_launcher_round.png"))
+    new_width = int(orig_width * scale)
+    new_height = int(orig_height * scale)
+    
+    # Resize the logo
+    resized_logo = logo_pyramid.resize((new_width, new_height))
+    
+    # Center the logo
+    x = (size - new_width) // 2
+    y = (size - new_height) // 2
+    
+    # Create square icon
+    square_icon = icon_bg.copy()
+    square_icon.paste(resized_logo, (x, y), resized_logo)
+    
+    # Create round icon
+    round_icon_bg = Image.new("RGBA", (size, size), (0, 0, 0, 0))
+    
+    # Create circular mask
+    mask = circle_mask(size)
+    
+    # Apply white background circle
+    round_base = Image.new("RGBA", (size, size), (255, 255, 255, 255))
+    round_base.putalpha(mask)
+    
+    # Composite the logo on top
+    round_icon_bg.paste(round_base, (0, 0), round_base)
+    round_icon_bg.paste(resized_logo, (x, y), resized_logo)
+    
+    # Save icons
+    icon_dir = os.path.join(android_res_dir, f"mipmap-{density}")
+    os.makedirs(icon_dir, exist_ok=True)
+    
+    save_image(square_icon, os.path.join(icon_dir, "ic_launcher.png"))
+    save_image(round_icon_bg, os.path.join(icon_dir, "ic_launcher_round.png"))
 
+@incremental(legacy_outputs, sources=[original_logo_path])
+def create_legacy_icons_direct():
+    """Create legacy icons using the original logo directly"""
+    
+    run_tasks(task(create_legacy_icons_for_density, density, size) for density, size in icon_sizes.items())
+
+@incremental([play_store_icon_path], sources=[original_logo_path])
 def create_play_store_icon_direct():
     """Create Play Store icon using the original logo directly"""
     
-    original = Image.open(original_logo_path)
-    
-    # Convert to RGBA
-    if original.mode != 'RGBA':
-        rgba_original = Image.new('RGBA', original.size, (255, 255, 255, 255))
-        rgba_original.paste(original, (0, 0))
-        original = rgba_original
+    logo_pyramid = source_pyramid(original_logo_path)
+    original = logo_pyramid.source
     
     orig_width, orig_height = original.size
     
@@ -175,7 +196,7 @@ def create_play_store_icon_direct():
     new_height = int(orig_height * scale)
     
     # Resize the logo
-    resized_logo = original.resize((new_width, new_height), Image.Resampling.LANCZOS)
+    resized_logo = logo_pyramid.resize((new_width, new_height))
     
     # Center the logo
     x = (512 - new_width) // 2
@@ -184,68 +205,32 @@ def create_play_store_icon_direct():
     play_store_icon.paste(resized_logo, (x, y), resized_logo)
     
     # Save Play Store icon
-    fastlane_dir = os.path.join(project_root, "fastlane", "metadata", "android", "en-US", "images")
-    os.makedirs(fastlane_dir, exist_ok=True)
-    play_store_icon.save(os.path.join(fastlane_dir, "icon.png"))
+    os.makedirs(os.path.dirname(play_store_icon_path), exist_ok=True)
+    save_png(play_store_icon, play_store_icon_path, rgba=True)
     
     print("✓ Created Play Store icon (512x512)")
 
 def verify_imagemagick():
-    """Check if ImageMagick is available for direct conversion"""
-    try:
-        result = subprocess.run(['convert', '--version'], capture_output=True, text=True)
-        if result.returncode == 0:
-            print("ImageMagick is available")
-            return True
-    except:
-        pass
-    return False
+    """Return the ImageMagick command if it is installed, else None"""
+    # IM7 ships "magick"; IM6 only has "convert"
+    command = shutil.which("magick") or shutil.which("convert")
+    if command:
+        print(f"ImageMagick is available ({os.path.basename(command)})")
+    return command
 
-def create_icons_with_imagemagick():
-    """Alternative method using ImageMagick for exact reproduction"""
-    if not verify_imagemagick():
-        print("ImageMagick not found, using PIL method")
-        return False
-    
-    print("Using ImageMagick for exact logo reproduction...")
-    
-    # Create Play Store icon with ImageMagick
-    cmd = [
-        'convert', original_logo_path,
-        '-resize', '435x435',  # 85% of 512
+def imagemagick_icon_args(size, logo_size, output_path, round_path=None):
+    """Arguments for one white-padded icon (and optionally its round variant) from mpr:logo"""
+    args = [
+        '(', 'mpr:logo',
+        '-resize', f'{logo_size}x{logo_size}',
         '-gravity', 'center',
         '-background', 'white',
-        '-extent', '512x512',
-        os.path.join(project_root, "fastlane", "metadata", "android", "en-US", "images", "icon.png")
+        '-compose', 'Over',
+        '-extent', f'{size}x{size}',
+        '-write', output_path,
     ]
-    subprocess.run(cmd)
-    
-    # Create app icons
-    for density, size in icon_sizes.items():
-        icon_dir = os.path.join(android_res_dir, f"mipmap-{density}")
-        os.makedirs(icon_dir, exist_ok=True)
-        
-        # Calculate logo size
-        logo_size = int(size * 0.85)
-        
-        # Square icon
-        cmd = [
-            'convert', original_logo_path,
-            '-resize', f'{logo_size}x{logo_size}',
-            '-gravity', 'center',
-            '-background', 'white',
-            '-extent', f'{size}x{size}',
-            os.path.join(icon_dir, "ic_launcher.png")
-        ]
-        subprocess.run(cmd)
-        
-        # Round icon
-        cmd = [
-            'convert', original_logo_path,
-            '-resize', f'{logo_size}x{logo_size}',
-            '-gravity', 'center',
-            '-background', 'white',
-            '-extent', f'{size}x{size}',
+    if round_path:
+        args += [
             '(',
                 '+clone',
                 '-alpha', 'extract',
@@ -255,10 +240,73 @@ def create_icons_with_imagemagick():
             '-alpha', 'off',
             '-compose', 'CopyOpacity',
             '-composite',
-            os.path.join(icon_dir, "ic_launcher_round.png")
+            '-write', round_path,
         ]
-        subprocess.run(cmd)
+    return args + ['+delete', ')']
+
+def create_icons_with_imagemagick():
+    """Alternative method using ImageMagick for exact reproduction"""
+    command = verify_imagemagick()
+    if not command:
+        print("ImageMagick not found, using PIL method")
+        return False
+    
+    print("Using ImageMagick for exact logo reproduction...")
+    
+    # ImageMagick writes into a scratch directory; the results are then moved
+    # into place through the output store like every other generated file
+    with tempfile.TemporaryDirectory(prefix="linknode-magick-") as scratch:
+        targets = {}
+        
+        def scratch_path(path):
+            tmp_path = os.path.join(scratch, f"{len(targets)}.png")
+            targets[tmp_path] = path
+            return tmp_path
+        
+        # Decode the logo once into a memory register and render every target from it
+        cmd = [
+            command, '-respect-parentheses',
+            original_logo_path, '-strip', '-write', 'mpr:logo', '+delete',
+        ]
+        
+        # Play Store icon, logo at 85% of 512
+        cmd += imagemagick_icon_args(512, 435, scratch_path(play_store_icon_path))
+        
+        # App icons
+        for density, size in icon_sizes.items():
+            icon_dir = os.path.join(android_res_dir, f"mipmap-{density}")
+            
+            # Calculate logo size
+            logo_size = int(size * 0.85)
+            
+            square_path = os.path.join(icon_dir, "ic_launcher.png")
+            round_path = os.path.join(icon_dir, "ic_launcher_round.png")
+            cmd += imagemagick_icon_args(size, logo_size, scratch_path(square_path), scratch_path(round_path))
+        
+        cmd.append('null:')
+        
+        try:
+            subprocess.run(cmd, check=True, capture_output=True, text=True)
+        except OSError as e:
+            print(f"Could not run ImageMagick, using PIL method: {e}")
+            return False
+        except subprocess.CalledProcessError as e:
+            detail = e.stderr.strip() or f"exit status {e.returncode}"
+            print(f"ImageMagick failed, using PIL method:\n{detail}")
+            return False
+        
+        missing = [path for tmp_path, path in targets.items() if not os.path.exists(tmp_path)]
+        if missing:
+            print(f"ImageMagick did not write {', '.join(missing)}, using PIL method")
+            return False
+        
+        for tmp_path, path in targets.items():
+            link_file(tmp_path, path)
+        outputs = list(targets.values())
     
+    # Same encoder settings as the PIL path; the Play Store icon stays 32-bit RGBA
+    optimize_files([path for path in outputs if path != play_store_icon_path])
+    optimize_files([play_store_icon_path], rgba=True)
     return True
 
 def main():
@@ -3,14 +3,37 @@
 Create proper Linknode app icon based on the official logo
 """
 
-from PIL import Image, ImageDraw, ImageFilter
+# Hand the run to the warm render daemon if one is running (see render_daemon.py)
+from render_client import delegate_to_daemon
+delegate_to_daemon(__name__, __file__)
+
+from PIL import Image
 import os
 import math
 
+from build_manifest import incremental
+from layer_graph import layer
+from output_store import write_text
+from png_encode import save_image, save_png
+from render_pool import run_tasks, task
+from shapes import circle_mask
+from vector_scene import Circle, Line, LinearGradient, RadialGradient, Rect, Scene
+
+# Paths
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+res_dir = os.path.join(project_root, "android", "app", "src", "main", "res")
+play_store_icon_path = os.path.join(project_root, "fastlane", "metadata", "android", "en-US", "images", "icon.png")
+app_icon_svg_path = os.path.join(project_root, "store_graphics", "linknode_app_icon.svg")
+
 # Create output directories
-res_dir = "android/app/src/main/res"
 os.makedirs(f"{res_dir}/drawable", exist_ok=True)
 os.makedirs(f"{res_dir}/mipmap-anydpi-v26", exist_ok=True)
+os.makedirs(os.path.dirname(app_icon_svg_path), exist_ok=True)
+
+# Adaptive icon layers are 108dp squares, drawn on a 432-unit viewport (4 per dp)
+ADAPTIVE_ICON_DP = 108
+ICON_VIEWPORT = 432
 
 # Linknode brand colors from logo
 COLORS = {
@@ -23,28 +46,10 @@ COLORS = {
     'connection': (60, 60, 60),         # Connection lines
 }
 
-def create_gradient_circle(size, color1, color2):
-    """Create a circular gradient"""
-    img = Image.new('RGBA', (size, size), (0, 0, 0, 0))
-    draw = ImageDraw.Draw(img)
-    
-    center = size // 2
-    for i in range(size//2, 0, -1):
-        # Interpolate between colors
-        ratio = i / (size // 2)
-        r = int(color1[0] * ratio + color2[0] * (1 - ratio))
-        g = int(color1[1] * ratio + color2[1] * (1 - ratio))
-        b = int(color1[2] * ratio + color2[2] * (1 - ratio))
-        
-        draw.ellipse([center-i, center-i, center+i, center+i], fill=(r, g, b))
-    
-    return img
-
-def create_ic_launcher_foreground():
-    """Create the foreground layer with Linknode logo elements"""
-    size = 432  # 108dp * 4 for high quality
-    img = Image.new('RGBA', (size, size), (0, 0, 0, 0))
-    draw = ImageDraw.Draw(img)
+def foreground_scene():
+    """Describe the foreground layer with Linknode logo elements as vector geometry"""
+    size = ICON_VIEWPORT
+    scene = Scene(size, size)
     
     center_x, center_y = size // 2, size // 2
     
@@ -53,14 +58,8 @@ def create_ic_launcher_foreground():
     
     # Central node (larger, with gradient)
     central_radius = int(size * 0.15 * safe_zone)
-    gradient_circle = create_gradient_circle(
-        central_radius * 2, 
-        COLORS['central_blue'], 
-        COLORS['gradient_end']
-    )
-    img.paste(gradient_circle, 
-              (center_x - central_radius, center_y - central_radius),
-              gradient_circle)
+    scene.add(Circle(center_x, center_y, central_radius,
+                     RadialGradient(COLORS['gradient_end'], COLORS['central_blue'])))
     
     # Orbital nodes
     orbit_radius = int(size * 0.28 * safe_zone)
@@ -71,69 +70,118 @@ def create_ic_launcher_foreground():
         {'angle': 180, 'color': COLORS['green']},   # Left
         {'angle': 60, 'color': COLORS['orange']},   # Bottom right
     ]
-    
-    # Draw connections first (behind nodes)
+    positions = []
     for node in nodes:
         angle_rad = math.radians(node['angle'])
         x = center_x + int(orbit_radius * math.cos(angle_rad))
         y = center_y + int(orbit_radius * math.sin(angle_rad))
-        
-        # Draw connection line
-        draw.line(
-            [center_x, center_y, x, y],
-            fill=COLORS['connection'],
-            width=max(3, int(size * 0.01))
-        )
+        # Pixel centers, so edges land where the old raster drawing put them
+        positions.append((x + 0.5, y + 0.5))
+    
+    # Draw connections first (behind nodes)
+    for x, y in positions:
+        scene.add(Line(center_x + 0.5, center_y + 0.5, x, y,
+                       max(3, int(size * 0.01)), COLORS['connection']))
     
     # Draw orbital nodes
-    for node in nodes:
-        angle_rad = math.radians(node['angle'])
-        x = center_x + int(orbit_radius * math.cos(angle_rad))
-        y = center_y + int(orbit_radius * math.sin(angle_rad))
-        
+    shadow_offset = max(2, int(size * 0.005))
+    for node, (x, y) in zip(nodes, positions):
         # Node shadow
-        shadow_offset = max(2, int(size * 0.005))
-        draw.ellipse(
-            [x - node_radius + shadow_offset, 
-             y - node_radius + shadow_offset,
-             x + node_radius + shadow_offset, 
-             y + node_radius + shadow_offset],
-            fill=(0, 0, 0, 50)
-        )
+        scene.add(Circle(x + shadow_offset, y + shadow_offset, node_radius + 0.5, (0, 0, 0, 50)))
         
         # Node
-        draw.ellipse(
-            [x - node_radius, y - node_radius,
-             x + node_radius, y + node_radius],
-            fill=node['color']
-        )
+        scene.add(Circle(x, y, node_radius + 0.5, node['color']))
+    
+    return scene
+
+def background_scene():
+    """Describe the background layer as vector geometry"""
+    size = ICON_VIEWPORT
     
-    # Save as PNG
-    img.save(f"{res_dir}/drawable/ic_launcher_foreground.png", "PNG")
-    print(f"✅ Created {res_dir}/drawable/ic_launcher_foreground.png")
-    return img
+    # Very subtle gradient from top to bottom
+    gradient = LinearGradient(0, 0, 0, size, (245, 245, 250, 255), (255, 255, 255, 255))
+    return Scene(size, size, [Rect(0, 0, size, size, gradient)])
 
+def write_vector_drawable(scene, path):
+    """Write a scene as a 108dp adaptive icon layer, replacing any PNG of the same name"""
+    write_text(path, scene.vector_drawable(ADAPTIVE_ICON_DP, ADAPTIVE_ICON_DP))
+    
+    # A PNG left over from older runs would be a duplicate resource
+    stale_png = os.path.splitext(path)[0] + ".png"
+    if os.path.exists(stale_png):
+        os.remove(stale_png)
+    print(f"✅ Created {path}")
+
+@incremental([
+    f"{res_dir}/drawable/ic_launcher_foreground.xml",
+    f"{res_dir}/drawable/ic_launcher_background.xml",
+    app_icon_svg_path,
+])
+def create_vector_icons():
+    """Write the adaptive icon layers as VectorDrawables and the whole icon as SVG"""
+    foreground = foreground_scene()
+    background = background_scene()
+    
+    write_vector_drawable(foreground, f"{res_dir}/drawable/ic_launcher_foreground.xml")
+    write_vector_drawable(background, f"{res_dir}/drawable/ic_launcher_background.xml")
+    
+    icon = Scene(ICON_VIEWPORT, ICON_VIEWPORT, background.shapes + foreground.shapes)
+    write_text(app_icon_svg_path, icon.svg())
+    print(f"✅ Created {app_icon_svg_path}")
+
+@layer()
+def create_ic_launcher_foreground():
+    """Rasterize the foreground layer for the PNG icons"""
+    return foreground_scene().render()
+
+@layer()
 def create_ic_launcher_background():
-    """Create the background layer"""
-    size = 432  # 108dp * 4
-    img = Image.new('RGBA', (size, size), COLORS['background'])
+    """Rasterize the background layer for the PNG icons"""
+    return background_scene().render()
+
+@layer(create_ic_launcher_background, create_ic_launcher_foreground)
+def create_flattened_icon(background, foreground, size):
+    """Combine the background and foreground layers at size"""
+    bg_resized = background.resize((size, size), Image.Resampling.LANCZOS)
+    fg_resized = foreground.resize((size, size), Image.Resampling.LANCZOS)
+    
+    icon = bg_resized.copy()
+    icon.paste(fg_resized, (0, 0), fg_resized)
+    return icon
+
+def create_legacy_icons_for_density(density, size):
+    """Create square and round legacy icons for one density from the layers"""
+    # Create directory
+    os.makedirs(f"{res_dir}/mipmap-{density}", exist_ok=True)
+    
+    # Square icon
+    square_icon = create_flattened_icon(size)
+    save_image(square_icon, f"{res_dir}/mipmap-{density}/ic_launcher.png")
+    
+    # Round icon
+    round_icon = square_icon.copy()
     
-    # Add subtle gradient
-    draw = ImageDraw.Draw(img)
-    for y in range(size):
-        # Very subtle gradient from top to bottom
-        brightness = 245 + int(10 * (y / size))
-        draw.line([(0, y), (size, y)], fill=(brightness, brightness, brightness + 5))
+    # Create circular mask
+    mask = circle_mask(size)
     
-    img.save(f"{res_dir}/drawable/ic_launcher_background.png", "PNG")
-    print(f"✅ Created {res_dir}/drawable/ic_launcher_background.png")
-    return img
+    # Apply mask
+    output = Image.new('RGBA', (size, size), (0, 0, 0, 0))
+    output.paste(round_icon, (0, 0))
+    output.putalpha(mask)
+    
+    save_image(output, f"{res_dir}/mipmap-{density}/ic_launcher_round.png")
+    print(f"✅ Created icons for mipmap-{density}")
 
+@incremental([
+    f"{res_dir}/mipmap-{density}/{name}.png"
+    for density in ('mdpi', 'hdpi', 'xhdpi', 'xxhdpi', 'xxxhdpi')
+    for name in ('ic_launcher', 'ic_launcher_round')
+])
 def create_legacy_icons():
     """Create traditional square/round icons for older Android versions"""
-    # Combine foreground and background
-    background = create_ic_launcher_background()
-    foreground = create_ic_launcher_foreground()
+    # Render the shared layers before the pool forks so every worker reuses them
+    create_ic_launcher_background()
+    create_ic_launcher_foreground()
     
     sizes = {
         'mdpi': 48,
@@ -143,35 +191,15 @@ def create_legacy_icons():
         'xxxhdpi': 192
     }
     
-    for density, size in sizes.items():
-        # Create directory
-        os.makedirs(f"{res_dir}/mipmap-{density}", exist_ok=True)
-        
-        # Resize and combine layers
-        bg_resized = background.resize((size, size), Image.Resampling.LANCZOS)
-        fg_resized = foreground.resize((size, size), Image.Resampling.LANCZOS)
-        
-        # Square icon
-        square_icon = bg_resized.copy()
-        square_icon.paste(fg_resized, (0, 0), fg_resized)
-        square_icon.save(f"{res_dir}/mipmap-{density}/ic_launcher.png", "PNG")
-        
-        # Round icon
-        round_icon = square_icon.copy()
-        
-        # Create circular mask
-        mask = Image.new('L', (size, size), 0)
-        draw = ImageDraw.Draw(mask)
-        draw.ellipse((0, 0, size, size), fill=255)
-        
-        # Apply mask
-        output = Image.new('RGBA', (size, size), (0, 0, 0, 0))
-        output.paste(round_icon, (0, 0))
-        output.putalpha(mask)
-        
-        output.save(f"{res_dir}/mipmap-{density}/ic_launcher_round.png", "PNG")
-        print(f"✅ Created icons for mipmap-{density}")
+    run_tasks(
+        task(create_legacy_icons_for_density, density, size)
+        for density, size in sizes.items()
+    )
 
+@incremental([
+    f"{res_dir}/mipmap-anydpi-v26/ic_launcher.xml",
+    f"{res_dir}/mipmap-anydpi-v26/ic_launcher_round.xml",
+])
 def create_adaptive_icon_xml():
     """Create XML files for adaptive icons"""
     # ic_launcher.xml
@@ -181,32 +209,25 @@ def create_adaptive_icon_xml():
     <foreground android:drawable="@drawable/ic_launcher_foreground" />
 </adaptive-icon>"""
     
-    with open(f"{res_dir}/mipmap-anydpi-v26/ic_launcher.xml", "w") as f:
-        f.write(ic_launcher_xml)
+    write_text(f"{res_dir}/mipmap-anydpi-v26/ic_launcher.xml", ic_launcher_xml)
     
-    # ic_launcher_round.xml (same content)
-    with open(f"{res_dir}/mipmap-anydpi-v26/ic_launcher_round.xml", "w") as f:
-        f.write(ic_launcher_xml)
+    # ic_launcher_round.xml (same content, linked to the same stored file)
+    write_text(f"{res_dir}/mipmap-anydpi-v26/ic_launcher_round.xml", ic_launcher_xml)
     
     print(f"✅ Created adaptive icon XML files")
 
+@incremental([
+    play_store_icon_path,
+    f"{res_dir}/drawable/ic_launcher_512.png",
+])
 def create_play_store_icon():
     """Create 512x512 icon for Play Store"""
-    # Combine layers at high resolution
-    background = create_ic_launcher_background()
-    foreground = create_ic_launcher_foreground()
-    
-    # Create 512x512 version
-    play_store_size = 512
-    bg_512 = background.resize((play_store_size, play_store_size), Image.Resampling.LANCZOS)
-    fg_512 = foreground.resize((play_store_size, play_store_size), Image.Resampling.LANCZOS)
-    
-    play_store_icon = bg_512.copy()
-    play_store_icon.paste(fg_512, (0, 0), fg_512)
+    # Combine layers at 512x512
+    play_store_icon = create_flattened_icon(512)
     
-    # Save in multiple locations
-    play_store_icon.save("fastlane/metadata/android/en-US/images/icon.png", "PNG")
-    play_store_icon.save(f"{res_dir}/drawable/ic_launcher_512.png", "PNG")
+    # Save in multiple locations; the second save reuses the first encoding
+    save_png(play_store_icon, play_store_icon_path, rgba=True)
+    save_image(play_store_icon, f"{res_dir}/drawable/ic_launcher_512.png", rgba=True)
     
     print(f"✅ Created Play Store icon (512x512)")
 
@@ -214,8 +235,7 @@ def main():
     print("🎨 Creating Linknode app icons...")
     
     # Create adaptive icon components
-    create_ic_launcher_background()
-    create_ic_launcher_foreground()
+    create_vector_icons()
     
     # Create legacy icons
     create_legacy_icons()
@@ -228,7 +248,7 @@ def main():
     
     print("\n✅ All Linknode icons created successfully!")
     print("\n📱 Icon features:")
-    print("- Adaptive icon support for Android 8.0+")
+    print("- Adaptive icon support for Android 8.0+ (vector layers)")
     print("- Legacy icons for older versions")
     print("- Based on official Linknode logo")
     print("- Follows Material Design guidelines")
@@ -1,8 +1,18 @@
 #!/usr/bin/env python3
 
+# Hand the run to the warm render daemon if one is running (see render_daemon.py)
+from render_client import delegate_to_daemon
+delegate_to_daemon(__name__, __file__)
+
 import os
 import subprocess
-from PIL import Image, ImageDraw
+from PIL import Image
+
+from build_manifest import incremental
+from png_encode import save_image, save_png
+from render_pool import run_tasks, task
+from resize_pyramid import source_pyramid
+from shapes import circle_mask
 
 # Paths
 script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -28,111 +38,138 @@ foreground_sizes = {
     "xxxhdpi": 432
 }
 
+play_store_icon_path = os.path.join(project_root, "fastlane", "metadata", "android", "en-US", "images", "icon.png")
+
+adaptive_outputs = [
+    os.path.join(android_res_dir, f"mipmap-{density}", name)
+    for density in foreground_sizes
+    for name in ("ic_launcher_background.png", "ic_launcher_foreground.png")
+]
+
+legacy_outputs = [
+    os.path.join(android_res_dir, f"mipmap-{density}", name)
+    for density in icon_sizes
+    for name in ("ic_launcher.png", "ic_launcher_round.png")
+]
+
+def create_adaptive_background(density, size):
+    """Create the white background layer for one density"""
+    background = Image.new("RGBA", (size, size), (255, 255, 255, 255))
+    
+    # Save background
+    bg_dir = os.path.join(android_res_dir, f"mipmap-{density}")
+    os.makedirs(bg_dir, exist_ok=True)
+    save_image(background, os.path.join(bg_dir, "ic_launcher_background.png"))
+
+def create_adaptive_foreground(density, size):
+    """Create the official logo foreground layer for one density"""
+    logo_pyramid = source_pyramid(original_logo_path)
+    original = logo_pyramid.source
+    
+    # Create transparent foreground
+    foreground = Image.new("RGBA", (size, size), (0, 0, 0, 0))
+    
+    # Calculate safe zone (66dp at xxxhdpi = 264px)
+    safe_zone_ratio = 66 / 108  # 66dp safe zone in 108dp foreground
+    safe_size = int(size * safe_zone_ratio)
+    
+    # Resize original logo to fit within safe zone
+    # Preserve aspect ratio
+    original_ratio = original.width / original.height
+    if original_ratio > 1:
+        # Wider than tall
+        new_width = safe_size
+        new_height = int(safe_size / original_ratio)
+    else:
+        # Taller than wide
+        new_height = safe_size
+        new_width = int(safe_size * original_ratio)
+    
+    # Use high-quality resampling
+    resized_logo = logo_pyramid.resize((new_width, new_height))
+    
+    # Center the logo in the foreground
+    x = (size - new_width) // 2
+    y = (size - new_height) // 2
+    
+    # Paste the logo onto the foreground
+    foreground.paste(resized_logo, (x, y), resized_logo)
+    
+    # Save foreground
+    fg_dir = os.path.join(android_res_dir, f"mipmap-{density}")
+    os.makedirs(fg_dir, exist_ok=True)
+    save_image(foreground, os.path.join(fg_dir, "ic_launcher_foreground.png"))
+
+@incremental(adaptive_outputs, sources=[original_logo_path])
 def create_adaptive_icon_from_official_logo():
     """Create adaptive icon layers from the official Linknode logo"""
     
-    # Load the original logo
-    original = Image.open(original_logo_path).convert("RGBA")
-    
-    # Create background layer (white)
-    for density, size in foreground_sizes.items():
-        background = Image.new("RGBA", (size, size), (255, 255, 255, 255))
-        
-        # Save background
-        bg_dir = os.path.join(android_res_dir, f"mipmap-{density}")
-        os.makedirs(bg_dir, exist_ok=True)
-        background.save(os.path.join(bg_dir, "ic_launcher_background.png"))
-    
-    # Create foreground layer with the official logo
-    for density, size in foreground_sizes.items():
-        # Create transparent foreground
-        foreground = Image.new("RGBA", (size, size), (0, 0, 0, 0))
-        
-        # Calculate safe zone (66dp at xxxhdpi = 264px)
-        safe_zone_ratio = 66 / 108  # 66dp safe zone in 108dp foreground
-        safe_size = int(size * safe_zone_ratio)
-        
-        # Resize original logo to fit within safe zone
-        # Preserve aspect ratio
-        original_ratio = original.width / original.height
-        if original_ratio > 1:
-            # Wider than tall
-            new_width = safe_size
-            new_height = int(safe_size / original_ratio)
-        else:
-            # Taller than wide
-            new_height = safe_size
-            new_width = int(safe_size * original_ratio)
-        
-        # Use high-quality resampling
-        resized_logo = original.resize((new_width, new_height), Image.Resampling.LANCZOS)
-        
-        # Center the logo in the foreground
-        x = (size - new_width) // 2
-        y = (size - new_height) // 2
-        
-        # Paste the logo onto the foreground
-        foreground.paste(resized_logo, (x, y), resized_logo)
-        
-        # Save foreground
-        fg_dir = os.path.join(android_res_dir, f"mipmap-{density}")
-        foreground.save(os.path.join(fg_dir, "ic_launcher_foreground.png"))
+    # Background layer (white) and foreground layer (official logo) for every density
+    run_tasks(
+        [task(create_adaptive_background, density, size) for density, size in foreground_sizes.items()]
+        + [task(create_adaptive_foreground, density, size) for density, size in foreground_sizes.items()]
+    )
+
+def create_legacy_icons_for_density(density, size):
+    """Create square and round legacy icons for one density"""
+    logo_pyramid = source_pyramid(original_logo_path)
+    original = logo_pyramid.source
+    
+    # Create white background
+    icon_bg = Image.new("RGBA", (size, size), (255, 255, 255, 255))
+    
+    # Calculate logo size (80% of icon size for padding)
+    logo_size = int(size * 0.8)
+    
+    # Resize logo preserving aspect ratio
+    original_ratio = original.width / original.height
+    if original_ratio > 1:
+        new_width = logo_size
+        new_height = int(logo_size / original_ratio)
+    else:
+        new_height = logo_size
+        new_width = int(logo_size * original_ratio)
+    
+    resized_logo = logo_pyramid.resize((new_width, new_height))
+    
+    # Center the logo
+    x = (size - new_width) // 2
+    y = (size - new_height) // 2
+    
+    # Create square icon
+    square_icon = icon_bg.copy()
+    square_icon.paste(resized_logo, (x, y), resized_logo)
+    
+    # Create round icon with mask
+    round_icon = icon_bg.copy()
+    round_icon.paste(resized_logo, (x, y), resized_logo)
+    
+    # Apply circular mask
+    mask = circle_mask(size)
+    
+    output = Image.new("RGBA", (size, size), (0, 0, 0, 0))
+    output.paste(round_icon, (0, 0))
+    output.putalpha(mask)
+    
+    # Save icons
+    icon_dir = os.path.join(android_res_dir, f"mipmap-{density}")
+    os.makedirs(icon_dir, exist_ok=True)
+    
+    save_image(square_icon, os.path.join(icon_dir, "ic_launcher.png"))
+    save_image(output, os.path.join(icon_dir, "ic_launcher_round.png"))
 
+@incremental(legacy_outputs, sources=[original_logo_path])
 def create_legacy_icons_from_official_logo():
     """Create legacy round and square icons from the official logo"""
     
-    original = Image.open(original_logo_path).convert("RGBA")
-    
-    for density, size in icon_sizes.items():
-        # Create white background
-        icon_bg = Image.new("RGBA", (size, size), (255, 255, 255, 255))
-        
-        # Calculate logo size (80% of icon size for padding)
-        logo_size = int(size * 0.8)
-        
-        # Resize logo preserving aspect ratio
-        original_ratio = original.width / original.height
-        if original_ratio > 1:
-            new_width = logo_size
-            new_height = int(logo_size / original_ratio)
-        else:
-            new_height = logo_size
-            new_width = int(logo_size * original_ratio)
-        
-        resized_logo = original.resize((new_width, new_height), Image.Resampling.LANCZOS)
-        
-        # Center the logo
-        x = (size - new_width) // 2
-        y = (size - new_height) // 2
-        
-        # Create square icon
-        square_icon = icon_bg.copy()
-        square_icon.paste(resized_logo, (x, y), resized_logo)
-        
-        # Create round icon with mask
-        round_icon = icon_bg.copy()
-        round_icon.paste(resized_logo, (x, y), resized_logo)
-        
-        # Apply circular mask
-        mask = Image.new("L", (size, size), 0)
-        draw = ImageDraw.Draw(mask)
-        draw.ellipse((0, 0, size, size), fill=255)
-        
-        output = Image.new("RGBA", (size, size), (0, 0, 0, 0))
-        output.paste(round_icon, (0, 0))
-        output.putalpha(mask)
-        
-        # Save icons
-        icon_dir = os.path.join(android_res_dir, f"mipmap-{density}")
-        os.makedirs(icon_dir, exist_ok=True)
-        
-        square_icon.save(os.path.join(icon_dir, "ic_launcher.png"))
-        output.save(os.path.join(icon_dir, "ic_launcher_round.png"))
+    run_tasks(task(create_legacy_icons_for_density, density, size) for density, size in icon_sizes.items())
 
+@incremental([play_store_icon_path], sources=[original_logo_path])
 def create_play_store_icon_from_official_logo():
     """Create 512x512 icon for Play Store from official logo"""
     
-    original = Image.open(original_logo_path).convert("RGBA")
+    logo_pyramid = source_pyramid(original_logo_path)
+    original = logo_pyramid.source
     
     # Create white background
     play_store_icon = Image.new("RGBA", (512, 512), (255, 255, 255, 255))
@@ -149,7 +186,7 @@ def create_play_store_icon_from_official_logo():
         new_height = logo_size
         new_width = int(logo_size * original_ratio)
     
-    resized_logo = original.resize((new_width, new_height), Image.Resampling.LANCZOS)
+    resized_logo = logo_pyramid.resize((new_width, new_height))
     
     # Center the logo
     x = (512 - new_width) // 2
@@ -158,9 +195,8 @@ def create_play_store_icon_from_official_logo():
     play_store_icon.paste(resized_logo, (x, y), resized_logo)
     
     # Save Play Store icon
-    fastlane_dir = os.path.join(project_root, "fastlane", "metadata", "android", "en-US", "images")
-    os.makedirs(fastlane_dir, exist_ok=True)
-    play_store_icon.save(os.path.join(fastlane_dir, "icon.png"))
+    os.makedirs(os.path.dirname(play_store_icon_path), exist_ok=True)
+    save_png(play_store_icon, play_store_icon_path, rgba=True)
     
     print("✓ Created Play Store icon (512x512)")
 
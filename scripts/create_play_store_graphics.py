@@ -3,11 +3,29 @@
 Create Google Play Store graphics for Linknode Demo app
 """
 
-from PIL import Image, ImageDraw, ImageFont, ImageFilter
+# Hand the run to the warm render daemon if one is running (see render_daemon.py)
+from render_client import delegate_to_daemon
+delegate_to_daemon(__name__, __file__)
+
+from PIL import Image, ImageDraw
 import os
 
+from build_manifest import incremental
+from font_registry import get_font
+from gradients import linear_gradient
+from network_graph import draw_network, knn_edges, scatter_nodes
+from png_encode import save_png
+from screenshot_matrix import fastlane_locales, render_matrix, screenshot_outputs, text_sources
+from shapes import ellipse, line
+from text_layer import draw_text
+from tiled_canvas import TiledCanvas
+
+# Paths
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+output_dir = os.path.join(project_root, "fastlane", "metadata", "android", "en-US", "images")
+
 # Create output directory
-output_dir = "fastlane/metadata/android/en-US/images"
 os.makedirs(output_dir, exist_ok=True)
 
 # Define colors based on the Linknode theme
@@ -17,19 +35,15 @@ ACCENT_COLOR = (0, 188, 212)  # Cyan
 BACKGROUND_GRADIENT_START = (25, 25, 112)  # Midnight Blue
 BACKGROUND_GRADIENT_END = (138, 43, 226)  # Blue Violet
 
+# Feature graphic background network
+FEATURE_NETWORK_NODES = 15
+FEATURE_NETWORK_NEIGHBORS = 3
+
 def create_gradient(width, height, start_color, end_color):
     """Create a gradient background"""
-    base = Image.new('RGB', (width, height), start_color)
-    top = Image.new('RGB', (width, height), end_color)
-    mask = Image.new('L', (width, height))
-    mask_draw = ImageDraw.Draw(mask)
-    
-    for y in range(height):
-        mask_draw.rectangle([(0, y), (width, y)], fill=int(255 * y / height))
-    
-    base.paste(top, (0, 0), mask)
-    return base
+    return linear_gradient(width, height, start_color, end_color)
 
+@incremental([f"{output_dir}/icon.png"])
 def create_app_icon():
     """Create 512x512 app icon"""
     size = 512
@@ -41,9 +55,9 @@ def create_app_icon():
     
     # Central node
     node_radius = 60
-    draw.ellipse([center_x - node_radius, center_y - node_radius,
-                  center_x + node_radius, center_y + node_radius],
-                 fill=(255, 255, 255, 200))
+    ellipse(icon, [center_x - node_radius, center_y - node_radius,
+                   center_x + node_radius, center_y + node_radius],
+            fill=(255, 255, 255, 200))
     
     # Surrounding nodes
     import math
@@ -57,57 +71,39 @@ def create_app_icon():
         y = center_y + orbit_radius * math.sin(angle)
         
         # Draw connection lines
-        draw.line([center_x, center_y, x, y], fill=(255, 255, 255, 150), width=3)
+        line(icon, [center_x, center_y, x, y], fill=(255, 255, 255, 150), width=3)
         
         # Draw nodes
         colors = [SECONDARY_COLOR, ACCENT_COLOR, (76, 175, 80), (255, 193, 7), (233, 30, 99), (156, 39, 176)]
-        draw.ellipse([x - small_radius, y - small_radius,
-                      x + small_radius, y + small_radius],
-                     fill=colors[i % len(colors)])
+        ellipse(icon, [x - small_radius, y - small_radius,
+                       x + small_radius, y + small_radius],
+                fill=colors[i % len(colors)])
     
     # Add "LN" text in center
-    try:
-        font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 48)
-    except:
-        font = None
+    font = get_font("sans-bold", 48)
     
     if font:
         draw.text((center_x, center_y), "LN", fill=(0, 0, 0), font=font, anchor="mm")
     
-    icon.save(f"{output_dir}/icon.png", "PNG")
+    save_png(icon, f"{output_dir}/icon.png", rgba=True)
     print(f"✅ Created app icon: {output_dir}/icon.png")
 
+@incremental([f"{output_dir}/featureGraphic.png"])
 def create_feature_graphic():
     """Create 1024x500 feature graphic"""
     width, height = 1024, 500
     graphic = create_gradient(width, height, BACKGROUND_GRADIENT_START, BACKGROUND_GRADIENT_END)
     draw = ImageDraw.Draw(graphic)
     
-    # Draw network pattern in background
-    import random
-    random.seed(42)
-    nodes = []
-    for _ in range(15):
-        x = random.randint(50, width - 50)
-        y = random.randint(50, height - 50)
-        nodes.append((x, y))
-    
-    # Draw connections
-    for i, (x1, y1) in enumerate(nodes):
-        for j, (x2, y2) in enumerate(nodes[i+1:i+4]):
-            draw.line([x1, y1, x2, y2], fill=(255, 255, 255, 30), width=1)
-    
-    # Draw nodes
-    for x, y in nodes:
-        draw.ellipse([x-8, y-8, x+8, y+8], fill=(255, 255, 255, 50))
+    # Draw network pattern in background, each node linked to its nearest neighbors
+    nodes = scatter_nodes(FEATURE_NETWORK_NODES, width, height, margin=50, seed=42)
+    edges = knn_edges(nodes, FEATURE_NETWORK_NEIGHBORS)
+    draw_network(graphic, nodes, edges, edge_fill=(255, 255, 255, 30),
+                 node_fill=(255, 255, 255, 50), node_radius=8)
     
     # Add title text
-    try:
-        font_large = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 72)
-        font_medium = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", 36)
-    except:
-        font_large = None
-        font_medium = None
+    font_large = get_font("sans-bold", 72)
+    font_medium = get_font("sans", 36)
     
     if font_large:
         # Title
@@ -116,100 +112,140 @@ def create_feature_graphic():
         
         if font_medium:
             # Subtitle
-            draw.text((width // 2, height // 2 + 30), 
+            draw_text(graphic, (width // 2, height // 2 + 30), 
                       "Transform Any Device Into a Smart IoT Node", 
-                      fill=(255, 255, 255, 200), font=font_medium, anchor="mm")
+                      font_medium, fill=(255, 255, 255, 200), anchor="mm")
     
-    graphic.save(f"{output_dir}/featureGraphic.png", "PNG")
+    save_png(graphic, f"{output_dir}/featureGraphic.png")
     print(f"✅ Created feature graphic: {output_dir}/featureGraphic.png")
 
-def create_screenshots():
-    """Create sample screenshots"""
-    phone_dir = f"{output_dir}/phoneScreenshots"
-    os.makedirs(phone_dir, exist_ok=True)
-    
-    width, height = 1080, 1920
-    
-    # Screenshot 1: Main dashboard
-    screen1 = create_gradient(width, height, (30, 30, 30), (60, 60, 60))
-    draw = ImageDraw.Draw(screen1)
+# Screenshot layouts are designed for a 1080px wide phone and scaled from there
+DESIGN_WIDTH = 1080
+
+def load_screenshot_fonts(scale=1):
+    """Load title and body fonts for screenshots"""
+    font_title = get_font("sans-bold", int(48 * scale))
+    font_body = get_font("sans", int(36 * scale))
+    return font_title, font_body
+
+DASHBOARD_TEXT = {
+    "title": "Linknode Demo",
+    "features": [
+        ["Enterprise Security", "End-to-end encryption"],
+        ["Universal Connectivity", "WiFi, Bluetooth, NFC"],
+        ["Advanced Analytics", "Real-time monitoring"],
+    ],
+}
+
+def dashboard_template(width, height):
+    """Screenshot 1 without text: main dashboard"""
+    scale = width / DESIGN_WIDTH
+    screen1 = TiledCanvas(width, height)
+    screen1.linear_gradient((30, 30, 30), (60, 60, 60))
     
     # Status bar
-    draw.rectangle([0, 0, width, 80], fill=(20, 20, 20))
+    screen1.rectangles([(0, 0, width, int(80 * scale))], fill=(20, 20, 20))
     
     # App header
-    draw.rectangle([0, 80, width, 200], fill=PRIMARY_COLOR)
+    screen1.rectangles([(0, int(80 * scale), width, int(200 * scale))], fill=PRIMARY_COLOR)
+    
+    # Feature cards, translucent over the gradient
+    card_y = int(300 * scale)
+    for _ in DASHBOARD_TEXT["features"]:
+        # Card background
+        screen1.rounded_rectangle([int(50 * scale), card_y, width - int(50 * scale), card_y + int(200 * scale)],
+                                  radius=int(20 * scale), fill=(255, 255, 255, 20))
+        card_y += int(250 * scale)
     
-    try:
-        font_title = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 48)
-        font_body = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", 36)
-    except:
-        font_title = None
-        font_body = None
+    return screen1
+
+def dashboard_text(canvas, width, height, text):
+    """Draw the localized text of screenshot 1"""
+    scale = width / DESIGN_WIDTH
+    font_title, font_body = load_screenshot_fonts(scale)
     
     if font_title:
-        draw.text((width // 2, 140), "Linknode Demo", fill=(255, 255, 255), font=font_title, anchor="mm")
-    
-    # Feature cards
-    card_y = 300
-    features = [
-        ("🔐", "Enterprise Security", "End-to-end encryption"),
-        ("📡", "Universal Connectivity", "WiFi, Bluetooth, NFC"),
-        ("📊", "Advanced Analytics", "Real-time monitoring")
-    ]
+        canvas.text((width // 2, int(140 * scale)), text["title"], font_title,
+                    fill=(255, 255, 255), anchor="mm")
     
-    for emoji, title, desc in features:
-        # Card background
-        draw.rounded_rectangle([50, card_y, width - 50, card_y + 200], 
-                               radius=20, fill=(255, 255, 255, 20))
-        
+    card_y = int(300 * scale)
+    for title, desc in text["features"]:
         if font_body:
-            draw.text((150, card_y + 60), title, fill=(255, 255, 255), font=font_body)
-            draw.text((150, card_y + 110), desc, fill=(200, 200, 200), font=font_body)
-        
-        card_y += 250
-    
-    screen1.save(f"{phone_dir}/1_en-US.png", "PNG")
-    print(f"✅ Created screenshot 1: {phone_dir}/1_en-US.png")
-    
-    # Screenshot 2: Connectivity view
-    screen2 = create_gradient(width, height, (30, 30, 30), (60, 60, 60))
-    draw = ImageDraw.Draw(screen2)
+            canvas.text((int(150 * scale), card_y + int(60 * scale)), title, font_body, fill=(255, 255, 255))
+            canvas.text((int(150 * scale), card_y + int(110 * scale)), desc, font_body, fill=(200, 200, 200))
+        card_y += int(250 * scale)
+
+CONNECTIVITY_TEXT = {
+    "title": "Device Connectivity",
+}
+
+def connectivity_template(width, height):
+    """Screenshot 2 without text: connectivity view"""
+    scale = width / DESIGN_WIDTH
+    screen2 = TiledCanvas(width, height)
+    screen2.linear_gradient((30, 30, 30), (60, 60, 60))
     
     # Header
-    draw.rectangle([0, 0, width, 80], fill=(20, 20, 20))
-    draw.rectangle([0, 80, width, 200], fill=SECONDARY_COLOR)
-    
-    if font_title:
-        draw.text((width // 2, 140), "Device Connectivity", fill=(255, 255, 255), font=font_title, anchor="mm")
+    screen2.rectangles([(0, 0, width, int(80 * scale))], fill=(20, 20, 20))
+    screen2.rectangles([(0, int(80 * scale), width, int(200 * scale))], fill=SECONDARY_COLOR)
     
     # Network visualization
     center_x, center_y = width // 2, height // 2
+    device_radius = int(100 * scale)
+    node_radius = int(60 * scale)
+    orbit_radius = int(250 * scale)
     
     # Central device
-    draw.ellipse([center_x - 100, center_y - 100, center_x + 100, center_y + 100],
-                 fill=(255, 255, 255))
+    screen2.ellipse([center_x - device_radius, center_y - device_radius,
+                     center_x + device_radius, center_y + device_radius],
+                    fill=(255, 255, 255))
     
     # Connected devices
     import math
     for i in range(6):
         angle = (2 * math.pi * i) / 6
-        x = center_x + 250 * math.cos(angle)
-        y = center_y + 250 * math.sin(angle)
+        x = center_x + orbit_radius * math.cos(angle)
+        y = center_y + orbit_radius * math.sin(angle)
         
         # Connection line
-        draw.line([center_x, center_y, x, y], fill=ACCENT_COLOR, width=4)
+        screen2.line([center_x, center_y, x, y], fill=ACCENT_COLOR, width=max(1, int(4 * scale)))
         
         # Device node
-        draw.ellipse([x - 60, y - 60, x + 60, y + 60], fill=ACCENT_COLOR)
+        screen2.ellipse([x - node_radius, y - node_radius, x + node_radius, y + node_radius], fill=ACCENT_COLOR)
     
-    screen2.save(f"{phone_dir}/2_en-US.png", "PNG")
-    print(f"✅ Created screenshot 2: {phone_dir}/2_en-US.png")
+    return screen2
 
-if __name__ == "__main__":
+def connectivity_text(canvas, width, height, text):
+    """Draw the localized text of screenshot 2"""
+    font_title, _ = load_screenshot_fonts(width / DESIGN_WIDTH)
+    
+    if font_title:
+        canvas.text((width // 2, int(140 * width / DESIGN_WIDTH)), text["title"], font_title,
+                    fill=(255, 255, 255), anchor="mm")
+
+# Screenshots in listing order: background template, text overlay, en-US strings
+SCREENS = [
+    (dashboard_template, dashboard_text, DASHBOARD_TEXT),
+    (connectivity_template, connectivity_text, CONNECTIVITY_TEXT),
+]
+
+screenshot_locales = fastlane_locales()
+
+@incremental(
+    screenshot_outputs(len(SCREENS), screenshot_locales),
+    sources=text_sources(screenshot_locales),
+)
+def create_screenshots():
+    """Create screenshots for every Fastlane locale and device size"""
+    render_matrix(SCREENS, screenshot_locales)
+
+def main():
     print("Creating Google Play Store graphics...")
     create_app_icon()
     create_feature_graphic()
     create_screenshots()
     print("\n✅ All graphics created successfully!")
-    print(f"📁 Location: {output_dir}/")
\ No newline at end of file
+    print(f"📁 Location: {output_dir}/")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -1,9 +1,23 @@
 #!/usr/bin/env python3
 
+# Hand the run to the warm render daemon if one is running (see render_daemon.py)
+from render_client import delegate_to_daemon
+delegate_to_daemon(__name__, __file__)
+
 import os
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageDraw
 import subprocess
 
+from build_manifest import incremental
+from font_registry import get_font
+from gradients import linear_gradient
+from output_store import link_file
+from png_encode import save_png
+from render_pool import run_tasks, task
+from resize_pyramid import source_pyramid
+from text_layer import draw_shadowed_text
+from tiled_canvas import TiledCanvas
+
 # Paths
 script_dir = os.path.dirname(os.path.abspath(__file__))
 project_root = os.path.dirname(script_dir)
@@ -13,24 +27,64 @@ logo_path = os.path.join(project_root, "linknode_logo.jpg")
 # Create output directory
 os.makedirs(output_dir, exist_ok=True)
 
+# Phone screenshot dimensions (common sizes)
+screenshot_sizes = [
+    ("phone", 1080, 1920),  # Standard phone
+    ("phone_small", 720, 1280),  # Smaller phone
+]
+
+screenshots = [
+    {
+        "title": "Real-Time Monitoring",
+        "subtitle": "Track your energy usage live",
+        "bg_color": "#6366f1",
+        "features": [
+            "• Eagle-200 Smart Meter Integration",
+            "• Live Power Consumption Data",
+            "• Beautiful Animated Interface",
+            "• Cloud-Native Architecture"
+        ]
+    },
+    {
+        "title": "Modern Design",
+        "subtitle": "Beautiful Material UI",
+        "bg_color": "#9333ea",
+        "features": [
+            "• Animated Particle Effects",
+            "• Gradient Backgrounds",
+            "• Responsive Layouts",
+            "• Dark Mode Ready"
+        ]
+    },
+    {
+        "title": "Privacy First",
+        "subtitle": "Your data stays yours",
+        "bg_color": "#3b82f6",
+        "features": [
+            "• No Personal Data Collection",
+            "• Transparent Privacy Policy",
+            "• Secure Architecture",
+            "• Open Source Compatible"
+        ]
+    }
+]
+
+screenshot_outputs = [
+    os.path.join(output_dir, f"screenshot_{size_name}_{i+1}.png")
+    for size_name, _, _ in screenshot_sizes
+    for i in range(len(screenshots))
+]
+
+@incremental([os.path.join(output_dir, "feature_graphic.png")], sources=[logo_path])
 def create_feature_graphic():
     """Create 1024x500 feature graphic for Play Store"""
     print("Creating feature graphic...")
     
-    # Create gradient background
-    img = Image.new('RGB', (1024, 500), '#6366f1')
-    draw = ImageDraw.Draw(img)
-    
-    # Add gradient effect
-    for y in range(500):
-        # Purple to blue gradient
-        r = int(99 + (147 - 99) * (y / 500))
-        g = int(102 + (51 - 102) * (y / 500))
-        b = int(241 + (217 - 241) * (y / 500))
-        draw.rectangle([(0, y), (1024, y+1)], fill=(r, g, b))
+    # Create gradient background (purple to blue)
+    img = linear_gradient(1024, 500, (99, 102, 241), (147, 51, 217))
     
     # Load and place logo
-    logo = Image.open(logo_path).convert("RGBA")
+    logo = source_pyramid(logo_path).source
     logo_size = 200
     logo_aspect = logo.width / logo.height
     if logo_aspect > 1:
@@ -40,7 +94,7 @@ def create_feature_graphic():
         new_height = logo_size
         new_width = int(logo_size * logo_aspect)
     
-    logo = logo.resize((new_width, new_height), Image.Resampling.LANCZOS)
+    logo = source_pyramid(logo_path).resize((new_width, new_height))
     
     # Create white circle background for logo
     circle_img = Image.new('RGBA', (logo_size + 20, logo_size + 20), (0, 0, 0, 0))
@@ -53,167 +107,108 @@ def create_feature_graphic():
     logo_y = 160 + (logo_size - new_height) // 2
     img.paste(logo, (logo_x, logo_y), logo)
     
-    # Add text (using default font)
-    draw = ImageDraw.Draw(img)
-    
-    # Title
-    try:
-        # Try to use a better font if available
-        title_font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 72)
-        subtitle_font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", 32)
-        tagline_font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", 24)
-    except:
-        # Fallback to default font
-        title_font = ImageFont.load_default()
-        subtitle_font = ImageFont.load_default()
-        tagline_font = ImageFont.load_default()
+    # Fonts
+    title_font = get_font("sans-bold", 72)
+    subtitle_font = get_font("sans", 32)
+    tagline_font = get_font("sans", 24)
     
     # Add text with shadow effect
-    shadow_offset = 3
+    draw_shadowed_text(img, (370, 180), "Linknode Showcase", title_font)
+    draw_shadowed_text(img, (370, 280), "Real-Time IoT Energy Monitoring", subtitle_font)
+    draw_shadowed_text(img, (370, 340), "Built with AI • Deployed on Fly.io", tagline_font)
     
-    # Title shadow
-    draw.text((370, 180 + shadow_offset), "Linknode Showcase", font=title_font, fill=(0, 0, 0, 128))
-    draw.text((370, 180), "Linknode Showcase", font=title_font, fill="white")
+    # Save
+    save_png(img, os.path.join(output_dir, "feature_graphic.png"))
+    print("✓ Created feature_graphic.png (1024x500)")
+
+def create_screenshot(size_name, width, height, i):
+    """Create one phone screenshot for Play Store"""
+    screenshot = screenshots[i]
     
-    # Subtitle shadow
-    draw.text((370, 280 + shadow_offset), "Real-Time IoT Energy Monitoring", font=subtitle_font, fill=(0, 0, 0, 128))
-    draw.text((370, 280), "Real-Time IoT Energy Monitoring", font=subtitle_font, fill="white")
+    # Recorded on a tiled canvas so large sizes can stream band by band
+    canvas = TiledCanvas(width, height)
     
-    # Tagline shadow
-    draw.text((370, 340 + shadow_offset), "Built with AI • Deployed on Fly.io", font=tagline_font, fill=(0, 0, 0, 128))
-    draw.text((370, 340), "Built with AI • Deployed on Fly.io", font=tagline_font, fill="white")
+    # Create image with gradient (fades to 70% of the base color)
+    base_color = tuple(int(screenshot["bg_color"][k:k+2], 16) for k in (1, 3, 5))
+    end_color = tuple(c * 0.7 for c in base_color)
+    canvas.linear_gradient(base_color, end_color)
+    
+    # Add logo at top
+    logo = source_pyramid(logo_path).source
+    logo_size = width // 4
+    logo_aspect = logo.width / logo.height
+    if logo_aspect > 1:
+        new_width = logo_size
+        new_height = int(logo_size / logo_aspect)
+    else:
+        new_height = logo_size
+        new_width = int(logo_size * logo_aspect)
+    
+    logo = source_pyramid(logo_path).resize((new_width, new_height))
+    
+    # White circle for logo
+    circle_size = logo_size + 40
+    logo_x = (width - circle_size) // 2
+    logo_y = height // 6
+    canvas.ellipse([logo_x, logo_y, logo_x + circle_size - 1, logo_y + circle_size - 1],
+                   fill=(255, 255, 255))
+    
+    # Center logo in circle
+    actual_logo_x = logo_x + (circle_size - new_width) // 2
+    actual_logo_y = logo_y + (circle_size - new_height) // 2
+    canvas.paste(logo, (actual_logo_x, actual_logo_y), logo)
+    
+    # Add text
+    title_font = get_font("sans-bold", width // 20)
+    subtitle_font = get_font("sans", width // 30)
+    feature_font = get_font("sans", width // 35)
+    
+    # Title
+    text_y = logo_y + circle_size + height // 10
+    canvas.text((width // 2, text_y), screenshot["title"],
+                title_font, fill="white", anchor="mm")
+    
+    # Subtitle
+    text_y += height // 15
+    canvas.text((width // 2, text_y), screenshot["subtitle"],
+                subtitle_font, fill=(255, 255, 255, 200), anchor="mm")
+    
+    # Features
+    text_y += height // 10
+    for feature in screenshot["features"]:
+        canvas.text((width // 10, text_y), feature,
+                    feature_font, fill=(255, 255, 255, 180))
+        text_y += height // 20
+    
+    # Add device frame hint, one translucent layer for all four edges
+    frame_width = 20
+    canvas.rectangles([
+        [0, 0, width, frame_width],
+        [0, height-frame_width, width, height],
+        [0, 0, frame_width, height],
+        [width-frame_width, 0, width, height],
+    ], fill=(0, 0, 0, 50))
     
     # Save
-    img.save(os.path.join(output_dir, "feature_graphic.png"))
-    print("✓ Created feature_graphic.png (1024x500)")
+    filename = f"screenshot_{size_name}_{i+1}.png"
+    canvas.save(os.path.join(output_dir, filename))
+    print(f"✓ Created {filename} ({width}x{height})")
 
+@incremental(screenshot_outputs, sources=[logo_path])
 def create_screenshots():
     """Create phone screenshots for Play Store"""
     print("Creating screenshots...")
     
-    # Phone screenshot dimensions (common sizes)
-    sizes = [
-        ("phone", 1080, 1920),  # Standard phone
-        ("phone_small", 720, 1280),  # Smaller phone
-    ]
-    
-    screenshots = [
-        {
-            "title": "Real-Time Monitoring",
-            "subtitle": "Track your energy usage live",
-            "bg_color": "#6366f1",
-            "features": [
-                "• Eagle-200 Smart Meter Integration",
-                "• Live Power Consumption Data",
-                "• Beautiful Animated Interface",
-                "• Cloud-Native Architecture"
-            ]
-        },
-        {
-            "title": "Modern Design",
-            "subtitle": "Beautiful Material UI",
-            "bg_color": "#9333ea",
-            "features": [
-                "• Animated Particle Effects",
-                "• Gradient Backgrounds",
-                "• Responsive Layouts",
-                "• Dark Mode Ready"
-            ]
-        },
-        {
-            "title": "Privacy First",
-            "subtitle": "Your data stays yours",
-            "bg_color": "#3b82f6",
-            "features": [
-                "• No Personal Data Collection",
-                "• Transparent Privacy Policy",
-                "• Secure Architecture",
-                "• Open Source Compatible"
-            ]
-        }
-    ]
-    
-    for size_name, width, height in sizes:
-        for i, screenshot in enumerate(screenshots):
-            # Create image with gradient
-            img = Image.new('RGB', (width, height), screenshot["bg_color"])
-            draw = ImageDraw.Draw(img)
-            
-            # Add gradient
-            for y in range(height):
-                fade = y / height
-                r = int(int(screenshot["bg_color"][1:3], 16) * (1 - fade * 0.3))
-                g = int(int(screenshot["bg_color"][3:5], 16) * (1 - fade * 0.3))
-                b = int(int(screenshot["bg_color"][5:7], 16) * (1 - fade * 0.3))
-                draw.rectangle([(0, y), (width, y+1)], fill=(r, g, b))
-            
-            # Add logo at top
-            logo = Image.open(logo_path).convert("RGBA")
-            logo_size = width // 4
-            logo_aspect = logo.width / logo.height
-            if logo_aspect > 1:
-                new_width = logo_size
-                new_height = int(logo_size / logo_aspect)
-            else:
-                new_height = logo_size
-                new_width = int(logo_size * logo_aspect)
-            
-            logo = logo.resize((new_width, new_height), Image.Resampling.LANCZOS)
-            
-            # White circle for logo
-            circle_size = logo_size + 40
-            circle_img = Image.new('RGBA', (circle_size, circle_size), (0, 0, 0, 0))
-            circle_draw = ImageDraw.Draw(circle_img)
-            circle_draw.ellipse([0, 0, circle_size, circle_size], fill=(255, 255, 255, 255))
-            
-            logo_x = (width - circle_size) // 2
-            logo_y = height // 6
-            img.paste(circle_img, (logo_x, logo_y), circle_img)
-            
-            # Center logo in circle
-            actual_logo_x = logo_x + (circle_size - new_width) // 2
-            actual_logo_y = logo_y + (circle_size - new_height) // 2
-            img.paste(logo, (actual_logo_x, actual_logo_y), logo)
-            
-            # Add text
-            try:
-                title_font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", width // 20)
-                subtitle_font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", width // 30)
-                feature_font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", width // 35)
-            except:
-                title_font = ImageFont.load_default()
-                subtitle_font = ImageFont.load_default()
-                feature_font = ImageFont.load_default()
-            
-            # Title
-            text_y = logo_y + circle_size + height // 10
-            draw.text((width // 2, text_y), screenshot["title"], 
-                     font=title_font, fill="white", anchor="mm")
-            
-            # Subtitle
-            text_y += height // 15
-            draw.text((width // 2, text_y), screenshot["subtitle"], 
-                     font=subtitle_font, fill=(255, 255, 255, 200), anchor="mm")
-            
-            # Features
-            text_y += height // 10
-            for feature in screenshot["features"]:
-                draw.text((width // 10, text_y), feature, 
-                         font=feature_font, fill=(255, 255, 255, 180))
-                text_y += height // 20
-            
-            # Add device frame hint
-            frame_width = 20
-            draw.rectangle([0, 0, width, frame_width], fill=(0, 0, 0, 50))
-            draw.rectangle([0, height-frame_width, width, height], fill=(0, 0, 0, 50))
-            draw.rectangle([0, 0, frame_width, height], fill=(0, 0, 0, 50))
-            draw.rectangle([width-frame_width, 0, width, height], fill=(0, 0, 0, 50))
-            
-            # Save
-            filename = f"screenshot_{size_name}_{i+1}.png"
-            img.save(os.path.join(output_dir, filename))
-            print(f"✓ Created {filename} ({width}x{height})")
+    run_tasks(
+        task(create_screenshot, size_name, width, height, i)
+        for size_name, width, height in screenshot_sizes
+        for i in range(len(screenshots))
+    )
 
+@incremental(
+    [os.path.join(output_dir, "app_icon_512.png")],
+    sources=[os.path.join(project_root, "fastlane/metadata/android/en-US/images/icon.png"), logo_path],
+)
 def create_app_icon():
     """Create 512x512 app icon for store listing"""
     print("Creating store app icon...")
@@ -221,15 +216,14 @@ def create_app_icon():
     # Copy the existing Play Store icon
     source_icon = os.path.join(project_root, "fastlane/metadata/android/en-US/images/icon.png")
     if os.path.exists(source_icon):
-        # Just copy it
-        import shutil
-        shutil.copy(source_icon, os.path.join(output_dir, "app_icon_512.png"))
+        # Link it from the output store rather than copying
+        link_file(source_icon, os.path.join(output_dir, "app_icon_512.png"))
     else:
         # Create a new one
         icon = Image.new('RGBA', (512, 512), (255, 255, 255, 255))
         
         # Load logo
-        logo = Image.open(logo_path).convert("RGBA")
+        logo = source_pyramid(logo_path).source
         
         # Resize to fit
         logo_size = 410  # 80% of 512
@@ -241,14 +235,14 @@ def create_app_icon():
             new_height = logo_size
             new_width = int(logo_size * aspect)
         
-        logo = logo.resize((new_width, new_height), Image.Resampling.LANCZOS)
+        logo = source_pyramid(logo_path).resize((new_width, new_height))
         
         # Center and paste
         x = (512 - new_width) // 2
         y = (512 - new_height) // 2
         icon.paste(logo, (x, y), logo)
         
-        icon.save(os.path.join(output_dir, "app_icon_512.png"))
+        save_png(icon, os.path.join(output_dir, "app_icon_512.png"), rgba=True)
     
     print("✓ Created app_icon_512.png (512x512)")
 
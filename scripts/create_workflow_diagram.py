@@ -3,11 +3,24 @@
 Create a visual workflow diagram for Linknode's development pipeline
 """
 
-from PIL import Image, ImageDraw, ImageFont
+# Hand the run to the warm render daemon if one is running (see render_daemon.py)
+from render_client import delegate_to_daemon
+delegate_to_daemon(__name__, __file__)
+
+from PIL import Image, ImageDraw
 import os
 
+from build_manifest import incremental
+from font_registry import get_font
+from png_encode import save_png
+from render_pool import run_tasks, task
+
+# Paths
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+output_dir = os.path.join(project_root, "docs", "images")
+
 # Create output directory
-output_dir = "docs/images"
 os.makedirs(output_dir, exist_ok=True)
 
 # Define colors
@@ -23,21 +36,17 @@ COLORS = {
     'ai_blue': (33, 150, 243),      # AI Assistant blue
 }
 
+@incremental([f"{output_dir}/workflow_diagram.png"])
 def create_workflow_diagram():
     """Create the main workflow diagram"""
     width, height = 1200, 800
     img = Image.new('RGB', (width, height), COLORS['bg'])
     draw = ImageDraw.Draw(img)
     
-    # Try to load font
-    try:
-        font_large = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 24)
-        font_medium = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", 16)
-        font_small = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", 14)
-    except:
-        font_large = None
-        font_medium = None
-        font_small = None
+    # Fonts
+    font_large = get_font("sans-bold", 24)
+    font_medium = get_font("sans", 16)
+    font_small = get_font("sans", 14)
     
     # Title
     title = "Linknode Demo - Development Pipeline"
@@ -166,23 +175,19 @@ def create_workflow_diagram():
                   fill=COLORS['text_light'], font=font_small, anchor="mm")
     
     # Save the diagram
-    img.save(f"{output_dir}/workflow_diagram.png", "PNG", optimize=True)
+    save_png(img, f"{output_dir}/workflow_diagram.png")
     print(f"✅ Created workflow diagram: {output_dir}/workflow_diagram.png")
 
+@incremental([f"{output_dir}/tech_stack.png"])
 def create_tech_stack_infographic():
     """Create a tech stack infographic"""
     width, height = 800, 1000
     img = Image.new('RGB', (width, height), COLORS['bg'])
     draw = ImageDraw.Draw(img)
     
-    try:
-        font_title = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 32)
-        font_section = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 20)
-        font_item = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", 16)
-    except:
-        font_title = None
-        font_section = None
-        font_item = None
+    font_title = get_font("sans-bold", 32)
+    font_section = get_font("sans-bold", 20)
+    font_item = get_font("sans", 16)
     
     # Title
     if font_title:
@@ -242,12 +247,14 @@ def create_tech_stack_infographic():
         draw.text((width//2, height-30), "linknode.com", 
                   fill=COLORS['primary'], font=font_item, anchor="mm")
     
-    img.save(f"{output_dir}/tech_stack.png", "PNG", optimize=True)
+    save_png(img, f"{output_dir}/tech_stack.png")
     print(f"✅ Created tech stack infographic: {output_dir}/tech_stack.png")
 
-if __name__ == "__main__":
+def main():
     print("Creating workflow visualizations...")
-    create_workflow_diagram()
-    create_tech_stack_infographic()
+    run_tasks([task(create_workflow_diagram), task(create_tech_stack_infographic)])
     print("\n✅ All visualizations created successfully!")
-    print(f"📁 Location: {output_dir}/")
\ No newline at end of file
+    print(f"📁 Location: {output_dir}/")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
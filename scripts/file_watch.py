@@ -0,0 +1,158 @@
+"""
+File change notification for watch mode
+
+watch_files(paths) returns a watcher for a fixed set of files. On Linux it
+uses inotify on the directories holding them, so editors that save by writing
+a new file and renaming it over the old one are still seen; elsewhere, or
+when inotify is unavailable (no libc symbol, watch limit reached) or polling
+is requested, it compares modification times and sizes every half second.
+
+Both watchers answer poll(timeout) with the set of watched paths that changed.
+next_batch() groups a burst of edits, such as an editor writing several
+files or an image editor saving in steps, into one set:
+
+    watcher = watch_files(paths)
+    while True:
+        changed = next_batch(watcher, debounce=0.2)
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+
+# Seconds without further changes that end a batch
+DEFAULT_DEBOUNCE = 0.2
+
+# A batch is cut off after this many seconds even if changes keep coming
+MAX_BATCH_WAIT = 2.0
+
+POLL_INTERVAL = 0.5
+
+# inotify constants from <sys/inotify.h>
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+INOTIFY_EVENT = struct.Struct("iIII")
+
+
+class PollingWatcher:
+    """Detect changes by comparing modification times and sizes"""
+
+    kind = "polling"
+
+    def __init__(self, paths, interval=POLL_INTERVAL):
+        self.paths = {os.path.abspath(path) for path in paths}
+        self.interval = interval
+        self._state = self._snapshot()
+
+    def _snapshot(self):
+        state = {}
+        for path in self.paths:
+            try:
+                st = os.stat(path)
+                state[path] = (st.st_mtime_ns, st.st_size)
+            except FileNotFoundError:
+                state[path] = None
+        return state
+
+    def poll(self, timeout=None):
+        """Return the paths changed since the last poll, waiting up to timeout seconds for one"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            state = self._snapshot()
+            changed = {path for path in self.paths if state[path] != self._state[path]}
+            self._state = state
+            if changed:
+                return changed
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return set()
+                time.sleep(min(self.interval, remaining))
+            else:
+                time.sleep(self.interval)
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """Detect changes with Linux inotify watches on the parent directories"""
+
+    kind = "inotify"
+
+    def __init__(self, paths):
+        self.paths = {os.path.abspath(path) for path in paths}
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        self._directories = {}
+        try:
+            for directory in sorted({os.path.dirname(path) for path in self.paths}):
+                if not os.path.isdir(directory):
+                    continue
+                wd = libc.inotify_add_watch(self._fd, os.fsencode(directory), IN_CLOSE_WRITE | IN_MOVED_TO)
+                if wd < 0:
+                    errno = ctypes.get_errno()
+                    raise OSError(errno, f"cannot watch {directory}: {os.strerror(errno)}")
+                self._directories[wd] = directory
+        except OSError:
+            os.close(self._fd)
+            raise
+
+    def poll(self, timeout=None):
+        """Return the paths changed since the last poll, waiting up to timeout seconds for one"""
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return set()
+        try:
+            data = os.read(self._fd, 1 << 16)
+        except BlockingIOError:
+            return set()
+
+        changed = set()
+        offset = 0
+        while offset < len(data):
+            wd, _, _, length = INOTIFY_EVENT.unpack_from(data, offset)
+            name = data[offset + INOTIFY_EVENT.size:offset + INOTIFY_EVENT.size + length].rstrip(b"\0")
+            offset += INOTIFY_EVENT.size + length
+            directory = self._directories.get(wd)
+            if directory is not None:
+                path = os.path.join(directory, os.fsdecode(name))
+                if path in self.paths:
+                    changed.add(path)
+        return changed
+
+    def close(self):
+        os.close(self._fd)
+
+
+def watch_files(paths, poll=False):
+    """Return an inotify watcher for paths where possible, otherwise a polling one"""
+    if not poll and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(paths)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(paths)
+
+
+def next_batch(watcher, debounce=DEFAULT_DEBOUNCE):
+    """Wait for a change, then collect further changes until debounce seconds pass quietly"""
+    changed = set()
+    while not changed:
+        changed = watcher.poll()
+    started = time.monotonic()
+    while time.monotonic() - started < MAX_BATCH_WAIT:
+        more = watcher.poll(debounce)
+        if not more:
+            break
+        changed |= more
+    return changed
@@ -3,11 +3,25 @@
 Fix/regenerate Android launcher icons
 """
 
+# Hand the run to the warm render daemon if one is running (see render_daemon.py)
+from render_client import delegate_to_daemon
+delegate_to_daemon(__name__, __file__)
+
 from PIL import Image, ImageDraw
 import os
 
+from build_manifest import incremental
+from gradients import linear_gradient
+from png_encode import save_image
+from render_pool import run_tasks, task
+from shapes import circle_mask
+
+# Paths
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+
 # Base directory for Android resources
-res_dir = "android/app/src/main/res"
+res_dir = os.path.join(project_root, "android", "app", "src", "main", "res")
 
 # Icon sizes for different densities
 icon_sizes = {
@@ -20,18 +34,10 @@ icon_sizes = {
 
 def create_launcher_icon(size):
     """Create a simple launcher icon"""
-    # Create a new image with gradient background
-    icon = Image.new('RGBA', (size, size), (0, 0, 0, 0))
+    # Gradient background from indigo (63, 81, 181) to purple (156, 39, 176)
+    icon = linear_gradient(size, size, (63, 81, 181, 255), (156, 39, 176, 255))
     draw = ImageDraw.Draw(icon)
     
-    # Draw gradient background (indigo to purple)
-    for y in range(size):
-        # Gradient from indigo (63, 81, 181) to purple (156, 39, 176)
-        r = int(63 + (156 - 63) * y / size)
-        g = int(81 + (39 - 81) * y / size)
-        b = int(181 + (176 - 181) * y / size)
-        draw.rectangle([(0, y), (size, y+1)], fill=(r, g, b, 255))
-    
     # Draw a white "L" for Linknode
     margin = size // 6
     line_width = size // 8
@@ -56,9 +62,7 @@ def create_round_icon(size):
     square_icon = create_launcher_icon(size)
     
     # Create circular mask
-    mask = Image.new('L', (size, size), 0)
-    draw = ImageDraw.Draw(mask)
-    draw.ellipse((0, 0, size, size), fill=255)
+    mask = circle_mask(size)
     
     # Apply mask to create round icon
     output = Image.new('RGBA', (size, size), (0, 0, 0, 0))
@@ -67,27 +71,41 @@ def create_round_icon(size):
     
     return output
 
-def main():
-    print("Fixing Android launcher icons...")
+def save_launcher_icons(density, size):
+    """Create and save the square and round icons for one density"""
+    # Square icon
+    icon = create_launcher_icon(size)
+    icon_path = f"{res_dir}/mipmap-{density}/ic_launcher.png"
+    save_image(icon, icon_path)
+    print(f"✅ Created {icon_path} ({size}x{size})")
     
+    # Round icon
+    round_icon = create_round_icon(size)
+    round_icon_path = f"{res_dir}/mipmap-{density}/ic_launcher_round.png"
+    save_image(round_icon, round_icon_path)
+    print(f"✅ Created {round_icon_path} ({size}x{size})")
+
+launcher_outputs = [
+    f"{res_dir}/mipmap-{density}/{name}.png"
+    for density in icon_sizes
+    for name in ("ic_launcher", "ic_launcher_round")
+]
+
+@incremental(launcher_outputs)
+def create_launcher_icons():
+    """Create the square and round launcher icons for every density"""
     # Create directories if they don't exist
     for density in icon_sizes:
         dir_path = f"{res_dir}/mipmap-{density}"
         os.makedirs(dir_path, exist_ok=True)
     
     # Generate icons for each density
-    for density, size in icon_sizes.items():
-        # Square icon
-        icon = create_launcher_icon(size)
-        icon_path = f"{res_dir}/mipmap-{density}/ic_launcher.png"
-        icon.save(icon_path, "PNG", optimize=True)
-        print(f"✅ Created {icon_path} ({size}x{size})")
-        
-        # Round icon
-        round_icon = create_round_icon(size)
-        round_icon_path = f"{res_dir}/mipmap-{density}/ic_launcher_round.png"
-        round_icon.save(round_icon_path, "PNG", optimize=True)
-        print(f"✅ Created {round_icon_path} ({size}x{size})")
+    run_tasks(task(save_launcher_icons, density, size) for density, size in icon_sizes.items())
+
+def main():
+    print("Fixing Android launcher icons...")
+    
+    create_launcher_icons()
     
     print("\n✅ All launcher icons fixed!")
 
@@ -0,0 +1,118 @@
+"""
+Process-wide registry of fonts used by the graphics generators
+
+Fonts are requested by role ("sans", "sans-bold") rather than by path. Each
+role is resolved to the first candidate font file that loads, once per run,
+and a fallback is reported the first time it is used. Font files are read
+from disk once and every (file, size) face is created once, so rendering many
+screenshots at a handful of sizes no longer reparses DejaVu for each one.
+"""
+
+import io
+import os
+import sys
+import threading
+
+from PIL import ImageFont
+
+DEJAVU_DIR = "/usr/share/fonts/truetype/dejavu"
+
+# Candidate font files per role, in order of preference. Bare file names are
+# looked up in the system font directories by Pillow.
+FONT_CANDIDATES = {
+    "sans": [
+        os.path.join(DEJAVU_DIR, "DejaVuSans.ttf"),
+        "/usr/share/fonts/truetype/liberation/LiberationSans-Regular.ttf",
+        "DejaVuSans.ttf",
+        "Arial.ttf",
+    ],
+    "sans-bold": [
+        os.path.join(DEJAVU_DIR, "DejaVuSans-Bold.ttf"),
+        "/usr/share/fonts/truetype/liberation/LiberationSans-Bold.ttf",
+        "DejaVuSans-Bold.ttf",
+        "Arial Bold.ttf",
+    ],
+}
+
+# Used when none of a role's candidates can be loaded
+BUILTIN_FONT = "<pillow default>"
+
+
+class FontRegistry:
+    """Resolves font roles once and memoizes sized faces"""
+
+    def __init__(self, candidates=FONT_CANDIDATES):
+        self.candidates = candidates
+        self._resolved = {}
+        self._data = {}
+        self._faces = {}
+        self._lock = threading.RLock()
+
+    def _font_bytes(self, path):
+        """Return the contents of a font file, reading it only once"""
+        data = self._data.get(path)
+        if data is None:
+            filename = path
+            if not os.path.isabs(filename):
+                # Let Pillow search the system font directories for bare names
+                filename = ImageFont.truetype(filename, 10).path
+            with open(filename, "rb") as f:
+                data = f.read()
+            self._data[path] = data
+        return data
+
+    def _load(self, path, size):
+        if path == BUILTIN_FONT:
+            return ImageFont.load_default(size)
+        return ImageFont.truetype(io.BytesIO(self._font_bytes(path)), size)
+
+    def resolve(self, role):
+        """Return the font file used for role, falling back down its candidate list"""
+        with self._lock:
+            path = self._resolved.get(role)
+            if path is not None:
+                return path
+
+            if role not in self.candidates:
+                raise KeyError(f"unknown font role: {role}")
+
+            candidates = self.candidates[role]
+            path = BUILTIN_FONT
+            for candidate in candidates:
+                try:
+                    self._font_bytes(candidate)
+                except OSError:
+                    continue
+                path = candidate
+                break
+
+            if path != candidates[0]:
+                print(f"⚠️  Font '{role}': {candidates[0]} not available, using {path}",
+                      file=sys.stderr)
+            self._resolved[role] = path
+            return path
+
+    def font(self, role, size):
+        """Return the shared face for role at size; do not modify it"""
+        size = int(size)
+        with self._lock:
+            path = self.resolve(role)
+            face = self._faces.get((path, size))
+            if face is None:
+                face = self._load(path, size)
+                self._faces[(path, size)] = face
+            return face
+
+    def resolved(self):
+        """Return {role: font file} for every role resolved so far"""
+        with self._lock:
+            return dict(self._resolved)
+
+
+# Shared by every generator running in this process
+font_registry = FontRegistry()
+
+
+def get_font(role, size):
+    """Return the process-wide face for a font role at size"""
+    return font_registry.font(role, size)
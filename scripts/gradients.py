@@ -0,0 +1,186 @@
+"""
+Shared gradient engine for the asset generator scripts
+
+Gradients are built as whole arrays: every pixel gets a position along the
+gradient axis (or its distance/angle from a center for radial and conic
+gradients), that position indexes a lookup table computed once per color
+pair, and the result is handed to PIL in a single call.
+"""
+
+from functools import lru_cache
+import math
+
+import numpy as np
+from PIL import Image
+
+from stage_timing import timed
+
+
+def _channels(color):
+    """Return a color as a tuple of floats"""
+    return tuple(float(c) for c in color)
+
+
+@lru_cache(maxsize=256)
+def _stop_lut(stops, steps):
+    positions = np.array([p for p, _ in stops], dtype=np.float64)
+    colors = np.array([c for _, c in stops], dtype=np.float64)
+    t = np.arange(steps, dtype=np.float64) / steps
+
+    lut = np.empty((steps, colors.shape[1]), dtype=np.float64)
+    for channel in range(colors.shape[1]):
+        lut[:, channel] = np.interp(t, positions, colors[:, channel])
+
+    # Truncate like int() did in the old per-row loops
+    lut = np.clip(np.trunc(lut), 0, 255).astype(np.uint8)
+    lut.setflags(write=False)
+    return lut
+
+
+def gradient_lut(start_color, end_color, steps=256):
+    """Return a read-only (steps, channels) uint8 table from start to end color"""
+    if len(start_color) != len(end_color):
+        raise ValueError("start_color and end_color must have the same number of channels")
+    return _stop_lut(((0.0, _channels(start_color)), (1.0, _channels(end_color))), int(steps))
+
+
+def multi_stop_lut(stops, steps=256):
+    """Return a read-only lookup table for a list of (position, color) stops"""
+    stops = sorted((float(p), _channels(c)) for p, c in stops)
+    if len(stops) < 2:
+        raise ValueError("a gradient needs at least two stops")
+    if len({len(c) for _, c in stops}) != 1:
+        raise ValueError("all stops must have the same number of channels")
+    return _stop_lut(tuple(stops), int(steps))
+
+
+def _gradient_indices(width, height, angle, steps, rows=None):
+    """Return LUT indices for every pixel, broadcastable to (rows, width)
+
+    rows is a (top, bottom) range of the full height to compute, or None for all.
+    """
+    top, bottom = rows or (0, height)
+    # Axis-aligned gradients only need a single row or column
+    if angle % 360 == 90:
+        idx = np.arange(top, bottom) * steps // height
+        return idx[:, None]
+    if angle % 360 == 270:
+        idx = (height - 1 - np.arange(top, bottom)) * steps // height
+        return idx[:, None]
+    if angle % 360 == 0:
+        idx = np.arange(width) * steps // width
+        return idx[None, :]
+    if angle % 360 == 180:
+        idx = (width - 1 - np.arange(width)) * steps // width
+        return idx[None, :]
+
+    # Project every pixel onto the gradient direction
+    rad = math.radians(angle)
+    dx, dy = math.cos(rad), math.sin(rad)
+    corners = [0.0, width * dx, height * dy, width * dx + height * dy]
+    p_min, p_max = min(corners), max(corners)
+
+    xs = np.arange(width, dtype=np.float32) * dx
+    ys = np.arange(top, bottom, dtype=np.float32) * dy
+    t = (ys[:, None] + xs[None, :] - p_min) / (p_max - p_min)
+    return np.clip((t * steps).astype(np.int32), 0, steps - 1)
+
+
+def _default_steps(width, height, angle):
+    """One table entry per pixel along the gradient axis"""
+    rad = math.radians(angle)
+    return max(1, int(math.ceil(abs(width * math.cos(rad)) + abs(height * math.sin(rad)) - 1e-6)))
+
+
+def _render(width, height, lut, angle, rows=None):
+    idx = _gradient_indices(width, height, angle, lut.shape[0], rows)
+    pixels = lut[idx]
+    band_height = rows[1] - rows[0] if rows else height
+    if pixels.shape[:2] != (band_height, width):
+        pixels = np.broadcast_to(pixels, (band_height, width, lut.shape[1]))
+    return Image.fromarray(np.ascontiguousarray(pixels))
+
+
+@timed("gradient")
+def linear_gradient(width, height, start_color, end_color, angle=90, steps=None, rows=None):
+    """Create a two-color linear gradient image
+
+    The angle is in degrees: 90 runs top to bottom, 0 runs left to right.
+    RGB colors give an RGB image, RGBA colors give an RGBA image. rows=(top,
+    bottom) renders only that band of the full-size gradient.
+    """
+    if steps is None:
+        steps = _default_steps(width, height, angle)
+    return _render(width, height, gradient_lut(start_color, end_color, steps), angle, rows)
+
+
+@timed("gradient")
+def multi_stop_gradient(width, height, stops, angle=90, steps=None, rows=None):
+    """Create a linear gradient through (position, color) stops in [0, 1]"""
+    if steps is None:
+        steps = _default_steps(width, height, angle)
+    return _render(width, height, multi_stop_lut(stops, steps), angle, rows)
+
+
+def _center_offsets(width, height, center):
+    """Return per-column and per-row offsets of pixel centers from center"""
+    if center is None:
+        center = (width / 2, height / 2)
+    cx, cy = center
+    xs = np.arange(width, dtype=np.float32) + 0.5 - cx
+    ys = np.arange(height, dtype=np.float32) + 0.5 - cy
+    return xs[None, :], ys[:, None]
+
+
+@timed("gradient")
+def radial_gradient(width, height, inner_color, outer_color, center=None, radius=None,
+                    clip=False, antialias=True, steps=None):
+    """Create a radial gradient from inner_color at the center to outer_color at radius
+
+    Each pixel's distance from the center is computed in one pass. With clip=True
+    everything outside the radius is transparent and the result is always RGBA;
+    antialias gives the edge fractional coverage instead of a hard step.
+    """
+    if radius is None:
+        radius = min(width, height) / 2
+    if steps is None:
+        steps = max(1, int(math.ceil(radius)))
+    lut = gradient_lut(inner_color, outer_color, steps)
+
+    xs, ys = _center_offsets(width, height, center)
+    distance = np.hypot(xs, ys)
+    idx = np.minimum((distance * (steps / radius)).astype(np.int32), steps - 1)
+    pixels = lut[idx]
+
+    if clip:
+        if antialias:
+            coverage = np.clip(radius - distance + 0.5, 0.0, 1.0)
+        else:
+            coverage = (distance <= radius).astype(np.float32)
+        if pixels.shape[2] == 4:
+            alpha = pixels[:, :, 3] * coverage
+            pixels = pixels.copy()
+        else:
+            alpha = 255 * coverage
+            pixels = np.concatenate([pixels, np.empty((height, width, 1), dtype=np.uint8)], axis=2)
+        pixels[:, :, 3] = (alpha + 0.5).astype(np.uint8)
+
+    return Image.fromarray(pixels)
+
+
+@timed("gradient")
+def conic_gradient(width, height, start_color, end_color, center=None, start_angle=0,
+                   steps=None):
+    """Create a conic (angular) gradient sweeping clockwise around the center
+
+    start_angle is in degrees, 0 pointing right and 90 pointing down.
+    """
+    if steps is None:
+        steps = max(360, int(math.ceil(math.pi * max(width, height))))
+    lut = gradient_lut(start_color, end_color, steps)
+
+    xs, ys = _center_offsets(width, height, center)
+    angle = np.degrees(np.arctan2(ys, xs)) - start_angle
+    t = np.mod(angle, 360.0) / 360.0
+    idx = np.minimum((t * steps).astype(np.int32), steps - 1)
+    return Image.fromarray(lut[idx])
@@ -0,0 +1,62 @@
+"""
+Memoized layer graph for multi-output icon generators
+
+A layer is a function decorated with @layer(dep, ...). Calling it computes
+each dependency layer first, passes their values in as leading arguments and
+caches the result for the rest of the process, keyed by any extra call
+arguments. Every output that needs the layer shares that one render.
+
+Layers are computed in the calling process. Call them before handing work
+to the render pool so forked workers inherit the rendered values.
+
+A layer's value depends only on the generator code, and long-running
+processes (render daemon, watch mode) restart when that code changes, so
+values are kept until clear_layers() is called for a forced rebuild.
+"""
+
+from functools import update_wrapper
+import threading
+
+# Every layer in creation order, so dependencies come before their dependents
+_layers = []
+
+
+class Layer:
+    """A memoized node in the layer graph"""
+
+    def __init__(self, func, deps=()):
+        self.func = func
+        self.deps = tuple(deps)
+        self._values = {}
+        self._lock = threading.RLock()
+        update_wrapper(self, func)
+        _layers.append(self)
+
+    def __call__(self, *args):
+        """Return the shared value of this layer for args; do not modify it"""
+        with self._lock:
+            if args not in self._values:
+                inputs = [dep() for dep in self.deps]
+                self._values[args] = self.func(*inputs, *args)
+            return self._values[args]
+
+    def __repr__(self):
+        return f"<layer {self.__name__}>"
+
+    def clear(self):
+        """Forget computed values so the next call renders again"""
+        with self._lock:
+            self._values.clear()
+
+
+def clear_layers():
+    """Forget every layer's values so the next run renders them again"""
+    for node in _layers:
+        node.clear()
+
+
+def layer(*deps):
+    """Decorator turning a render function into a memoized layer fed by deps"""
+    def decorator(func):
+        return Layer(func, deps)
+    return decorator
@@ -0,0 +1,459 @@
+#!/usr/bin/env python3
+"""
+Content-addressed output writes for generated files
+
+Every generated file is written through here, identified by the SHA-256 of
+its bytes. A destination that already holds those bytes is left alone, so a
+step that re-renders identical pixels neither rewrites nor touches the file.
+How changed destinations are written is chosen with LINKNODE_OUTPUT_LINK:
+
+    auto      reflink (copy-on-write clone) where the filesystem supports it,
+              else a plain copy (the default; probed once per process)
+    reflink   reflink only; fail where it is not supported
+    hardlink  hardlink only; fail across filesystems
+    copy      always an independent copy
+
+In copy mode the bytes go straight to the destination and nothing is kept
+in .asset-store/. In the link modes each file is stored once as a blob
+named by its digest and the destinations are linked to it, so identical
+outputs (the Play icon in fastlane and in store_graphics, the two adaptive
+icon XMLs) share their storage; blobs are only written when a link is made.
+
+Reflinks are independent files, so editing a destination never touches the
+store. A hardlinked destination is the blob itself: a tool that writes into
+it in place changes the blob, and the read-only mode of blobs does not stop
+a process running as root. Hardlinks are therefore opt-in, and a blob is
+hashed again before it is reused whenever its size or mtime changed since
+this process last checked it. Tools outside this package should write to a
+temporary file and store it with
+
+    python scripts/output_store.py --put TEMP_FILE DEST [DEST ...]
+
+The store also remembers encodings: png_encode keys each image by its pixels
+and encode settings, so an image that was already encoded the same way (a
+second save of the same icon, or a step that re-renders identical pixels
+after a code change) is copied or linked from the earlier result instead of
+being encoded again. The earlier result is the blob, or in copy mode the
+output file it was written to, and is only used while its size and mtime
+are unchanged. LINKNODE_ASSETS_FORCE=1 skips these remembered encodings as
+well.
+
+asset_pipeline.py removes blobs and encodings that no build manifest entry
+refers to any more after every run; to do it by hand:
+
+    python scripts/output_store.py --prune
+"""
+
+import argparse
+import errno
+import hashlib
+import json
+import os
+import shutil
+import stat
+import sys
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+store_dir = os.path.join(project_root, ".asset-store")
+blob_dir = os.path.join(store_dir, "blobs")
+encoding_dir = os.path.join(store_dir, "encodings")
+
+LINK_MODES = ("auto", "reflink", "hardlink", "copy")
+DEFAULT_LINK_MODE = "auto"
+
+# Linux ioctl that clones one file's extents into another (btrfs, XFS, ...)
+FICLONE = 0x40049409
+
+
+def force_rebuild():
+    """True when LINKNODE_ASSETS_FORCE asks for everything to be rebuilt"""
+    return os.environ.get("LINKNODE_ASSETS_FORCE", "") not in ("", "0")
+
+
+def link_mode():
+    """Return the LINKNODE_OUTPUT_LINK setting"""
+    mode = os.environ.get("LINKNODE_OUTPUT_LINK", "").strip().lower() or DEFAULT_LINK_MODE
+    if mode not in LINK_MODES:
+        raise ValueError(f"LINKNODE_OUTPUT_LINK must be one of {', '.join(LINK_MODES)}, not {mode!r}")
+    return mode
+
+
+def blob_path(digest):
+    return os.path.join(blob_dir, digest[:2], digest)
+
+
+def _temp_path(path):
+    return f"{path}.{os.getpid()}.tmp"
+
+
+def _replace(tmp_path, path):
+    """Move tmp_path over path, cleaning up on failure"""
+    try:
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _write_file(path, data=None, source=None, readonly=False):
+    """Atomically replace path with data, or with a copy of the file source"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = _temp_path(path)
+    try:
+        if source is None:
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+        else:
+            shutil.copyfile(source, tmp_path)
+        if readonly:
+            os.chmod(tmp_path, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    _replace(tmp_path, path)
+
+
+# Digest of every file this process wrote or hashed, with the stat it had then
+_known = {}
+
+
+def _stat_key(st):
+    return st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns
+
+
+def _remember(path, digest):
+    _known[os.path.abspath(path)] = (_stat_key(os.stat(path)), digest)
+
+
+def file_digest(path):
+    """SHA-256 of a file, hashed again only if it changed since this process last saw it"""
+    path = os.path.abspath(path)
+    key = _stat_key(os.stat(path))
+    known = _known.get(path)
+    if known and known[0] == key:
+        return known[1]
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            sha.update(chunk)
+    digest = sha.hexdigest()
+    _known[path] = (key, digest)
+    return digest
+
+
+def holds(path, digest, size):
+    """True if path is a file already holding the size bytes with this digest"""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return False
+    if not stat.S_ISREG(st.st_mode) or st.st_size != size:
+        return False
+    return file_digest(path) == digest
+
+
+# Link mode that auto resolved to, per store directory
+_resolved_auto = {}
+
+
+def _reflink_works():
+    """Try one reflink inside the store"""
+    os.makedirs(store_dir, exist_ok=True)
+    source = _temp_path(os.path.join(store_dir, "reflink-probe"))
+    clone = source + ".clone"
+    try:
+        with open(source, "wb") as f:
+            f.write(b"probe")
+        _reflink(source, clone)
+        return True
+    except OSError:
+        return False
+    finally:
+        for path in (source, clone):
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def active_link_mode():
+    """Return how this process writes changed destinations: reflink, hardlink or copy"""
+    mode = link_mode()
+    if mode != "auto":
+        return mode
+    if store_dir not in _resolved_auto:
+        _resolved_auto[store_dir] = "reflink" if _reflink_works() else "copy"
+    return _resolved_auto[store_dir]
+
+
+def put(data):
+    """Store bytes as a blob and return their digest"""
+    digest = hashlib.sha256(data).hexdigest()
+    path = blob_path(digest)
+    if not holds(path, digest, len(data)):
+        _write_file(path, data, readonly=True)
+        _remember(path, digest)
+    return digest
+
+
+def _reflink(source, dest):
+    if fcntl is None or not hasattr(fcntl, "ioctl"):
+        raise OSError(errno.EOPNOTSUPP, "reflinks are not supported on this platform")
+    with open(source, "rb") as src, open(dest, "wb") as dst:
+        fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+
+
+def _link(source, dest, mode):
+    """Create dest from source; an auto-detected reflink falls back to a copy"""
+    if mode == "reflink":
+        try:
+            _reflink(source, dest)
+            return
+        except OSError:
+            if os.path.exists(dest):
+                os.remove(dest)
+            if link_mode() == "reflink":
+                raise
+    elif mode == "hardlink":
+        os.link(source, dest)
+        return
+    shutil.copyfile(source, dest)
+
+
+def materialize(digest, path):
+    """Make path hold the blob for digest, replacing whatever was there"""
+    source = blob_path(digest)
+    try:
+        if os.path.samefile(source, path):
+            return
+    except FileNotFoundError:
+        pass
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = _temp_path(path)
+    _link(source, tmp_path, active_link_mode())
+    _replace(tmp_path, path)
+    _remember(path, digest)
+
+
+def write_bytes(path, data):
+    """Write data to path unless it already holds it; return the digest"""
+    digest = hashlib.sha256(data).hexdigest()
+    if holds(path, digest, len(data)):
+        return digest
+    if active_link_mode() == "copy":
+        _write_file(path, data)
+        _remember(path, digest)
+    else:
+        put(data)
+        materialize(digest, path)
+    return digest
+
+
+def write_text(path, text):
+    """Write UTF-8 text to path unless it already holds it; return the digest"""
+    return write_bytes(path, text.encode("utf-8"))
+
+
+def link_file(source, path, digest=None):
+    """Give path the same contents as the existing file source; return the digest
+
+    digest, if known, saves hashing source.
+    """
+    digest = digest or file_digest(source)
+    size = os.path.getsize(source)
+    if holds(path, digest, size):
+        return digest
+    if active_link_mode() == "copy":
+        _write_file(path, source=source)
+        _remember(path, digest)
+        return digest
+    blob = blob_path(digest)
+    if not holds(blob, digest, size):
+        _write_file(blob, source=source, readonly=True)
+        _remember(blob, digest)
+    materialize(digest, path)
+    return digest
+
+
+class OutputWriter:
+    """Stream bytes to path; once closed it is written as by write_bytes"""
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._hash = hashlib.sha256()
+        self._size = 0
+        self._tmp_path = f"{path}.{os.getpid()}-{id(self)}.tmp"
+        self._file = open(self._tmp_path, "wb")
+        self.digest = None
+
+    def write(self, data):
+        self._hash.update(data)
+        self._size += len(data)
+        self._file.write(data)
+
+    def close(self):
+        """Finish the file and return its digest"""
+        self._file.close()
+        self.digest = digest = self._hash.hexdigest()
+        try:
+            if holds(self.path, digest, self._size):
+                os.remove(self._tmp_path)
+            elif active_link_mode() == "copy":
+                _replace(self._tmp_path, self.path)
+                _remember(self.path, digest)
+            else:
+                blob = blob_path(digest)
+                if holds(blob, digest, self._size):
+                    os.remove(self._tmp_path)
+                else:
+                    os.chmod(self._tmp_path, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+                    os.makedirs(os.path.dirname(blob), exist_ok=True)
+                    _replace(self._tmp_path, blob)
+                    _remember(blob, digest)
+                materialize(digest, self.path)
+        except BaseException:
+            self.discard()
+            raise
+        return digest
+
+    def discard(self):
+        self._file.close()
+        if os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
+
+
+# Encoding memo: an encode key maps to the digest and extension of its result,
+# and a file holding it with the size and mtime that file had when recorded
+
+def _encoding_path(key):
+    return os.path.join(encoding_dir, key[:2], key)
+
+
+def _load_encoding(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def lookup_encoding(key):
+    """Return (digest, extension, source file) stored for key, or None
+
+    None also when the source file is gone or has changed since.
+    """
+    entry = _load_encoding(_encoding_path(key))
+    try:
+        st = os.stat(entry["source"])
+    except (TypeError, KeyError, FileNotFoundError):
+        return None
+    if (st.st_size, st.st_mtime_ns) != (entry["size"], entry["mtime_ns"]):
+        return None
+    return entry["digest"], entry["ext"], entry["source"]
+
+
+def remember_encoding(key, digest, ext, path):
+    """Record that key encodes to digest, as a file with extension ext just written to path
+
+    The blob is remembered as the source if one was kept, else path itself.
+    """
+    source = blob_path(digest)
+    if not os.path.exists(source):
+        source = os.path.abspath(path)
+    st = os.stat(source)
+    entry_path = _encoding_path(key)
+    os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+    tmp_path = _temp_path(entry_path)
+    with open(tmp_path, "w") as f:
+        json.dump({"digest": digest, "ext": ext, "source": source,
+                   "size": st.st_size, "mtime_ns": st.st_mtime_ns}, f)
+    _replace(tmp_path, entry_path)
+
+
+def prune(keep, before=None, keep_blobs=None):
+    """Remove blobs not in keep (a set of digests) and encodings that are stale or point elsewhere
+
+    keep_blobs, if given, replaces keep for blobs. Files modified at or after
+    before (a time.time() value) are left alone, so a run can prune without
+    touching what a concurrent run just stored. Return (files removed, bytes
+    freed).
+    """
+    keep_blobs = keep if keep_blobs is None else keep_blobs
+    removed = freed = 0
+    for directory in (blob_dir, encoding_dir):
+        for dirpath, _, filenames in os.walk(directory, topdown=False):
+            for name in filenames:
+                path = os.path.join(dirpath, name)
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                if before is not None and st.st_mtime >= before:
+                    continue
+                if directory == blob_dir:
+                    if name in keep_blobs:
+                        continue
+                else:
+                    found = lookup_encoding(name)
+                    if found and found[0] in keep:
+                        continue
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    continue
+                _known.pop(os.path.abspath(path), None)
+                freed += st.st_size
+                removed += 1
+            if dirpath != directory:
+                try:
+                    os.rmdir(dirpath)
+                except OSError:
+                    pass  # Not empty
+    return removed, freed
+
+
+def prune_unused(before=None):
+    """Prune everything the build manifest on disk does not refer to; return (files, bytes)"""
+    if not os.path.isdir(store_dir):
+        return 0, 0
+    from build_manifest import BuildManifest
+    keep = {entry.get("sha256") for entry in BuildManifest().entries.values()}
+    # Nothing is linked to blobs in copy mode
+    return prune(keep, before, keep_blobs=set() if active_link_mode() == "copy" else None)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Maintain the generated asset store")
+    parser.add_argument("--prune", action="store_true",
+                        help="remove blobs no build manifest entry refers to")
+    parser.add_argument("--put", nargs="+", metavar=("SOURCE", "DEST"),
+                        help="store the file SOURCE and write it to each DEST")
+    args = parser.parse_args(argv)
+
+    if args.put:
+        source, *destinations = args.put
+        if not destinations:
+            parser.error("--put needs a SOURCE and at least one DEST")
+        digest = file_digest(source)
+        for path in destinations:
+            link_file(source, path, digest)
+        return 0
+
+    if not args.prune:
+        parser.print_help()
+        return 0
+
+    removed, freed = prune_unused()
+    print(f"✅ Removed {removed} unused file(s) from {store_dir} ({freed / 1024:.0f} KB)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
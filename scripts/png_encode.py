@@ -0,0 +1,565 @@
+#!/usr/bin/env python3
+"""
+PNG encode stage shared by every generator
+
+Two modes, chosen with LINKNODE_PNG_MODE:
+
+    fast     low zlib effort (the default)
+    release  smallest lossless encoding: drop an alpha channel that is fully
+             opaque, store images with at most 256 colors as an exact palette,
+             try each zlib strategy at maximum effort and keep the smallest
+             result, and write no metadata chunks; for CI and release builds
+             (asset_pipeline.py --release)
+
+Set LINKNODE_PNG_QUANTIZE=1 to additionally allow lossy, Floyd-Steinberg
+dithered 256-color quantization in release mode; it is only kept when it is
+smaller than the best lossless encoding.
+
+Android resource images (res/mipmap-* and res/drawable*) saved through
+save_image may be written as WebP instead, chosen with LINKNODE_IMAGE_FORMAT:
+
+    png      always PNG (the default)
+    webp     WebP whenever it verifies within LINKNODE_WEBP_TOLERANCE
+    auto     whichever of PNG and verified WebP is smaller, per file
+
+Set LINKNODE_TILE_ROWS=N to render generators that support it (see
+tiled_canvas.py) N rows at a time into PNGStreamWriter, which filters and
+deflates each band as it arrives, so peak memory follows the band rather than
+the image. Streamed files skip the whole-image reductions and strategy trials
+of release mode and come out somewhat larger.
+
+The WebP file replaces the PNG of the same name (Android treats the two as
+duplicate resources) and the other one is removed. Play Store and docs
+images always stay PNG. See webp_encode.py for the WebP settings.
+
+Every file is written through the content-addressed output store (see
+output_store.py): a file that already holds the encoded bytes is not
+rewritten, and an image whose pixels were already encoded with the same
+settings is copied or linked from the earlier result instead of being
+encoded again.
+
+Generators run one render task per output, so encoding is already spread
+across the render pool. To re-encode existing files in parallel:
+
+    python scripts/png_encode.py [--mode fast|release] [--quantize] [--format png|webp|auto] FILE...
+"""
+
+import argparse
+import hashlib
+import io
+import os
+import struct
+import sys
+import zlib
+
+import numpy as np
+from PIL import Image
+
+import output_store
+from render_pool import RenderError, run_tasks, task
+from stage_timing import stage
+from webp_encode import verified_webp, webp_tolerance
+
+MODES = ("fast", "release")
+DEFAULT_MODE = "fast"
+
+FORMATS = ("png", "webp", "auto")
+DEFAULT_FORMAT = "png"
+
+# Pixels per band when reduce_lossless scans an image
+REDUCE_BAND_PIXELS = 1 << 18
+
+# zlib level used by fast mode
+FAST_COMPRESS_LEVEL = 1
+
+# zlib strategies tried by release mode
+RELEASE_STRATEGIES = (
+    zlib.Z_DEFAULT_STRATEGY,
+    zlib.Z_FILTERED,
+    zlib.Z_RLE,
+)
+
+
+def encode_mode():
+    """Return the encode mode selected by LINKNODE_PNG_MODE"""
+    mode = os.environ.get("LINKNODE_PNG_MODE", DEFAULT_MODE).strip().lower() or DEFAULT_MODE
+    if mode not in MODES:
+        raise ValueError(f"LINKNODE_PNG_MODE must be one of {', '.join(MODES)}, not {mode!r}")
+    return mode
+
+
+def quantize_enabled():
+    return os.environ.get("LINKNODE_PNG_QUANTIZE", "") not in ("", "0")
+
+
+def image_format():
+    """Return the resource image format selected by LINKNODE_IMAGE_FORMAT"""
+    fmt = os.environ.get("LINKNODE_IMAGE_FORMAT", DEFAULT_FORMAT).strip().lower() or DEFAULT_FORMAT
+    if fmt not in FORMATS:
+        raise ValueError(f"LINKNODE_IMAGE_FORMAT must be one of {', '.join(FORMATS)}, not {fmt!r}")
+    return fmt
+
+
+def tile_rows():
+    """Band height selected by LINKNODE_TILE_ROWS, or 0 to render whole images"""
+    value = os.environ.get("LINKNODE_TILE_ROWS", "").strip() or "0"
+    try:
+        rows = int(value)
+    except ValueError:
+        rows = -1
+    if rows < 0:
+        raise ValueError(f"LINKNODE_TILE_ROWS must be a non-negative integer, not {value!r}")
+    return rows
+
+
+def encode_settings(paths=()):
+    """Everything that changes the encoded bytes of paths, for build manifest keys
+
+    The image format only counts when one of paths may be stored as WebP, so
+    switching formats does not invalidate outputs that are always PNG.
+    """
+    settings = {"mode": encode_mode(), "quantize": quantize_enabled()}
+    if tile_rows():
+        settings["tile_rows"] = tile_rows()
+    if image_format() != "png" and any(webp_allowed(path) for path in paths):
+        settings["format"] = image_format()
+        settings["webp_tolerance"] = webp_tolerance()
+    return settings
+
+
+def webp_allowed(path):
+    """True for Android resource images, which may be stored as WebP"""
+    parent = os.path.dirname(os.path.abspath(path))
+    folder = os.path.basename(parent)
+    return os.path.basename(os.path.dirname(parent)) == "res" and \
+        folder.startswith(("mipmap-", "drawable"))
+
+
+def written_path(path):
+    """Return the file a declared .png output was actually written to"""
+    stem, ext = os.path.splitext(path)
+    if ext == ".png" and not os.path.exists(path) and os.path.exists(stem + ".webp"):
+        return stem + ".webp"
+    return path
+
+
+def _strip(img):
+    """Return img without the metadata Pillow would carry into the file"""
+    if not img.info:
+        return img
+    img = img.copy()
+    img.info = {}
+    return img
+
+
+def _bands(img):
+    """Yield img as (rows, width, channels) uint8 arrays of REDUCE_BAND_PIXELS pixels or so"""
+    rows = max(1, REDUCE_BAND_PIXELS // max(1, img.width))
+    for top in range(0, img.height, rows):
+        band = np.asarray(img.crop((0, top, img.width, min(top + rows, img.height))))
+        yield band[:, :, None] if band.ndim == 2 else band
+
+
+def _color_keys(band, channels):
+    """Pack the given channels of every pixel in band into one integer"""
+    keys = np.zeros(band.shape[:2], dtype=np.uint32)
+    for c in channels:
+        keys = (keys << 8) | band[:, :, c]
+    return keys
+
+
+def reduce_lossless(img):
+    """Return the smallest pixel-exact representation of img
+
+    An opaque alpha channel is dropped, gray images become L/LA, and images
+    with at most 256 distinct colors become a palette image (with a tRNS
+    table when they have transparency). The image is scanned in bands and
+    color counting stops at the 257th color, so memory follows the band size
+    rather than the frame.
+    """
+    if img.mode not in ("RGB", "RGBA", "L", "LA"):
+        return img
+
+    has_alpha = img.mode in ("RGBA", "LA")
+    opaque, gray = has_alpha, img.mode in ("RGB", "RGBA")
+    for band in _bands(img):
+        if opaque and not (band[:, :, -1] == 255).all():
+            opaque = False
+        if gray and not ((band[:, :, 0] == band[:, :, 1]).all() and (band[:, :, 1] == band[:, :, 2]).all()):
+            gray = False
+        if not opaque and not gray:
+            break
+    has_alpha = has_alpha and not opaque
+    gray = gray or img.mode in ("L", "LA")
+    channels = ([0] if gray else [0, 1, 2]) + ([len(img.getbands()) - 1] if has_alpha else [])
+
+    # Distinct colors, band by band, until there are too many for a palette
+    palette_keys = None
+    if not (gray and not has_alpha):
+        palette_keys = np.empty(0, dtype=np.uint32)
+        for band in _bands(img):
+            palette_keys = np.union1d(palette_keys, _color_keys(band, channels))
+            if len(palette_keys) > 256:
+                palette_keys = None
+                break
+
+    if palette_keys is not None:
+        entries = np.stack(
+            [(palette_keys >> (8 * (len(channels) - 1 - c))) & 0xFF for c in range(len(channels))],
+            axis=1,
+        ).astype(np.uint8)
+        rgb = np.repeat(entries[:, :1], 3, axis=1) if gray else entries[:, :3]
+        indices = np.empty((img.height, img.width), dtype=np.uint8)
+        top = 0
+        for band in _bands(img):
+            indices[top:top + len(band)] = np.searchsorted(palette_keys, _color_keys(band, channels))
+            top += len(band)
+        reduced = Image.frombytes("P", img.size, indices.tobytes())
+        reduced.putpalette(rgb.tobytes())
+        if has_alpha:
+            reduced.info["transparency"] = entries[:, -1].tobytes()
+        return reduced
+
+    # Dropping an opaque alpha channel and converting gray RGB to L are exact
+    mode = ("LA" if has_alpha else "L") if gray else ("RGBA" if has_alpha else "RGB")
+    if mode == img.mode:
+        return img
+    return img.convert(mode)
+
+
+def quantize(img):
+    """Return a dithered 256-color palette version of img (lossy)"""
+    if img.mode == "RGBA":
+        return img.quantize(256, method=Image.Quantize.FASTOCTREE, dither=Image.Dither.FLOYDSTEINBERG)
+    return img.convert("RGB").quantize(256, method=Image.Quantize.MEDIANCUT,
+                                       dither=Image.Dither.FLOYDSTEINBERG)
+
+
+def _encode(img, **options):
+    buf = io.BytesIO()
+    if "transparency" in img.info:
+        options["transparency"] = img.info["transparency"]
+    img.save(buf, "PNG", **options)
+    return buf.getvalue()
+
+
+def _smallest_encoding(img):
+    return min((_encode(img, compress_level=9, compress_type=strategy)
+                for strategy in RELEASE_STRATEGIES), key=len)
+
+
+def encode_png(img, mode=None, allow_quantize=None, rgba=False):
+    """Return PNG bytes for img using the fast or release encoder
+
+    rgba=True always writes a 32-bit RGBA PNG, as the Play Store requires for
+    the app icon, so release mode only tries zlib strategies.
+    """
+    mode = mode or encode_mode()
+    if allow_quantize is None:
+        allow_quantize = quantize_enabled()
+
+    if rgba:
+        img = _strip(img.convert("RGBA"))
+        if mode == "fast":
+            return _encode(img, compress_level=FAST_COMPRESS_LEVEL)
+        return _smallest_encoding(img)
+
+    if mode == "fast":
+        return _encode(_strip(img), compress_level=FAST_COMPRESS_LEVEL)
+
+    reduced = reduce_lossless(_strip(img))
+    best = _smallest_encoding(reduced)
+    if allow_quantize and reduced.mode not in ("P", "L", "1"):
+        lossy = _smallest_encoding(quantize(reduced))
+        if len(lossy) < len(best):
+            best = lossy
+    return best
+
+
+_encoder_digest = None
+
+
+def _encoder_version():
+    """Hash of the encoder code and library versions, so encodings are redone when they change"""
+    global _encoder_digest
+    if _encoder_digest is None:
+        h = hashlib.sha256(f"pillow={Image.__version__};zlib={zlib.ZLIB_RUNTIME_VERSION}".encode())
+        for module_path in (__file__, os.path.join(os.path.dirname(__file__), "webp_encode.py")):
+            with open(module_path, "rb") as f:
+                h.update(f.read())
+        _encoder_digest = h.hexdigest()
+    return _encoder_digest
+
+
+def _image_key(img, settings):
+    """Key for img's pixels encoded with settings"""
+    h = hashlib.sha256(_encoder_version().encode())
+    h.update(repr((img.mode, img.size, settings)).encode())
+    if img.mode == "P":
+        h.update(img.palette.tobytes())
+    h.update(img.tobytes())
+    return h.hexdigest()
+
+
+def _stored_encoding(img, path, settings, encode):
+    """Return (path, write) for img encoded with settings
+
+    encode() returns (path, bytes) and only runs when these pixels have not
+    been encoded with these settings before, or when a rebuild is forced; the
+    stored result may have a different extension than path. write() puts the
+    result at the returned path through the output store.
+    """
+    key = _image_key(img, settings)
+    found = None if output_store.force_rebuild() else output_store.lookup_encoding(key)
+    if found:
+        digest, ext, source = found
+        path = os.path.splitext(path)[0] + ext
+        return path, lambda: output_store.link_file(source, path, digest)
+    path, data = encode()
+
+    def write():
+        digest = output_store.write_bytes(path, data)
+        output_store.remember_encoding(key, digest, os.path.splitext(path)[1], path)
+    return path, write
+
+
+def save_png(img, path, mode=None, rgba=False):
+    """Encode img and write it to path"""
+    mode = mode or encode_mode()
+    with stage("encode", file=path):
+        path, write = _stored_encoding(img, path, ("png", mode, quantize_enabled(), rgba),
+                                       lambda: (path, encode_png(img, mode, rgba=rgba)))
+    with stage("write", file=path):
+        write()
+
+
+def encode_image(img, path, mode=None, fmt=None, rgba=False):
+    """Return (path, bytes) for img: PNG at path, or WebP beside it if fmt allows
+
+    rgba applies to PNG results, as in encode_png.
+    """
+    mode = mode or encode_mode()
+    fmt = fmt or image_format()
+    if fmt == "png" or not webp_allowed(path):
+        return path, encode_png(img, mode, rgba=rgba)
+
+    webp_path = os.path.splitext(path)[0] + ".webp"
+    webp = verified_webp(img, webp_tolerance(), fast=mode == "fast")
+    if webp is None:
+        print(f"⚠️  WebP for {webp_path} is out of tolerance, keeping PNG", file=sys.stderr)
+        return path, encode_png(img, mode, rgba=rgba)
+    if fmt == "auto":
+        png = encode_png(img, mode, rgba=rgba)
+        if len(png) <= len(webp):
+            return path, png
+    return webp_path, webp
+
+
+def _write(path, write):
+    with stage("write", file=path):
+        write()
+    # A PNG and a WebP with the same name are duplicate Android resources
+    stem, ext = os.path.splitext(path)
+    other = stem + (".png" if ext == ".webp" else ".webp")
+    if ext in (".png", ".webp") and os.path.exists(other):
+        os.remove(other)
+
+
+def save_image(img, path, mode=None, rgba=False):
+    """Encode img as PNG or, for Android resources, possibly WebP; return the path written
+
+    path names the PNG; a WebP result goes next to it with a .webp extension.
+    """
+    mode = mode or encode_mode()
+    fmt = image_format()
+    if fmt == "png" or not webp_allowed(path):
+        # Same key as save_png, so saving one image to both shares the encode
+        settings = ("png", mode, quantize_enabled(), rgba)
+    else:
+        settings = (fmt, webp_tolerance(), mode, quantize_enabled(), rgba)
+    with stage("encode", file=path):
+        path, write = _stored_encoding(img, path, settings, lambda: encode_image(img, path, mode, fmt, rgba))
+    _write(path, write)
+    return path
+
+
+# PNG color type and channel count per image mode
+PNG_COLOR_TYPES = {"L": (0, 1), "RGB": (2, 3), "LA": (4, 2), "RGBA": (6, 4)}
+
+# Bytes of compressed data collected before an IDAT chunk is written
+IDAT_CHUNK_SIZE = 1 << 16
+
+
+def _chunk(kind, data):
+    return (struct.pack(">I", len(data)) + kind + data
+            + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF))
+
+
+def _filter_rows(rows, previous, bpp):
+    """PNG-filter a (rows, row_bytes) uint8 band, picking each row's filter like libpng
+
+    Every row gets the filter (None, Sub, Up, Average or Paeth) whose output has
+    the smallest sum of absolute signed values. previous is the row above the
+    band (zeros for the first band).
+    """
+    cur = rows.astype(np.int16)
+    up = np.vstack([previous[None, :], rows[:-1]]).astype(np.int16)
+    left = np.zeros_like(cur)
+    left[:, bpp:] = cur[:, :-bpp]
+    up_left = np.zeros_like(cur)
+    up_left[:, bpp:] = up[:, :-bpp]
+
+    p = left + up - up_left
+    pa, pb, pc = np.abs(p - left), np.abs(p - up), np.abs(p - up_left)
+    paeth = np.where((pa <= pb) & (pa <= pc), left, np.where(pb <= pc, up, up_left))
+
+    candidates = np.stack([
+        cur,
+        cur - left,
+        cur - up,
+        cur - (left + up) // 2,
+        cur - paeth,
+    ]).astype(np.uint8)
+    cost = np.abs(candidates.astype(np.int8).astype(np.int16)).sum(axis=2)
+    choice = cost.argmin(axis=0)
+    filtered = candidates[choice, np.arange(len(rows))]
+    return np.hstack([choice.astype(np.uint8)[:, None], filtered])
+
+
+class PNGStreamWriter:
+    """Write a PNG band by band without holding the whole image
+
+    Bands are filtered and deflated into a temporary file as they arrive, and
+    path is replaced through the output store once the stream is closed; the
+    fast/release mode picks the zlib level.
+    """
+
+    def __init__(self, path, width, height, mode="RGB", encode=None):
+        if mode not in PNG_COLOR_TYPES:
+            raise ValueError(f"cannot stream {mode} images to PNG")
+        self.path = path
+        self.width = width
+        self.height = height
+        self.mode = mode
+        color_type, self.channels = PNG_COLOR_TYPES[mode]
+        level = FAST_COMPRESS_LEVEL if (encode or encode_mode()) == "fast" else 9
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 15, 9)
+        self._pending = []
+        self._pending_size = 0
+        self._previous = np.zeros(width * self.channels, dtype=np.uint8)
+        self.rows_written = 0
+
+        self._file = output_store.OutputWriter(path)
+        self._file.write(b"\x89PNG\r\n\x1a\n")
+        self._file.write(_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, color_type, 0, 0, 0)))
+
+    def write(self, band):
+        """Append the next band of rows, an image of the full width"""
+        if band.mode != self.mode or band.width != self.width:
+            raise ValueError(f"band must be {self.mode} and {self.width} pixels wide")
+        with stage("encode", file=self.path):
+            rows = np.asarray(band).reshape(band.height, self.width * self.channels)
+            filtered = _filter_rows(rows, self._previous, self.channels)
+            self._previous = rows[-1].copy()
+            self._add(self._compressor.compress(filtered.tobytes()))
+        self.rows_written += band.height
+
+    def _add(self, data):
+        if data:
+            self._pending.append(data)
+            self._pending_size += len(data)
+        if self._pending_size >= IDAT_CHUNK_SIZE:
+            self._flush_idat()
+
+    def _flush_idat(self):
+        if self._pending:
+            with stage("write", file=self.path):
+                self._file.write(_chunk(b"IDAT", b"".join(self._pending)))
+            self._pending = []
+            self._pending_size = 0
+
+    def close(self):
+        """Finish the stream; every row must have been written"""
+        try:
+            if self.rows_written != self.height:
+                raise ValueError(f"{self.path}: wrote {self.rows_written} of {self.height} rows")
+            self._add(self._compressor.flush())
+            self._flush_idat()
+            self._file.write(_chunk(b"IEND", b""))
+        except BaseException:
+            self._file.discard()
+            raise
+        with stage("write", file=self.path):
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._file.discard()
+
+
+def optimize_file(path, mode=None, allow_quantize=None, fmt=None, rgba=False):
+    """Re-encode an existing image in place if that makes it smaller; return (before, after)
+
+    Android resource PNGs are converted to WebP when fmt (LINKNODE_IMAGE_FORMAT
+    by default) selects it. With rgba the result is always written, as a
+    32-bit RGBA PNG (see encode_png), whatever the original was.
+    """
+    with open(path, "rb") as f:
+        original = f.read()
+    with stage("encode", file=path), Image.open(io.BytesIO(original)) as img:
+        img.load()
+        png_path = os.path.splitext(path)[0] + ".png" if path.endswith(".webp") else path
+        fmt = fmt or image_format()
+        if fmt != "png" and webp_allowed(path):
+            new_path, data = encode_image(img, png_path, mode, fmt, rgba)
+        else:
+            new_path, data = png_path, encode_png(img, mode, allow_quantize, rgba)
+    # A format change always applies; a same-format re-encode only if smaller
+    if rgba or new_path != path or len(data) < len(original):
+        _write(new_path, lambda: output_store.write_bytes(new_path, data))
+        return len(original), len(data)
+    return len(original), len(original)
+
+
+def optimize_files(paths, mode=None, allow_quantize=None, fmt=None, rgba=False):
+    """Re-encode images in parallel on the render pool"""
+    mode = mode or encode_mode()
+    fmt = fmt or image_format()
+    return run_tasks(task(optimize_file, path, mode, allow_quantize, fmt, rgba) for path in paths)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Re-encode PNG and WebP files")
+    parser.add_argument("files", nargs="+")
+    parser.add_argument("--mode", choices=MODES, default=None,
+                        help="encoder mode (default: LINKNODE_PNG_MODE or fast)")
+    parser.add_argument("--quantize", action="store_true",
+                        help="allow lossy dithered 256-color quantization")
+    parser.add_argument("--format", choices=FORMATS, default=None,
+                        help="format for Android resource images (default: LINKNODE_IMAGE_FORMAT or png)")
+    parser.add_argument("--rgba", action="store_true",
+                        help="always write 32-bit RGBA PNGs (Play Store icons)")
+    args = parser.parse_args(argv)
+
+    try:
+        sizes = optimize_files(args.files, args.mode, args.quantize or None, args.format, args.rgba)
+    except RenderError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    total_before = total_after = 0
+    for path, (before, after) in zip(args.files, sizes):
+        total_before += before
+        total_after += after
+        print(f"{path}: {before:,} -> {after:,} bytes")
+    print(f"✅ {total_before:,} -> {total_after:,} bytes")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
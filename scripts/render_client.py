@@ -0,0 +1,80 @@
+"""
+Thin client for the warm render daemon (see render_daemon.py)
+
+Generator scripts call delegate_to_daemon() before importing anything heavy.
+If a daemon is listening for this checkout, the run is sent to it and the
+script exits with the daemon's result; otherwise the script runs normally.
+Only the standard library is used here so a delegated run never pays for
+PIL or numpy.
+
+Set LINKNODE_NO_DAEMON=1 to always run in-process.
+"""
+
+import json
+import os
+import socket
+import sys
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+socket_path = os.path.join(project_root, ".render-daemon.sock")
+
+# Settings that change what a job renders, passed through with every job
+FORWARDED_ENV = (
+    "LINKNODE_ASSETS_FORCE",
+    "LINKNODE_RENDER_WORKERS",
+    "LINKNODE_PNG_MODE",
+    "LINKNODE_PNG_QUANTIZE",
+    "LINKNODE_IMAGE_FORMAT",
+    "LINKNODE_WEBP_TOLERANCE",
+    "LINKNODE_TILE_ROWS",
+    "LINKNODE_OUTPUT_LINK",
+)
+
+
+def request(message, timeout=None):
+    """Send one JSON message to the daemon and return its JSON reply"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(socket_path)
+        sock.sendall(json.dumps(message).encode() + b"\n")
+        sock.shutdown(socket.SHUT_WR)
+        chunks = []
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    return json.loads(b"".join(chunks))
+
+
+def delegate_to_daemon(module_name, script_path):
+    """Run this script in the render daemon if one is listening, then exit"""
+    if module_name != "__main__" or not os.path.exists(socket_path):
+        return
+    if os.environ.get("LINKNODE_NO_DAEMON"):
+        return
+    # Tracing records the current process, so traced runs always happen locally
+    if os.environ.get("LINKNODE_TRACE") or "--trace" in sys.argv:
+        return
+    # Watch mode runs until interrupted and keeps its own warm process
+    if "--watch" in sys.argv:
+        return
+
+    job = {
+        "script": os.path.splitext(os.path.basename(script_path))[0],
+        "argv": sys.argv[1:],
+        "env": {name: os.environ[name] for name in FORWARDED_ENV if name in os.environ},
+    }
+    try:
+        reply = request(job)
+    except (OSError, ValueError):
+        # Stale socket or the daemon went away: render here instead
+        return
+    if reply.get("restart"):
+        # The daemon is reloading changed scripts; this run happens locally
+        return
+
+    sys.stdout.write(reply["output"])
+    sys.stdout.flush()
+    sys.exit(reply["code"])
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Warm render daemon for design iteration
+
+Keeps one Python process with the generators imported and their caches
+resident: fonts (font_registry), decoded sources and resize pyramids
+(source_cache, resize_pyramid) and memoized layers (layer_graph). The
+generator scripts hand their runs to it over a Unix socket in the project
+root (see render_client.py), so a repeated run skips interpreter start,
+imports, font parsing and logo decoding, and with the build manifest an
+unchanged run finishes in milliseconds.
+
+When any script in scripts/ changes, the daemon re-executes itself on the
+next job so it never renders with stale code; that one job runs locally.
+
+Usage:
+    python scripts/render_daemon.py start    # start in the background
+    python scripts/render_daemon.py serve    # run in the foreground
+    python scripts/render_daemon.py status
+    python scripts/render_daemon.py stop
+"""
+
+import argparse
+import contextlib
+import glob
+import importlib
+import inspect
+import io
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import traceback
+
+from render_client import FORWARDED_ENV, project_root, request, script_dir, socket_path
+
+log_path = os.path.join(project_root, ".render-daemon.log")
+
+# Entry scripts the daemon runs; each has a main() (optionally taking argv)
+SCRIPTS = [
+    "asset_pipeline",
+    "create_exact_linknode_icon",
+    "create_linknode_app_icon",
+    "create_official_linknode_icon",
+    "create_play_store_graphics",
+    "create_store_graphics",
+    "create_workflow_diagram",
+    "fix_launcher_icons",
+]
+
+# Seconds to wait for a background daemon to come up
+START_TIMEOUT = 30
+
+
+def code_version():
+    """Modification times of every script the daemon may have imported"""
+    return sorted(
+        (path, os.stat(path).st_mtime_ns)
+        for path in glob.glob(os.path.join(script_dir, "*.py"))
+    )
+
+
+def warm_up():
+    """Import every generator and load the shared fonts and sources"""
+    for name in SCRIPTS:
+        importlib.import_module(name)
+
+    from font_registry import FONT_CANDIDATES, font_registry
+    from resize_pyramid import source_pyramid
+
+    for role in FONT_CANDIDATES:
+        font_registry.resolve(role)
+    source_pyramid(os.path.join(project_root, "linknode_logo.jpg"))
+
+
+@contextlib.contextmanager
+def job_environment(env):
+    """Apply the client's LINKNODE_* settings for the duration of a job"""
+    saved = {name: os.environ.get(name) for name in FORWARDED_ENV}
+    for name in FORWARDED_ENV:
+        if name in env:
+            os.environ[name] = env[name]
+        else:
+            os.environ.pop(name, None)
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+def run_job(job):
+    """Run one script's main() in this process and return its exit code and output"""
+    from build_manifest import get_manifest, reset_manifest
+    from layer_graph import clear_layers
+
+    if job.get("script") not in SCRIPTS:
+        return {"code": 2, "output": f"render daemon: unknown script {job.get('script')!r}\n"}
+
+    out = io.StringIO()
+    with job_environment(job.get("env", {})), \
+            contextlib.redirect_stdout(out), contextlib.redirect_stderr(out):
+        try:
+            # Other processes may have rebuilt or deleted outputs since the last job
+            reset_manifest()
+            if get_manifest().force:
+                clear_layers()
+
+            main = importlib.import_module(job["script"]).main
+            if inspect.signature(main).parameters:
+                code = main(job.get("argv", []))
+            else:
+                code = main()
+        except SystemExit as e:
+            code = e.code
+        except Exception:
+            traceback.print_exc()
+            code = 1
+
+    if code is None:
+        code = 0
+    elif not isinstance(code, int):
+        out.write(f"{code}\n")
+        code = 1
+    return {"code": code, "output": out.getvalue()}
+
+
+def _read_message(conn):
+    chunks = []
+    while True:
+        chunk = conn.recv(65536)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        if chunk.endswith(b"\n"):
+            break
+    return json.loads(b"".join(chunks))
+
+
+def _daemon_running():
+    try:
+        request({"command": "ping"}, timeout=2)
+        return True
+    except (OSError, ValueError):
+        return False
+
+
+def serve():
+    """Listen on the project socket until stopped"""
+    if os.path.exists(socket_path):
+        if _daemon_running():
+            print(f"Render daemon already running on {socket_path}")
+            return 1
+        os.unlink(socket_path)
+
+    version = code_version()
+    started = time.time()
+    warm_up()
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    # Create the socket owner-only; a chmod after bind leaves a window where others can connect
+    umask = os.umask(0o077)
+    try:
+        server.bind(socket_path)
+    finally:
+        os.umask(umask)
+    server.listen()
+    print(f"🔥 Render daemon {os.getpid()} ready on {socket_path}", flush=True)
+
+    jobs = 0
+    restart = False
+    try:
+        while not restart:
+            conn, _ = server.accept()
+            with conn:
+                try:
+                    message = _read_message(conn)
+                except ValueError:
+                    continue
+
+                command = message.get("command")
+                if command == "ping":
+                    reply = {"pid": os.getpid(), "uptime_s": round(time.time() - started, 1), "jobs": jobs}
+                elif command == "stop":
+                    conn.sendall(json.dumps({"stopped": os.getpid()}).encode())
+                    break
+                elif code_version() != version:
+                    reply = {"restart": True}
+                    restart = True
+                else:
+                    reply = run_job(message)
+                    jobs += 1
+                    print(f"job {jobs}: {message.get('script')} -> {reply['code']}", flush=True)
+                conn.sendall(json.dumps(reply).encode())
+    finally:
+        server.close()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+    if restart:
+        print("Scripts changed, restarting", flush=True)
+        os.execv(sys.executable, [sys.executable, os.path.abspath(__file__), "serve"])
+    return 0
+
+
+def start():
+    """Start the daemon in the background and wait until it accepts jobs"""
+    if _daemon_running():
+        print(f"Render daemon already running on {socket_path}")
+        return 0
+    with open(log_path, "a") as log:
+        subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), "serve"],
+            stdin=subprocess.DEVNULL, stdout=log, stderr=subprocess.STDOUT,
+            start_new_session=True,
+        )
+    deadline = time.time() + START_TIMEOUT
+    while time.time() < deadline:
+        if _daemon_running():
+            print(f"✅ Render daemon started ({socket_path})")
+            return 0
+        time.sleep(0.1)
+    print(f"Error: render daemon did not start, see {log_path}", file=sys.stderr)
+    return 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Warm render daemon for the asset generators")
+    parser.add_argument("command", choices=["start", "serve", "status", "stop"])
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        return serve()
+    if args.command == "start":
+        return start()
+
+    try:
+        reply = request({"command": "ping" if args.command == "status" else "stop"}, timeout=5)
+    except (OSError, ValueError):
+        print("Render daemon is not running")
+        return 1 if args.command == "status" else 0
+    if args.command == "status":
+        print(f"Render daemon {reply['pid']} up {reply['uptime_s']}s, {reply['jobs']} jobs")
+    else:
+        print(f"Render daemon {reply['stopped']} stopped")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+"""
+Process-pool scheduler for independent render tasks
+
+Each output a generator writes (one density, one screenshot, one diagram) is
+wrapped in a task and the tasks run on a process pool sized to the available
+cores. Results and anything the tasks printed come back in submission order,
+so the log reads the same as a sequential run. A failing task does not stop
+the others; all failures are reported together at the end.
+
+Set LINKNODE_RENDER_WORKERS=1 to run everything in-process.
+"""
+
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+import contextlib
+import io
+import multiprocessing
+import os
+import traceback
+
+import stage_timing
+
+Task = namedtuple("Task", ["name", "func", "args", "kwargs"])
+
+
+def task(func, *args, name=None, **kwargs):
+    """Describe one independent render job; func must be a module-level function"""
+    if name is None:
+        # Keep names readable when images or other large objects are passed
+        simple = ", ".join(repr(a) for a in args if isinstance(a, (str, int, float)))
+        name = f"{func.__name__}({simple})"
+    return Task(name, func, args, kwargs)
+
+
+class RenderError(RuntimeError):
+    """One or more render tasks failed"""
+
+    def __init__(self, failures):
+        self.failures = failures
+        names = ", ".join(name for name, _ in failures)
+        super().__init__(f"{len(failures)} render task(s) failed: {names}")
+
+
+def worker_count(task_count=None):
+    """Number of worker processes to use for task_count tasks"""
+    env = os.environ.get("LINKNODE_RENDER_WORKERS")
+    if env:
+        workers = int(env)
+    elif hasattr(os, "sched_getaffinity"):
+        workers = len(os.sched_getaffinity(0))
+    else:
+        workers = os.cpu_count() or 1
+    if task_count is not None:
+        workers = min(workers, task_count)
+    return max(1, workers)
+
+
+def _run_captured(name, func, args, kwargs):
+    """Run one task, capturing its stdout and any exception"""
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        try:
+            with stage_timing.stage("task", target=name):
+                return True, func(*args, **kwargs), out.getvalue()
+        except Exception:
+            return False, traceback.format_exc(), out.getvalue()
+        finally:
+            stage_timing.flush()
+
+
+def _pool_context():
+    # fork shares already-decoded sources and fonts with the workers
+    if "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return multiprocessing.get_context()
+
+
+def run_tasks(tasks, workers=None):
+    """Run tasks in parallel and return their results in submission order
+
+    Raises RenderError after every task has finished if any of them failed.
+    """
+    tasks = list(tasks)
+    if workers is None:
+        workers = worker_count(len(tasks))
+
+    if workers <= 1 or len(tasks) <= 1:
+        outcomes = [_run_captured(t.name, t.func, t.args, t.kwargs) for t in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=_pool_context()) as pool:
+            futures = [pool.submit(_run_captured, t.name, t.func, t.args, t.kwargs) for t in tasks]
+            outcomes = []
+            for future in futures:
+                try:
+                    outcomes.append(future.result())
+                except Exception:
+                    # The worker died or the result could not be pickled
+                    outcomes.append((False, traceback.format_exc(), ""))
+
+    results = []
+    failures = []
+    for t, (ok, value, output) in zip(tasks, outcomes):
+        if output:
+            print(output, end="")
+        if ok:
+            results.append(value)
+        else:
+            print(f"❌ {t.name} failed:\n{value}")
+            failures.append((t.name, value))
+            results.append(None)
+
+    if failures:
+        raise RenderError(failures)
+    return results
@@ -0,0 +1,110 @@
+"""
+Multi-density resize pyramid for icon and mipmap generation
+
+A pyramid keeps a chain of box-filtered half-size levels of one source. Each
+requested size is produced once with LANCZOS from the smallest level that is
+still comfortably larger than the target, then reused by every icon variant
+that asks for it. Upscales always come straight from the source.
+
+Every size taken from a reduced level is checked once against a direct
+LANCZOS resize of the source; when the mean difference exceeds max_error the
+direct resize is used instead. The verdict is memoized with the size, and a
+pyramid lives as long as its source is unchanged, so the check runs once per
+source and size.
+"""
+
+import os
+import threading
+
+import numpy as np
+from PIL import Image
+
+from source_cache import load_source, source_cache
+from stage_timing import stage
+
+# Mean absolute difference from direct LANCZOS allowed per channel (0-255 scale)
+DEFAULT_MAX_ERROR = 1.0
+
+# A level is only used when it is at least this many times the target size
+DEFAULT_OVERSAMPLE = 3.0
+
+
+def resize_error(a, b):
+    """Return the mean absolute per-channel difference between two same-sized images"""
+    a = np.asarray(a, dtype=np.int16)
+    b = np.asarray(b, dtype=np.int16)
+    return float(np.abs(a - b).mean())
+
+
+class ResizePyramid:
+    """Memoized resizes of one source image through a shared filtered chain"""
+
+    def __init__(self, source, max_error=DEFAULT_MAX_ERROR, oversample=DEFAULT_OVERSAMPLE,
+                 verify=True):
+        self.source = source
+        self.max_error = max_error
+        self.oversample = oversample
+        self.verify = verify
+        self.levels = [source]
+        self.errors = {}
+        self._sizes = {}
+        self._lock = threading.Lock()
+
+    def _level_for(self, size):
+        """Return the smallest level at least oversample times the target size"""
+        width, height = size
+        min_width = width * self.oversample
+        min_height = height * self.oversample
+
+        level = self.levels[0]
+        for candidate in self.levels[1:]:
+            if candidate.width < min_width or candidate.height < min_height:
+                return level
+            level = candidate
+
+        # Extend the chain lazily, halving until the next level would be too small
+        while level.width // 2 >= min_width and level.height // 2 >= min_height:
+            level = level.reduce(2)
+            self.levels.append(level)
+        return level
+
+    def resize(self, size):
+        """Return the source resized to size; the result is shared, do not modify it"""
+        size = (int(size[0]), int(size[1]))
+        with self._lock:
+            result = self._sizes.get(size)
+            if result is not None:
+                return result
+
+            with stage("resize", size=f"{size[0]}x{size[1]}"):
+                level = self._level_for(size)
+                result = level.resize(size, Image.Resampling.LANCZOS)
+
+            if self.verify and level is not self.source:
+                direct = self.source.resize(size, Image.Resampling.LANCZOS)
+                error = resize_error(result, direct)
+                self.errors[size] = error
+                if error > self.max_error:
+                    result = direct
+
+            self._sizes[size] = result
+            return result
+
+
+# One pyramid per (path, mode, options), with the source digest it was built from
+_pyramids = {}
+
+
+def source_pyramid(path, mode="RGBA", **options):
+    """Return the shared pyramid for a cached source, rebuilt when the file changes
+
+    An edited source replaces its old pyramid rather than adding another, so a
+    long-running process (render daemon, watch mode) keeps one per source.
+    """
+    key = (os.path.realpath(path), mode, tuple(sorted(options.items())))
+    digest = source_cache.digest(path)
+    entry = _pyramids.get(key)
+    if entry is None or entry[0] != digest:
+        entry = (digest, ResizePyramid(load_source(path, mode), **options))
+        _pyramids[key] = entry
+    return entry[1]
@@ -0,0 +1,119 @@
+"""
+Locale x device screenshot matrix in Fastlane's layout
+
+Screenshots of one screen differ between locales only in their text. The
+matrix records each (device, screen) background template once, then for
+every locale copies it, draws that locale's text on top and writes
+
+    fastlane/metadata/android/<locale>/images/<device>/<n>_<locale>.png
+
+One render task covers one (device, screen) pair in every locale, so the
+template never leaves the worker that drew it.
+
+Screens are drawn on a TiledCanvas (tiled_canvas.py), so the large tablet
+sizes stream band by band when LINKNODE_TILE_ROWS is set. Otherwise the
+template is rendered once and every locale starts from that image.
+
+A screen is (template, overlay, text): template(width, height) returns the
+background as a TiledCanvas, overlay(canvas, width, height, text) draws the
+strings on it and text holds the default (en-US) strings. Translations are optional JSON files
+in fastlane/screenshot_text/<locale>.json mapping the screen number to the
+strings that differ, e.g. {"1": {"title": "Tableau de bord"}}; anything
+missing falls back to the defaults. Locales are the directories under
+fastlane/metadata/android.
+"""
+
+from functools import lru_cache
+import json
+import os
+
+from render_pool import run_tasks, task
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+metadata_dir = os.path.join(project_root, "fastlane", "metadata", "android")
+text_dir = os.path.join(project_root, "fastlane", "screenshot_text")
+
+DEFAULT_LOCALE = "en-US"
+
+# Fastlane image folder and portrait size for each device class
+DEVICE_TYPES = [
+    ("phoneScreenshots", 1080, 1920),
+    ("sevenInchScreenshots", 1200, 1920),
+    ("tenInchScreenshots", 1600, 2560),
+]
+
+
+def fastlane_locales():
+    """Every locale with a Fastlane metadata directory, default locale first"""
+    try:
+        names = os.listdir(metadata_dir)
+    except FileNotFoundError:
+        names = []
+    locales = sorted(name for name in names if os.path.isdir(os.path.join(metadata_dir, name)))
+    if DEFAULT_LOCALE in locales:
+        locales.remove(DEFAULT_LOCALE)
+    return [DEFAULT_LOCALE] + locales
+
+
+def text_path(locale):
+    return os.path.join(text_dir, f"{locale}.json")
+
+
+def text_sources(locales):
+    """Translation files that exist, for build manifest sources"""
+    return [text_path(locale) for locale in locales if os.path.exists(text_path(locale))]
+
+
+@lru_cache(maxsize=None)
+def _translations(locale):
+    try:
+        with open(text_path(locale)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def localized_text(locale, number, defaults):
+    """Strings for screen number in locale, falling back to defaults"""
+    text = dict(defaults)
+    text.update(_translations(locale).get(str(number), {}))
+    return text
+
+
+def screenshot_path(locale, device, number):
+    return os.path.join(metadata_dir, locale, "images", device, f"{number}_{locale}.png")
+
+
+def screenshot_outputs(screen_count, locales, devices=DEVICE_TYPES):
+    """Every file a matrix render writes"""
+    return [
+        screenshot_path(locale, device, number)
+        for device, _, _ in devices
+        for number in range(1, screen_count + 1)
+        for locale in locales
+    ]
+
+
+def render_screen(number, template, overlay, defaults, device, width, height, locales):
+    """Render one screen on one device for every locale from a single template"""
+    background = template(width, height)
+    if not background.streams():
+        background.flatten()
+    for locale in locales:
+        canvas = background.copy()
+        overlay(canvas, width, height, localized_text(locale, number, defaults))
+        path = screenshot_path(locale, device, number)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        canvas.save(path)
+        print(f"✅ Created screenshot {number}: {path}")
+
+
+def render_matrix(screens, locales, devices=DEVICE_TYPES):
+    """Render screens (a list of (template, overlay, text)) for every locale and device"""
+    run_tasks(
+        task(render_screen, number, template, overlay, defaults, device, width, height, locales,
+             name=f"render_screen({number}, {device!r})")
+        for device, width, height in devices
+        for number, (template, overlay, defaults) in enumerate(screens, 1)
+    )
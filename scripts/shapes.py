@@ -0,0 +1,180 @@
+"""
+Anti-aliased shape rasterizer
+
+Circles, ellipses, rounded rectangles and thick lines are drawn straight at
+the target size from the signed distance of each pixel center to the shape
+edge. Coverage is clip(0.5 - distance, 0, 1), a close approximation of the
+exact pixel area for edges that are straight or gently curved at pixel
+scale, so there is no need to draw at 4x and downscale. Only the shape's
+bounding box is evaluated.
+
+The functions mirror the ImageDraw calls they replace:
+
+    ImageDraw.ellipse(box, fill)            ->  ellipse(img, box, fill)
+    ImageDraw.rounded_rectangle(box, r, fill) -> rounded_rectangle(img, box, r, fill)
+    ImageDraw.line(xy, fill, width)         ->  line(img, xy, fill, width)
+
+Boxes are inclusive pixel coordinates like ImageDraw's, and line end points
+are pixel centers. The shape is alpha-composited over what is already there:
+unlike ImageDraw, a translucent fill stays translucent on RGB images too.
+
+origin places the image's top-left pixel in the shape's coordinates, for
+drawing one band of a larger canvas (tiled_canvas.py). Distances are then
+computed in canvas coordinates, so a band gets exactly the pixels the whole
+canvas would.
+"""
+
+import math
+
+import numpy as np
+from PIL import Image, ImageColor
+
+from stage_timing import timed
+
+
+def _box_region(img, left, top, right, bottom, origin=(0, 0)):
+    """Clip a float bounding box to the image; return integer (x0, y0, x1, y1) or None"""
+    ox, oy = origin
+    x0 = max(0, int(math.floor(left)) - 1 - ox)
+    y0 = max(0, int(math.floor(top)) - 1 - oy)
+    x1 = min(img.width, int(math.ceil(right)) + 1 - ox)
+    y1 = min(img.height, int(math.ceil(bottom)) + 1 - oy)
+    if x0 >= x1 or y0 >= y1:
+        return None
+    return x0, y0, x1, y1
+
+
+def _pixel_centers(region, origin=(0, 0)):
+    """Centers of the region's pixels in shape coordinates"""
+    x0, y0, x1, y1 = region
+    ox, oy = origin
+    xs = np.arange(x0 + ox, x1 + ox, dtype=np.float32) + 0.5
+    ys = np.arange(y0 + oy, y1 + oy, dtype=np.float32) + 0.5
+    return xs[None, :], ys[:, None]
+
+
+def coverage_from_distance(distance):
+    """Map signed distance to the edge (negative inside) to 0-1 pixel coverage"""
+    return np.clip(0.5 - distance, 0.0, 1.0)
+
+
+def _fill(img, region, coverage, fill):
+    """Blend fill into img over region using a float coverage array"""
+    x0, y0, x1, y1 = region
+    if isinstance(fill, str):
+        fill = ImageColor.getcolor(fill, "RGBA")
+    if isinstance(fill, int):
+        fill = (fill,) * 3 + (255,)
+    elif len(fill) == 3:
+        fill = tuple(fill) + (255,)
+
+    if img.mode == "RGBA":
+        alpha = (coverage * fill[3] + 0.5).astype(np.uint8)
+        layer = np.empty(alpha.shape + (4,), dtype=np.uint8)
+        layer[:, :, :3] = fill[:3]
+        layer[:, :, 3] = alpha
+        img.alpha_composite(Image.fromarray(layer), dest=(x0, y0))
+        return
+
+    mask = Image.fromarray((coverage * fill[3] + 0.5).astype(np.uint8))
+    color = fill[0] if img.mode in ("L", "1") else tuple(fill[:3])
+    img.paste(color, (x0, y0, x1, y1), mask)
+
+
+def ellipse_distance(xs, ys, cx, cy, rx, ry):
+    """Approximate signed distance to an axis-aligned ellipse (exact for circles)"""
+    dx = xs - cx
+    dy = ys - cy
+    if rx == ry:
+        return np.sqrt(dx * dx + dy * dy) - rx
+    f = (dx / rx) ** 2 + (dy / ry) ** 2 - 1
+    gradient = 2 * np.sqrt((dx / (rx * rx)) ** 2 + (dy / (ry * ry)) ** 2)
+    return f / np.maximum(gradient, 1e-6)
+
+
+@timed("shapes")
+def ellipse(img, box, fill, origin=(0, 0)):
+    """Draw an anti-aliased filled ellipse inside an inclusive box like ImageDraw.ellipse"""
+    left, top, right, bottom = box
+    # Pixel i spans [i, i + 1], so the inclusive box covers right + 1
+    right += 1
+    bottom += 1
+    region = _box_region(img, left, top, right, bottom, origin)
+    if region is None:
+        return
+    xs, ys = _pixel_centers(region, origin)
+    distance = ellipse_distance(xs, ys, (left + right) / 2, (top + bottom) / 2,
+                                (right - left) / 2, (bottom - top) / 2)
+    _fill(img, region, coverage_from_distance(distance), fill)
+
+
+@timed("shapes")
+def circle(img, center, radius, fill, origin=(0, 0)):
+    """Draw an anti-aliased filled circle around a point in continuous coordinates"""
+    cx, cy = center
+    region = _box_region(img, cx - radius, cy - radius, cx + radius, cy + radius, origin)
+    if region is None:
+        return
+    xs, ys = _pixel_centers(region, origin)
+    _fill(img, region, coverage_from_distance(ellipse_distance(xs, ys, cx, cy, radius, radius)), fill)
+
+
+@timed("shapes")
+def rounded_rectangle(img, box, radius, fill, origin=(0, 0)):
+    """Draw an anti-aliased filled rounded rectangle inside an inclusive box"""
+    left, top, right, bottom = box
+    right += 1
+    bottom += 1
+    region = _box_region(img, left, top, right, bottom, origin)
+    if region is None:
+        return
+    xs, ys = _pixel_centers(region, origin)
+    half_w = (right - left) / 2
+    half_h = (bottom - top) / 2
+    radius = max(0.0, min(radius, half_w, half_h))
+    qx = np.abs(xs - (left + right) / 2) - (half_w - radius)
+    qy = np.abs(ys - (top + bottom) / 2) - (half_h - radius)
+    outside = np.sqrt(np.maximum(qx, 0) ** 2 + np.maximum(qy, 0) ** 2)
+    inside = np.minimum(np.maximum(qx, qy), 0)
+    _fill(img, region, coverage_from_distance(outside + inside - radius), fill)
+
+
+@timed("shapes")
+def line(img, xy, fill, width=1, cap="butt", origin=(0, 0)):
+    """Draw an anti-aliased thick line through pixel-center points like ImageDraw.line
+
+    cap is "butt" (ends flush with the end points, as ImageDraw draws them) or
+    "round".
+    """
+    if len(xy) and not isinstance(xy[0], (tuple, list)):
+        xy = list(zip(xy[0::2], xy[1::2]))
+    half = width / 2
+    for (ax, ay), (bx, by) in zip(xy, xy[1:]):
+        ax, ay, bx, by = ax + 0.5, ay + 0.5, bx + 0.5, by + 0.5
+        region = _box_region(img, min(ax, bx) - half, min(ay, by) - half,
+                             max(ax, bx) + half, max(ay, by) + half, origin)
+        if region is None:
+            continue
+        xs, ys = _pixel_centers(region, origin)
+        length = math.hypot(bx - ax, by - ay)
+        if length == 0:
+            distance = np.sqrt((xs - ax) ** 2 + (ys - ay) ** 2) - half
+        else:
+            ux, uy = (bx - ax) / length, (by - ay) / length
+            along = (xs - ax) * ux + (ys - ay) * uy
+            across = np.abs((xs - ax) * -uy + (ys - ay) * ux)
+            if cap == "round":
+                along = np.clip(along, 0, length)
+                px = ax + along * ux - xs
+                py = ay + along * uy - ys
+                distance = np.sqrt(px * px + py * py) - half
+            else:
+                distance = np.maximum(across - half, np.abs(along - length / 2) - length / 2)
+        _fill(img, region, coverage_from_distance(distance), fill)
+
+
+def circle_mask(size):
+    """Return an L mask with an anti-aliased circle filling a size x size square"""
+    mask = Image.new("L", (size, size), 0)
+    circle(mask, (size / 2, size / 2), size / 2, 255)
+    return mask
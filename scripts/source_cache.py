@@ -0,0 +1,98 @@
+"""
+Process-wide cache of decoded source images (linknode_logo.jpg and friends)
+
+Sources are decoded once per content version and handed out as read-only
+views over the cached buffer. Pillow copies a view on first write, so callers
+can resize, paste from or convert it freely without touching the cache.
+"""
+
+from collections import OrderedDict
+import hashlib
+import os
+import threading
+
+import numpy as np
+from PIL import Image
+
+from stage_timing import stage
+
+# Default memory cap for decoded pixels
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+class SourceCache:
+    """LRU cache of decoded source images keyed by path, mtime and content hash"""
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._digests = {}
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def digest(self, path):
+        """Return the content hash of path, rehashing only when it changed on disk"""
+        path = os.path.realpath(path)
+        st = os.stat(path)
+        version = (path, st.st_mtime_ns, st.st_size)
+        digest = self._digests.get(path)
+        if digest is None or digest[0] != version:
+            with open(path, "rb") as f:
+                digest = (version, hashlib.sha256(f.read()).hexdigest())
+            self._digests[path] = digest
+        return digest[1]
+
+    def _load(self, path, mode):
+        key = (self.digest(path), mode)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+
+        with stage("decode", source=os.path.basename(path)), Image.open(path) as img:
+            decoded = img.convert(mode)
+        entry = (decoded.size, decoded.tobytes())
+
+        with self._lock:
+            self.misses += 1
+            if key not in self._entries:
+                self._entries[key] = entry
+                self.current_bytes += len(entry[1])
+                self._evict()
+        return entry
+
+    def _evict(self):
+        """Drop least recently used entries until under the memory cap"""
+        # Always keep the newest entry, even if it alone exceeds the cap
+        while self.current_bytes > self.max_bytes and len(self._entries) > 1:
+            _, (_, data) = self._entries.popitem(last=False)
+            self.current_bytes -= len(data)
+
+    def image(self, path, mode="RGBA"):
+        """Return a read-only PIL view of the decoded source"""
+        size, data = self._load(path, mode)
+        return Image.frombuffer(mode, size, data, "raw", mode, 0, 1)
+
+    def array(self, path, mode="RGBA"):
+        """Return a read-only (height, width, channels) uint8 array of the decoded source"""
+        (width, height), data = self._load(path, mode)
+        return np.frombuffer(data, dtype=np.uint8).reshape(height, width, -1)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._digests.clear()
+            self.current_bytes = 0
+
+
+# Shared by every generator running in this process
+source_cache = SourceCache()
+
+
+def load_source(path, mode="RGBA"):
+    """Load a decoded source image from the process-wide cache"""
+    return source_cache.image(path, mode)
@@ -0,0 +1,209 @@
+"""
+Opt-in per-stage timing for the asset generators
+
+Set LINKNODE_TRACE to a file name (or pass --trace to asset_pipeline.py) and
+every instrumented stage is recorded: decode, resize, gradient, shapes,
+network, text, composite, encode and write, plus the build manifest check
+("step") and each render task ("task"). When the run ends a Chrome trace-event JSON is written
+to that file (open it in chrome://tracing or https://ui.perfetto.dev) and a
+summary table with count, total and p95 per stage and per output is printed.
+
+Every event is attributed to an output: the file being written when known,
+otherwise the innermost render task or generator step. Render pool workers
+write their events to <trace>.parts/ and the main process merges them.
+
+When tracing is off, stage() returns a shared no-op context manager and
+@timed functions cost one flag check per call.
+"""
+
+import atexit
+import contextlib
+from functools import wraps
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+
+_trace_path = None
+_owner_pid = None
+_events = []
+_local = threading.local()
+
+
+def enabled():
+    return _trace_path is not None
+
+
+def enable(path):
+    """Start recording stages in this process and write the trace to path at exit"""
+    global _trace_path, _owner_pid
+    if _trace_path is not None:
+        return
+    _trace_path = os.path.abspath(path)
+    _owner_pid = os.getpid()
+    shutil.rmtree(_parts_dir(), ignore_errors=True)
+    atexit.register(finish)
+
+
+def _parts_dir():
+    return _trace_path + ".parts"
+
+
+def _targets():
+    stack = getattr(_local, "targets", None)
+    if stack is None:
+        stack = _local.targets = []
+    return stack
+
+
+class _Stage:
+    """Records one timed stage as a Chrome "complete" event"""
+
+    __slots__ = ("name", "args", "start")
+
+    def __init__(self, name, args):
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        targets = _targets()
+        if "target" not in self.args and targets:
+            self.args["target"] = targets[-1]
+        targets.append(self.args.get("file") or self.args.get("target"))
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter_ns()
+        _targets().pop()
+        _events.append({
+            "name": self.name,
+            "cat": "stage",
+            "ph": "X",
+            "ts": self.start / 1000,
+            "dur": (end - self.start) / 1000,
+            "pid": os.getpid(),
+            "tid": threading.get_ident() % 1_000_000,
+            "args": self.args,
+        })
+        return False
+
+
+_NULL_STAGE = contextlib.nullcontext()
+
+
+def stage(name, **args):
+    """Context manager timing one stage; pass file= or target= to attribute it"""
+    if _trace_path is None:
+        return _NULL_STAGE
+    return _Stage(name, args)
+
+
+def timed(name):
+    """Decorator timing every call of a function as the given stage"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if _trace_path is None:
+                return func(*args, **kwargs)
+            with _Stage(name, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def flush():
+    """Hand events recorded in a worker process over to the main process"""
+    if _trace_path is None or os.getpid() == _owner_pid or not _events:
+        return
+    os.makedirs(_parts_dir(), exist_ok=True)
+    with open(os.path.join(_parts_dir(), f"{os.getpid()}.jsonl"), "a") as f:
+        for event in _events:
+            f.write(json.dumps(event, default=str) + "\n")
+    _events.clear()
+
+
+def _forked():
+    # Events recorded before the fork belong to the parent
+    _events.clear()
+    _local.targets = []
+
+
+os.register_at_fork(after_in_child=_forked)
+
+
+def _collect():
+    events = list(_events)
+    parts = _parts_dir()
+    if os.path.isdir(parts):
+        for name in sorted(os.listdir(parts)):
+            with open(os.path.join(parts, name)) as f:
+                events.extend(json.loads(line) for line in f if line.strip())
+    return sorted(events, key=lambda e: e["ts"])
+
+
+def _p95(durations):
+    ordered = sorted(durations)
+    return ordered[max(0, -(-len(ordered) * 95 // 100) - 1)]
+
+
+def _table(title, groups):
+    lines = [f"{title:60} {'count':>6} {'total ms':>10} {'p95 ms':>9}"]
+    rows = sorted(groups.items(), key=lambda item: -sum(item[1]))
+    for key, durations in rows:
+        lines.append(f"{key[-60:]:60} {len(durations):6} {sum(durations) / 1000:10.1f} "
+                     f"{_p95(durations) / 1000:9.2f}")
+    return "\n".join(lines)
+
+
+def summary(events):
+    """Return the per-stage and per-output summary tables"""
+    # A task or step that wrote exactly one file is reported as that file
+    files_by_target = {}
+    for event in events:
+        if "file" in event["args"] and event["args"].get("target"):
+            files_by_target.setdefault(event["args"]["target"], set()).add(event["args"]["file"])
+
+    by_stage = {}
+    by_output = {}
+    for event in events:
+        by_stage.setdefault(event["name"], []).append(event["dur"])
+        if event["name"] in ("step", "task"):
+            continue
+        output = event["args"].get("file")
+        if output is None:
+            output = event["args"].get("target") or "(untracked)"
+            files = files_by_target.get(output, ())
+            if len(files) == 1:
+                output = next(iter(files))
+        if os.path.isabs(output):
+            output = os.path.relpath(output)
+        by_output.setdefault(output, []).append(event["dur"])
+    return _table("stage", by_stage) + "\n\n" + _table("output", by_output)
+
+
+def finish():
+    """Write the merged Chrome trace and print the summary (main process only)"""
+    if _trace_path is None or os.getpid() != _owner_pid:
+        return
+    events = _collect()
+    trace = {
+        "traceEvents": [
+            {"name": "process_name", "ph": "M", "pid": pid, "args": {"name": f"render {pid}"}}
+            for pid in sorted({e["pid"] for e in events})
+        ] + events,
+        "displayTimeUnit": "ms",
+    }
+    with open(_trace_path, "w") as f:
+        json.dump(trace, f, default=str)
+    shutil.rmtree(_parts_dir(), ignore_errors=True)
+
+    print(f"\n⏱  Stage timing ({len(events)} events, trace: {_trace_path})")
+    print(summary(events))
+    sys.stdout.flush()
+
+
+if os.environ.get("LINKNODE_TRACE"):
+    enable(os.environ["LINKNODE_TRACE"])
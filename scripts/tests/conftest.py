@@ -0,0 +1,21 @@
+import os
+import sys
+
+import pytest
+
+# The helpers import each other as top-level modules, as the generator scripts do
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def asset_store(tmp_path, monkeypatch):
+    """Point the output store at a scratch directory"""
+    import output_store
+
+    store_dir = tmp_path / ".asset-store"
+    monkeypatch.setattr(output_store, "store_dir", str(store_dir))
+    monkeypatch.setattr(output_store, "blob_dir", str(store_dir / "blobs"))
+    monkeypatch.setattr(output_store, "encoding_dir", str(store_dir / "encodings"))
+    monkeypatch.delenv("LINKNODE_ASSETS_FORCE", raising=False)
+    monkeypatch.delenv("LINKNODE_OUTPUT_LINK", raising=False)
+    return store_dir
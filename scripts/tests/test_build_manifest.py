@@ -0,0 +1,105 @@
+"""Incremental steps: skipped when nothing changed, rebuilt when something did"""
+
+import pytest
+
+import build_manifest
+from build_manifest import BuildManifest, incremental
+
+
+@pytest.fixture
+def manifest(tmp_path, monkeypatch):
+    monkeypatch.delenv("LINKNODE_ASSETS_FORCE", raising=False)
+    manifest = BuildManifest(str(tmp_path / "manifest.json"))
+    monkeypatch.setattr(build_manifest, "_manifest", manifest)
+    return manifest
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "source.txt"
+    path.write_text("linknode")
+    return path
+
+
+def make_step(tmp_path, source, params=None):
+    """A step that upper-cases source into out.txt and counts its runs"""
+    output = tmp_path / "out.txt"
+    runs = []
+
+    @incremental([str(output)], sources=[str(source)], params=params,
+                 on_skip=lambda outputs: "skipped")
+    def step(suffix=""):
+        runs.append(suffix)
+        output.write_text(source.read_text().upper() + suffix)
+        return "built"
+
+    return step, output, runs
+
+
+def test_unchanged_rerun_is_skipped(manifest, tmp_path, source):
+    step, output, runs = make_step(tmp_path, source)
+    assert step() == "built"
+    assert step() == "skipped"
+    assert len(runs) == 1
+    assert output.read_text() == "LINKNODE"
+
+
+def test_edited_source_rebuilds(manifest, tmp_path, source):
+    step, output, runs = make_step(tmp_path, source)
+    step()
+    source.write_text("linknode demo")
+    assert step() == "built"
+    assert output.read_text() == "LINKNODE DEMO"
+    assert step() == "skipped"
+
+
+def test_changed_params_rebuild(manifest, tmp_path, source):
+    make_step(tmp_path, source, params={"size": 48})[0]()
+    step = make_step(tmp_path, source, params={"size": 72})[0]
+    assert step() == "built"
+    assert step() == "skipped"
+
+
+def test_changed_arguments_rebuild(manifest, tmp_path, source):
+    step, output, runs = make_step(tmp_path, source)
+    step("!")
+    assert step("?") == "built"
+    assert output.read_text() == "LINKNODE?"
+
+
+def test_edited_or_deleted_output_rebuilds(manifest, tmp_path, source):
+    step, output, runs = make_step(tmp_path, source)
+    step()
+    output.write_text("edited by hand")
+    assert step() == "built"
+    output.unlink()
+    assert step() == "built"
+    assert len(runs) == 3
+
+
+def test_force_rebuilds(tmp_path, source, monkeypatch):
+    monkeypatch.setenv("LINKNODE_ASSETS_FORCE", "1")
+    monkeypatch.setattr(build_manifest, "_manifest", BuildManifest(str(tmp_path / "manifest.json")))
+    step, _, runs = make_step(tmp_path, source)
+    step()
+    assert step() == "built"
+
+
+def test_skip_survives_a_new_process(manifest, tmp_path, source, monkeypatch):
+    step, _, runs = make_step(tmp_path, source)
+    step()
+    # A later run starts from the manifest on disk
+    monkeypatch.setattr(build_manifest, "_manifest", BuildManifest(manifest.path))
+    assert step() == "skipped"
+
+
+def test_save_keeps_records_from_other_processes(tmp_path):
+    path = str(tmp_path / "manifest.json")
+    first, second = BuildManifest(path), BuildManifest(path)
+    for name, manifest in (("a.txt", first), ("b.txt", second)):
+        output = tmp_path / name
+        output.write_text(name)
+        manifest.record([str(output)], "key-" + name)
+    # The second save must not drop what the first one wrote
+    entries = BuildManifest(path).entries
+    assert {key.rsplit("/", 1)[-1] for key in entries} == {"a.txt", "b.txt"}
@@ -0,0 +1,76 @@
+"""The vectorized gradients against the per-row loops they replaced"""
+
+import numpy as np
+import pytest
+from PIL import Image, ImageDraw
+
+from gradients import linear_gradient
+
+
+def max_diff(a, b):
+    assert a.mode == b.mode and a.size == b.size
+    return int(np.abs(np.asarray(a, dtype=np.int16) - np.asarray(b, dtype=np.int16)).max())
+
+
+def rows_loop(width, height, start, end, mode="RGB"):
+    """create_store_graphics / fix_launcher_icons: one rectangle per row, int() per channel"""
+    img = Image.new(mode, (width, height))
+    draw = ImageDraw.Draw(img)
+    for y in range(height):
+        color = tuple(int(s + (e - s) * y / height) for s, e in zip(start, end))
+        draw.rectangle([(0, y), (width, y + 1)], fill=color)
+    return img
+
+
+def fade_loop(width, height, base):
+    """create_store_graphics screenshots: fade to 70% of the base color"""
+    img = Image.new("RGB", (width, height))
+    draw = ImageDraw.Draw(img)
+    for y in range(height):
+        fade = y / height
+        draw.rectangle([(0, y), (width, y + 1)], fill=tuple(int(c * (1 - fade * 0.3)) for c in base))
+    return img
+
+
+def mask_paste_loop(width, height, start, end):
+    """create_play_store_graphics: end color pasted over start through a row mask"""
+    base = Image.new("RGB", (width, height), start)
+    top = Image.new("RGB", (width, height), end)
+    mask = Image.new("L", (width, height))
+    mask_draw = ImageDraw.Draw(mask)
+    for y in range(height):
+        mask_draw.rectangle([(0, y), (width, y)], fill=int(255 * y / height))
+    base.paste(top, (0, 0), mask)
+    return base
+
+
+def test_feature_graphic_matches_row_loop():
+    old = rows_loop(1024, 500, (99, 102, 241), (147, 51, 217))
+    assert max_diff(linear_gradient(1024, 500, (99, 102, 241), (147, 51, 217)), old) == 0
+
+
+def test_launcher_icon_matches_row_loop():
+    for size in (48, 192, 512):
+        old = rows_loop(size, size, (63, 81, 181, 255), (156, 39, 176, 255), "RGBA")
+        new = linear_gradient(size, size, (63, 81, 181, 255), (156, 39, 176, 255))
+        assert max_diff(new, old) == 0
+
+
+@pytest.mark.parametrize("base", [(0x63, 0x66, 0xF1), (0x10, 0xB9, 0x81), (0xFF, 0xFF, 0xFF)])
+def test_screenshot_fade_matches_row_loop(base):
+    new = linear_gradient(540, 960, base, tuple(c * 0.7 for c in base))
+    assert max_diff(new, fade_loop(540, 960, base)) <= 1
+
+
+@pytest.mark.parametrize("size", [(512, 512), (1024, 500), (1080, 1920)])
+def test_play_store_gradient_matches_mask_paste(size):
+    start, end = (25, 25, 112), (138, 43, 226)  # BACKGROUND_GRADIENT_START, _END
+    new = linear_gradient(*size, start, end)
+    # The mask paste rounds each blended row differently
+    assert max_diff(new, mask_paste_loop(*size, start, end)) <= 1
+
+
+def test_rows_render_a_band_of_the_full_gradient():
+    full = linear_gradient(300, 200, (0, 0, 0), (255, 128, 64), angle=30)
+    band = linear_gradient(300, 200, (0, 0, 0), (255, 128, 64), angle=30, rows=(50, 120))
+    assert max_diff(band, full.crop((0, 50, 300, 120))) == 0
@@ -0,0 +1,83 @@
+"""Grid-indexed neighbor searches agree with brute force"""
+
+import numpy as np
+import pytest
+
+from network_graph import knn_edges, radius_edges
+
+SEEDS = range(40)
+
+
+def point_set(seed):
+    """Points of one of several layouts that stress the grid differently"""
+    rng = np.random.default_rng(seed)
+    count = int(rng.integers(0, 300))
+    layout = seed % 5
+    if layout == 0:
+        return rng.uniform(0, 1000, (count, 2))
+    if layout == 1:
+        # A tight cluster with a few far outliers
+        points = rng.normal(500, 10, (count, 2))
+        points[:count // 20] = rng.uniform(-1e5, 1e5, (count // 20, 2))
+        return points
+    if layout == 2:
+        # Collinear
+        return np.stack([rng.uniform(0, 1000, count), np.full(count, 7.0)], axis=1)
+    if layout == 3:
+        # Integer lattice with duplicates: many tied distances
+        return rng.integers(0, 12, (count, 2)).astype(np.float64)
+    return rng.uniform(0, 1000, (min(count, 6), 2))
+
+
+def squared_distances(points):
+    deltas = points[:, None, :] - points[None, :, :]
+    return np.einsum("ijk,ijk->ij", deltas, deltas)
+
+
+def edge_set(edges):
+    return {tuple(edge) for edge in np.asarray(edges).tolist()}
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+@pytest.mark.parametrize("k", [1, 3, 8])
+def test_knn_matches_brute_force(seed, k):
+    points = point_set(seed)
+    edges = edge_set(knn_edges(points, k))
+    count = len(points)
+    k = min(k, count - 1)
+    if k <= 0:
+        assert not edges
+        return
+
+    distances = squared_distances(points)
+    np.fill_diagonal(distances, np.inf)
+    kth = np.sort(distances, axis=1)[:, k - 1]
+
+    # Each edge is among the k nearest of one of its ends
+    for i, j in edges:
+        assert i < j
+        assert distances[i, j] <= max(kth[i], kth[j])
+    # Each point has k neighbors no farther than its k-th nearest
+    near = [[] for _ in range(count)]
+    for i, j in edges:
+        near[i].append(distances[i, j])
+        near[j].append(distances[i, j])
+    for i in range(count):
+        assert sum(d <= kth[i] for d in near[i]) >= k
+
+    if seed % 5 in (0, 1, 4):
+        # Without ties the brute-force answer is unique
+        nearest = np.argsort(distances, axis=1)[:, :k]
+        sources = np.repeat(np.arange(count), k)
+        targets = nearest.ravel()
+        expected = set(zip(np.minimum(sources, targets).tolist(), np.maximum(sources, targets).tolist()))
+        assert edges == expected
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+@pytest.mark.parametrize("radius", [1.5, 40.0, 250.0])
+def test_radius_matches_brute_force(seed, radius):
+    points = point_set(seed)
+    distances = squared_distances(points)
+    i, j = np.nonzero(np.triu(distances < radius * radius, k=1))
+    assert edge_set(radius_edges(points, radius)) == set(zip(i.tolist(), j.tolist()))
@@ -0,0 +1,181 @@
+"""Output store: identical outputs are left alone, links share intact blobs"""
+
+import os
+import stat
+import time
+
+import pytest
+
+import output_store
+from output_store import (OutputWriter, blob_path, link_file, lookup_encoding, prune, put,
+                          remember_encoding, write_bytes)
+
+DATA = b"linknode " * 1000
+
+
+@pytest.fixture
+def hardlinks(asset_store, monkeypatch):
+    monkeypatch.setenv("LINKNODE_OUTPUT_LINK", "hardlink")
+
+
+@pytest.fixture
+def copies(asset_store, monkeypatch):
+    monkeypatch.setenv("LINKNODE_OUTPUT_LINK", "copy")
+
+
+def fingerprint(path):
+    st = os.stat(path)
+    return st.st_ino, st.st_mtime_ns
+
+
+def blobs(store):
+    return [name for _, _, names in os.walk(store / "blobs") for name in names]
+
+
+def tamper(path):
+    """Overwrite a file in place, as a tool editing a hardlinked output would"""
+    with open(path, "r+b") as f:
+        f.write(b"X")
+
+
+@pytest.mark.parametrize("mode", ["copy", "hardlink", "auto"])
+def test_identical_output_is_not_rewritten(mode, asset_store, tmp_path, monkeypatch):
+    monkeypatch.setenv("LINKNODE_OUTPUT_LINK", mode)
+    path = tmp_path / "out" / "icon.png"
+    digest = write_bytes(str(path), DATA)
+    before = fingerprint(path)
+    time.sleep(0.01)
+    assert write_bytes(str(path), DATA) == digest
+    assert fingerprint(path) == before
+
+
+def test_copy_mode_keeps_no_blobs(copies, asset_store, tmp_path):
+    write_bytes(str(tmp_path / "a.png"), DATA)
+    link_file(str(tmp_path / "a.png"), str(tmp_path / "b.png"))
+    writer = OutputWriter(str(tmp_path / "c.png"))
+    writer.write(DATA)
+    writer.close()
+    assert blobs(asset_store) == []
+    for name in ("a.png", "b.png", "c.png"):
+        assert (tmp_path / name).read_bytes() == DATA
+
+
+def test_hardlinked_outputs_share_one_blob(hardlinks, asset_store, tmp_path):
+    digest = write_bytes(str(tmp_path / "a.png"), DATA)
+    write_bytes(str(tmp_path / "b.png"), DATA)
+    assert blobs(asset_store) == [digest]
+    assert os.path.samefile(tmp_path / "a.png", blob_path(digest))
+    assert os.path.samefile(tmp_path / "b.png", blob_path(digest))
+
+
+@pytest.mark.parametrize("mode", ["copy", "hardlink"])
+def test_put_then_link_file(mode, asset_store, tmp_path, monkeypatch):
+    monkeypatch.setenv("LINKNODE_OUTPUT_LINK", mode)
+    digest = put(DATA)
+    with open(blob_path(digest), "rb") as f:
+        assert f.read() == DATA
+    assert stat.S_IMODE(os.stat(blob_path(digest)).st_mode) & 0o222 == 0
+    source = tmp_path / "made-by-a-tool.png"
+    source.write_bytes(DATA)
+
+    assert link_file(str(source), str(tmp_path / "dest.png")) == digest
+    assert (tmp_path / "dest.png").read_bytes() == DATA
+    assert os.path.samefile(tmp_path / "dest.png", blob_path(digest)) == (mode == "hardlink")
+    # The source is not taken over by the store
+    assert not os.path.samefile(source, tmp_path / "dest.png")
+
+
+def test_corrupted_blob_is_written_again(hardlinks, asset_store, tmp_path):
+    digest = write_bytes(str(tmp_path / "a.png"), DATA)
+    tamper(tmp_path / "a.png")
+    # The output is the blob, so the blob changed too
+    with open(blob_path(digest), "rb") as f:
+        assert f.read() != DATA
+
+    write_bytes(str(tmp_path / "b.png"), DATA)
+    assert (tmp_path / "b.png").read_bytes() == DATA
+    with open(blob_path(digest), "rb") as f:
+        assert f.read() == DATA
+    # The edited output is repaired on its next write, not reused
+    write_bytes(str(tmp_path / "a.png"), DATA)
+    assert (tmp_path / "a.png").read_bytes() == DATA
+
+
+def test_corrupted_output_is_rewritten(copies, tmp_path):
+    path = tmp_path / "a.png"
+    write_bytes(str(path), DATA)
+    tamper(path)
+    write_bytes(str(path), DATA)
+    assert path.read_bytes() == DATA
+
+
+@pytest.mark.parametrize("mode", ["copy", "hardlink"])
+def test_remembered_encoding_needs_unchanged_source(mode, asset_store, tmp_path, monkeypatch):
+    monkeypatch.setenv("LINKNODE_OUTPUT_LINK", mode)
+    path = tmp_path / "icon.png"
+    digest = write_bytes(str(path), DATA)
+    remember_encoding("k" * 64, digest, ".png", str(path))
+    found = lookup_encoding("k" * 64)
+    assert found[:2] == (digest, ".png")
+    with open(found[2], "rb") as f:
+        assert f.read() == DATA
+
+    tamper(found[2])
+    assert lookup_encoding("k" * 64) is None
+    os.remove(found[2])
+    assert lookup_encoding("k" * 64) is None
+
+
+def test_stream_writer_skips_identical_output(copies, tmp_path):
+    path = tmp_path / "big.png"
+    write_bytes(str(path), DATA)
+    before = fingerprint(path)
+    writer = OutputWriter(str(path))
+    for start in range(0, len(DATA), 1000):
+        writer.write(DATA[start:start + 1000])
+    writer.close()
+    assert fingerprint(path) == before
+    assert os.listdir(tmp_path) == ["big.png"]
+
+
+def test_discarded_stream_leaves_nothing(copies, tmp_path):
+    writer = OutputWriter(str(tmp_path / "big.png"))
+    writer.write(DATA)
+    writer.discard()
+    assert os.listdir(tmp_path) == []
+
+
+def test_prune_keeps_referenced_and_new_files(hardlinks, asset_store, tmp_path):
+    kept = write_bytes(str(tmp_path / "kept.png"), DATA)
+    stale = write_bytes(str(tmp_path / "stale.png"), DATA + b"!")
+    remember_encoding("a" * 64, kept, ".png", str(tmp_path / "kept.png"))
+    remember_encoding("b" * 64, stale, ".png", str(tmp_path / "stale.png"))
+
+    assert prune({kept}, before=time.time() - 60) == (0, 0)
+    removed, _ = prune({kept})
+    assert removed == 2
+    assert blobs(asset_store) == [kept]
+    assert lookup_encoding("a" * 64) and lookup_encoding("b" * 64) is None
+    assert sorted(os.listdir(asset_store / "blobs")) == [kept[:2]]
+    # Pruning never touches the outputs themselves
+    assert (tmp_path / "stale.png").read_bytes() == DATA + b"!"
+
+
+def test_prune_without_links_drops_every_blob(hardlinks, asset_store, tmp_path):
+    digest = write_bytes(str(tmp_path / "a.png"), DATA)
+    remember_encoding("a" * 64, digest, ".png", str(tmp_path / "a.png"))
+    prune({digest}, keep_blobs=set())
+    assert blobs(asset_store) == []
+    # The remembered source was the blob, so the entry goes with it
+    assert lookup_encoding("a" * 64) is None
+    assert (tmp_path / "a.png").read_bytes() == DATA
+
+
+def test_put_command_writes_every_destination(copies, tmp_path):
+    source = tmp_path / "tmp.png"
+    source.write_bytes(DATA)
+    destinations = [str(tmp_path / "res" / name) for name in ("ic_launcher.png", "ic_launcher_round.png")]
+    assert output_store.main(["--put", str(source)] + destinations) == 0
+    for path in destinations:
+        with open(path, "rb") as f:
+            assert f.read() == DATA
@@ -0,0 +1,63 @@
+"""Lossless reductions in the PNG encode stage"""
+
+import io
+
+import numpy as np
+import pytest
+from PIL import Image
+
+import png_encode
+from png_encode import encode_png, reduce_lossless
+
+
+def rgba(img):
+    return np.asarray(img.convert("RGBA"))
+
+
+def images():
+    rng = np.random.default_rng(7)
+    palette = rng.integers(0, 256, (200, 4), dtype=np.uint8)
+    gray = rng.integers(0, 256, (40,), dtype=np.uint8)[rng.integers(0, 40, (90, 130))]
+    noise = rng.integers(0, 256, (90, 130, 3), dtype=np.uint8)
+    return {
+        "palette RGBA": Image.fromarray(palette[rng.integers(0, 200, (90, 130))], "RGBA"),
+        "opaque palette": Image.fromarray(np.dstack([palette[rng.integers(0, 200, (90, 130))][:, :, :3],
+                                                     np.full((90, 130), 255, np.uint8)]), "RGBA"),
+        "gray RGB": Image.fromarray(np.dstack([gray] * 3)),
+        "gray with alpha": Image.fromarray(np.dstack([gray, gray, gray, gray[::-1]]), "RGBA"),
+        "full color": Image.fromarray(noise),
+        "full color opaque RGBA": Image.fromarray(noise).convert("RGBA"),
+    }
+
+
+@pytest.mark.parametrize("band_pixels", [1 << 18, 130 * 7, 1])
+@pytest.mark.parametrize("name", list(images()))
+def test_reduction_is_pixel_exact_in_any_band_size(name, band_pixels, monkeypatch):
+    monkeypatch.setattr(png_encode, "REDUCE_BAND_PIXELS", band_pixels)
+    img = images()[name]
+    reduced = reduce_lossless(img)
+    assert np.array_equal(rgba(reduced), rgba(img))
+
+
+def test_reductions_pick_the_smallest_mode():
+    found = {name: reduce_lossless(img).mode for name, img in images().items()}
+    assert found == {
+        "palette RGBA": "P",
+        "opaque palette": "P",
+        "gray RGB": "L",
+        "gray with alpha": "LA",
+        "full color": "RGB",
+        "full color opaque RGBA": "RGB",
+    }
+
+
+def test_fast_is_the_default_mode(monkeypatch):
+    monkeypatch.delenv("LINKNODE_PNG_MODE", raising=False)
+    assert png_encode.encode_mode() == "fast"
+
+
+@pytest.mark.parametrize("mode", ["fast", "release"])
+def test_encoded_pngs_decode_to_the_same_pixels(mode):
+    for img in images().values():
+        with Image.open(io.BytesIO(encode_png(img, mode))) as decoded:
+            assert np.array_equal(rgba(decoded), rgba(img))
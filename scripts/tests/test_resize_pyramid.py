@@ -0,0 +1,35 @@
+"""The resize pyramid's error bound"""
+
+import numpy as np
+from PIL import Image
+
+from resize_pyramid import ResizePyramid, resize_error
+
+
+def noise(size, seed=0):
+    rng = np.random.default_rng(seed)
+    return Image.fromarray(rng.integers(0, 256, (size, size, 4), dtype=np.uint8), "RGBA")
+
+
+def test_reduced_levels_are_checked_by_default():
+    pyramid = ResizePyramid(noise(1024))
+    result = pyramid.resize((48, 48))
+    assert (48, 48) in pyramid.errors
+    direct = pyramid.source.resize((48, 48), Image.Resampling.LANCZOS)
+    assert resize_error(result, direct) <= pyramid.max_error
+
+
+def test_direct_resize_replaces_a_level_over_the_bound():
+    pyramid = ResizePyramid(noise(1024), max_error=0.0)
+    result = pyramid.resize((48, 48))
+    assert pyramid.errors[(48, 48)] > 0
+    direct = pyramid.source.resize((48, 48), Image.Resampling.LANCZOS)
+    assert resize_error(result, direct) == 0
+
+
+def test_each_size_is_checked_once():
+    pyramid = ResizePyramid(noise(1024))
+    first = pyramid.resize((64, 64))
+    pyramid.errors.clear()
+    assert pyramid.resize((64, 64)) is first
+    assert pyramid.errors == {}
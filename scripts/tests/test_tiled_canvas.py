@@ -0,0 +1,93 @@
+"""Banded rendering and streamed PNGs match the whole-canvas render"""
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from font_registry import get_font
+from png_encode import PNGStreamWriter
+from tiled_canvas import TiledCanvas
+
+WIDTH, HEIGHT = 301, 257
+BAND_ROWS = [1, 7, 64, 100, HEIGHT - 1]
+
+
+def sample_canvas(mode="RGB"):
+    """A canvas using every operation, with shapes straddling band edges at float coordinates"""
+    canvas = TiledCanvas(WIDTH, HEIGHT, mode, (0, 0, 0, 0) if mode == "RGBA" else (0, 0, 0))
+    canvas.linear_gradient((30, 30, 30), (60, 60, 90), angle=60)
+    canvas.multi_stop_gradient([(0, (255, 0, 0, 64)), (0.5, (0, 255, 0, 64)), (1, (0, 0, 255, 64))])
+    canvas.rectangles([(0, 0, WIDTH, 20), (10, 15, 40, 130)], fill=(20, 20, 20))
+    canvas.ellipse([50.3, 40.7, 180.9, 201.1], fill=(0, 188, 212))
+    canvas.ellipse((200, 100, 260, 160), fill=(255, 255, 255, 128))
+    canvas.rounded_rectangle([20, 150.5, 280, 240.25], radius=17.5, fill=(255, 255, 255, 20))
+    canvas.line([150, 128, 290.6, 12.3, 30.2, 250.8], fill=(255, 87, 34), width=5)
+    logo = Image.new("RGBA", (40, 90), (255, 0, 255, 255))
+    canvas.paste(logo, (230, 60), Image.linear_gradient("L").resize((40, 90)))
+    font = get_font("sans-bold", 28)
+    canvas.shadowed_text((WIDTH // 2, 120), "Linknode", font, anchor="mm")
+    canvas.text((5, HEIGHT - 30), "band edge", font, fill=(200, 200, 200))
+    return canvas
+
+
+def banded(canvas, rows):
+    return np.concatenate([np.asarray(canvas.render_band(top, min(top + rows, canvas.height)))
+                           for top in range(0, canvas.height, rows)])
+
+
+@pytest.mark.parametrize("mode", ["RGB", "RGBA"])
+@pytest.mark.parametrize("rows", BAND_ROWS)
+def test_bands_match_full_render(mode, rows):
+    canvas = sample_canvas(mode)
+    assert np.array_equal(banded(canvas, rows), np.asarray(canvas.render()))
+
+
+@pytest.mark.parametrize("rows", [1, 64])
+def test_flattened_copies_match(rows):
+    background = sample_canvas()
+    expected = background.copy()
+    expected.text((40, 60), "fr-FR", get_font("sans", 20), fill="white")
+
+    background.flatten()
+    canvas = background.copy()
+    canvas.text((40, 60), "fr-FR", get_font("sans", 20), fill="white")
+    assert np.array_equal(banded(canvas, rows), np.asarray(expected.render()))
+    # Drawing on the copy leaves the shared background alone
+    assert np.array_equal(np.asarray(background.render()), np.asarray(sample_canvas().render()))
+
+
+@pytest.mark.parametrize("mode", ["RGB", "RGBA"])
+@pytest.mark.parametrize("rows", BAND_ROWS)
+def test_streamed_png_decodes_to_full_render(mode, rows, asset_store, tmp_path):
+    canvas = sample_canvas(mode)
+    path = tmp_path / "canvas.png"
+    canvas.save(str(path), rows=rows)
+    with Image.open(path) as decoded:
+        assert decoded.mode == mode
+        assert np.array_equal(np.asarray(decoded), np.asarray(canvas.render()))
+
+
+@pytest.mark.parametrize("mode", ["L", "LA", "RGB", "RGBA"])
+@pytest.mark.parametrize("encode", ["fast", "release"])
+def test_stream_writer_round_trips(mode, encode, asset_store, tmp_path):
+    rng = np.random.default_rng(len(mode))
+    channels = len(mode)
+    pixels = rng.integers(0, 256, (HEIGHT, WIDTH, channels), dtype=np.uint8)
+    # Smooth regions too, so every PNG row filter gets picked
+    pixels[: HEIGHT // 2] = np.arange(WIDTH, dtype=np.uint8)[None, :, None]
+    img = Image.fromarray(pixels.squeeze(axis=2) if channels == 1 else pixels, mode)
+    path = tmp_path / "stream.png"
+    with PNGStreamWriter(str(path), WIDTH, HEIGHT, mode, encode=encode) as writer:
+        for top in range(0, HEIGHT, 50):
+            writer.write(img.crop((0, top, WIDTH, min(top + 50, HEIGHT))))
+    with Image.open(path) as decoded:
+        assert decoded.mode == mode
+        assert np.array_equal(np.asarray(decoded), pixels.squeeze(axis=2) if channels == 1 else pixels)
+
+
+def test_stream_writer_requires_every_row(asset_store, tmp_path):
+    path = tmp_path / "short.png"
+    with pytest.raises(ValueError):
+        with PNGStreamWriter(str(path), WIDTH, HEIGHT) as writer:
+            writer.write(Image.new("RGB", (WIDTH, 10)))
+    assert not path.exists()
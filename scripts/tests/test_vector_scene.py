@@ -0,0 +1,38 @@
+"""Scene colors are checked when a shape or gradient is created"""
+
+import pytest
+
+from vector_scene import Circle, LinearGradient, Line, RadialGradient, Rect, Scene
+
+
+@pytest.mark.parametrize("color", [
+    (255, 255, 260, 255),
+    (-1, 0, 0),
+    (0, 0, 0, 256),
+    (0.5, 0, 0),
+    (0, 0),
+    (0, 0, 0, 0, 0),
+])
+def test_out_of_range_colors_are_rejected(color):
+    with pytest.raises(ValueError):
+        LinearGradient(0, 0, 0, 10, (0, 0, 0), color)
+    with pytest.raises(ValueError):
+        RadialGradient(color, (0, 0, 0))
+    with pytest.raises(ValueError):
+        Rect(0, 0, 10, 10, color)
+    with pytest.raises(ValueError):
+        Circle(5, 5, 5, color)
+    with pytest.raises(ValueError):
+        Line(0, 0, 10, 10, 1, color)
+
+
+def test_valid_colors_serialize_unchanged():
+    scene = Scene(10, 10, [
+        Circle(5, 5, 3, [0, 128, 255]),
+        Line(0, 0, 10, 10, 1, (0, 0, 0, 128)),
+    ])
+    assert scene.shapes[0].fill == (0, 128, 255)
+    drawable = scene.vector_drawable(10, 10)
+    assert 'android:fillColor="#0080FF"' in drawable
+    assert 'android:strokeColor="#80000000"' in drawable
+    assert 'stroke="#000000" stroke-opacity="0.502"' in scene.svg()
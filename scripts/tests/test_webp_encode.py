@@ -0,0 +1,72 @@
+"""WebP output is decoded and checked against the tolerance before use"""
+
+import io
+
+import numpy as np
+import pytest
+from PIL import Image
+
+import webp_encode
+from webp_encode import encode_webp, max_error, verified_webp, webp_tolerance
+
+
+def noisy_icon(seed=0, size=48):
+    rng = np.random.default_rng(seed)
+    pixels = rng.integers(0, 256, (size, size, 4), dtype=np.uint8)
+    pixels[:8, :, 3] = 0
+    return Image.fromarray(pixels, "RGBA")
+
+
+def lossy_webp(img, quality=5):
+    buf = io.BytesIO()
+    img.save(buf, "WEBP", quality=quality)
+    return buf.getvalue()
+
+
+@pytest.mark.parametrize("tolerance", [0, 1, 4, 16])
+def test_encoding_stays_within_tolerance(tolerance):
+    img = noisy_icon(tolerance)
+    data = verified_webp(img, tolerance)
+    assert data is not None
+    assert max_error(img, data) <= tolerance
+
+
+@pytest.mark.parametrize("tolerance", [0, 2, 8])
+def test_out_of_tolerance_output_is_rejected(tolerance, monkeypatch):
+    monkeypatch.setattr(webp_encode, "encode_webp", lambda img, tolerance, fast: lossy_webp(img))
+    img = noisy_icon()
+    assert max_error(img, lossy_webp(img)) > tolerance
+    assert verified_webp(img, tolerance) is None
+
+
+def test_rounding_beyond_tolerance_is_rejected(monkeypatch):
+    # Near-lossless output made for a looser tolerance than the one asked for
+    monkeypatch.setattr(webp_encode, "encode_webp",
+                        lambda img, tolerance, fast: encode_webp(img, tolerance + 3, fast))
+    assert verified_webp(noisy_icon(), 2) is None
+
+
+def test_size_mismatch_is_rejected():
+    img = noisy_icon()
+    assert max_error(img, encode_webp(img.resize((24, 24)))) == 255
+
+
+def test_color_under_transparent_pixels_is_ignored():
+    pixels = np.zeros((16, 16, 4), dtype=np.uint8)
+    pixels[:, :, :3] = 200
+    pixels[:, 8:, 3] = 255
+    img = Image.fromarray(pixels, "RGBA")
+    decoded = pixels.copy()
+    decoded[:, :8, :3] = 0
+    assert max_error(img, encode_webp(Image.fromarray(decoded, "RGBA"))) == 0
+
+
+def test_tolerance_setting(monkeypatch):
+    monkeypatch.delenv("LINKNODE_WEBP_TOLERANCE", raising=False)
+    assert webp_tolerance() == 0
+    monkeypatch.setenv("LINKNODE_WEBP_TOLERANCE", "3")
+    assert webp_tolerance() == 3
+    for value in ("-1", "17", "lossy"):
+        monkeypatch.setenv("LINKNODE_WEBP_TOLERANCE", value)
+        with pytest.raises(ValueError):
+            webp_tolerance()
@@ -0,0 +1,61 @@
+"""
+Pre-rasterized text layers
+
+A string is rasterized once per (text, font, anchor) into an 8-bit coverage
+mask and then stamped wherever it is needed: the shadow and the fill of a
+title are the same mask drawn twice with different colors and offsets. Fonts
+come from font_registry, which shares one face per (file, size), so the font
+object in the key stands for the font file and size.
+
+Stamping a mask blends the fill over the image with its alpha (see
+overlay.py), so translucent text and shadows stay translucent on RGB
+images; with an opaque fill the pixels match drawing the text directly.
+"""
+
+from functools import lru_cache
+
+from PIL import Image, ImageDraw
+
+from overlay import fill_mask
+from stage_timing import timed
+
+# Distinct strings kept rasterized per process
+MAX_CACHED_MASKS = 1024
+
+
+class TextMask:
+    """Coverage mask of one string and where it sits relative to the anchor point"""
+
+    def __init__(self, mask, offset):
+        self.mask = mask
+        self.offset = offset
+
+    def draw(self, img, xy, fill):
+        """Stamp the mask onto img with its anchor point at xy"""
+        x, y = xy
+        dx, dy = self.offset
+        fill_mask(img, self.mask, fill, (x + dx, y + dy))
+
+
+@lru_cache(maxsize=MAX_CACHED_MASKS)
+@timed("text")
+def text_mask(text, font, anchor=None):
+    """Return the shared TextMask for text in font; do not modify it"""
+    left, top, right, bottom = font.getbbox(text, anchor=anchor)
+    mask = Image.new("L", (max(1, right - left), max(1, bottom - top)), 0)
+    ImageDraw.Draw(mask).text((-left, -top), text, font=font, fill=255, anchor=anchor)
+    return TextMask(mask, (left, top))
+
+
+def draw_text(img, xy, text, font, fill, anchor=None):
+    """Draw text like ImageDraw.text, rasterizing each distinct string only once"""
+    text_mask(text, font, anchor).draw(img, (int(xy[0]), int(xy[1])), fill)
+
+
+def draw_shadowed_text(img, xy, text, font, fill="white", shadow=(0, 0, 0, 128),
+                       shadow_offset=(0, 3), anchor=None):
+    """Draw text over a drop shadow using one rasterization for both"""
+    layer = text_mask(text, font, anchor)
+    x, y = int(xy[0]), int(xy[1])
+    layer.draw(img, (x + shadow_offset[0], y + shadow_offset[1]), shadow)
+    layer.draw(img, (x, y), fill)
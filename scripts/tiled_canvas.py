@@ -0,0 +1,164 @@
+"""
+Tile-based rendering for large canvases
+
+A TiledCanvas records drawing operations instead of performing them, then
+replays all of them for one horizontal band of rows at a time. Each band is
+handed straight to the streaming PNG encoder (png_encode.PNGStreamWriter)
+and dropped, so peak memory is bounded by the band size times the layer
+count rather than the full canvas:
+
+    canvas = TiledCanvas(3840, 2160)
+    canvas.linear_gradient((30, 30, 30), (60, 60, 60))
+    canvas.ellipse((100, 100, 300, 300), fill=(255, 255, 255, 128))
+    canvas.text((1920, 400), "Title", font, fill="white", anchor="mm")
+    canvas.save(path)
+
+Bands are PNG-row aligned, so "tile" here means a full-width strip.
+Canvases that share a background (the screenshot matrix draws one per
+locale) record it once and copy() it; flatten() renders the shared part a
+single time when whole images fit in memory anyway.
+save() streams only when LINKNODE_TILE_ROWS is set (see png_encode.py);
+otherwise it renders the canvas in one piece and writes it with save_png,
+pixel for pixel the same as the banded render. Every operation clips itself
+to the band, so results do not depend on the band height.
+"""
+
+from PIL import Image
+
+from gradients import linear_gradient, multi_stop_gradient
+from overlay import fill_mask
+from png_encode import PNGStreamWriter, save_png, tile_rows
+from shapes import ellipse, line, rounded_rectangle
+from stage_timing import stage
+from text_layer import text_mask
+
+
+class TiledCanvas:
+    """A canvas drawn band by band from a recorded list of operations"""
+
+    def __init__(self, width, height, mode="RGB", background=(0, 0, 0)):
+        self.width = width
+        self.height = height
+        self.mode = mode
+        self.background = background
+        self._ops = []
+        # Rendered image of the first _base_ops operations, set by flatten()
+        self._base = None
+        self._base_ops = 0
+
+    # Recording. Each operation is replayed as op(band, top) with band holding
+    # rows top to top + band.height of the canvas.
+
+    def linear_gradient(self, start_color, end_color, angle=90):
+        """Fill the canvas with a linear gradient, as gradients.linear_gradient"""
+        def op(band, top):
+            rows = (top, top + band.height)
+            layer = linear_gradient(self.width, self.height, start_color, end_color, angle, rows=rows)
+            band.paste(layer.convert(band.mode) if layer.mode != band.mode else layer)
+        self._ops.append(op)
+
+    def multi_stop_gradient(self, stops, angle=90):
+        """Fill the canvas with a multi-stop gradient, as gradients.multi_stop_gradient"""
+        def op(band, top):
+            layer = multi_stop_gradient(self.width, self.height, stops, angle, rows=(top, top + band.height))
+            band.paste(layer.convert(band.mode) if layer.mode != band.mode else layer)
+        self._ops.append(op)
+
+    def ellipse(self, box, fill):
+        box = tuple(box)
+        self._ops.append(lambda band, top: ellipse(band, box, fill, origin=(0, top)))
+
+    def rounded_rectangle(self, box, radius, fill):
+        box = tuple(box)
+        self._ops.append(lambda band, top: rounded_rectangle(band, box, radius, fill, origin=(0, top)))
+
+    def line(self, xy, fill, width=1):
+        xy = list(xy)
+        self._ops.append(lambda band, top: line(band, xy, fill, width, origin=(0, top)))
+
+    def rectangles(self, boxes, fill):
+        """Fill inclusive boxes in one layer; overlaps are not blended twice"""
+        boxes = list(boxes)
+
+        def op(band, top):
+            mask = Image.new("L", band.size, 0)
+            for left, upper, right, lower in boxes:
+                upper, lower = max(upper - top, 0), min(lower - top, band.height - 1)
+                if upper <= lower:
+                    mask.paste(255, (left, upper, right + 1, lower + 1))
+            fill_mask(band, mask, fill)
+        self._ops.append(op)
+
+    def paste(self, image, xy, mask=None):
+        """Paste an image (kept in memory, so keep it small) like Image.paste"""
+        x, y = xy
+
+        def op(band, top):
+            upper, lower = max(y, top), min(y + image.height, top + band.height)
+            if upper >= lower:
+                return
+            part = image.crop((0, upper - y, image.width, lower - y))
+            part_mask = mask.crop((0, upper - y, mask.width, lower - y)) if mask is not None else None
+            band.paste(part, (x, upper - top), part_mask)
+        self._ops.append(op)
+
+    def text(self, xy, text, font, fill, anchor=None):
+        """Draw text like text_layer.draw_text"""
+        layer = text_mask(text, font, anchor)
+        x, y = int(xy[0]), int(xy[1])
+        self._ops.append(lambda band, top: layer.draw(band, (x, y - top), fill))
+
+    def shadowed_text(self, xy, text, font, fill="white", shadow=(0, 0, 0, 128),
+                      shadow_offset=(0, 3), anchor=None):
+        """Draw text over a drop shadow like text_layer.draw_shadowed_text"""
+        x, y = int(xy[0]), int(xy[1])
+        self.text((x + shadow_offset[0], y + shadow_offset[1]), text, font, shadow, anchor)
+        self.text((x, y), text, font, fill, anchor)
+
+    # Rendering
+
+    def copy(self):
+        """Return a canvas with the same operations; drawing on one leaves the other alone"""
+        canvas = TiledCanvas(self.width, self.height, self.mode, self.background)
+        canvas._ops = list(self._ops)
+        canvas._base, canvas._base_ops = self._base, self._base_ops
+        return canvas
+
+    def flatten(self):
+        """Render the operations so far once; renders of this canvas and its copies start from it
+
+        This keeps the whole canvas in memory, so only do it when not streaming.
+        """
+        self._base = self.render()
+        self._base_ops = len(self._ops)
+
+    def render_band(self, top, bottom):
+        """Render rows top to bottom of the canvas"""
+        if self._base is not None:
+            band = self._base.crop((0, top, self.width, bottom))
+        else:
+            band = Image.new(self.mode, (self.width, bottom - top), self.background)
+        for op in self._ops[self._base_ops:]:
+            op(band, top)
+        return band
+
+    def render(self):
+        """Render the whole canvas as one image"""
+        return self.render_band(0, self.height)
+
+    def streams(self, rows=None):
+        """True if save() writes this canvas band by band"""
+        rows = tile_rows() if rows is None else rows
+        return 0 < rows < self.height
+
+    def save(self, path, rows=None):
+        """Write the canvas as a PNG, streaming rows at a time if tiling is on"""
+        rows = tile_rows() if rows is None else rows
+        if not self.streams(rows):
+            save_png(self.render(), path)
+            return
+        with PNGStreamWriter(path, self.width, self.height, self.mode) as writer:
+            for top in range(0, self.height, rows):
+                with stage("tile", file=path):
+                    band = self.render_band(top, min(top + rows, self.height))
+                writer.write(band)
@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+"""
+Validate generated assets against Android and Play Console rules
+
+Walks android/app/src/main/res, fastlane/metadata and store_graphics and
+checks every image against the rule for where it lives: launcher icon sizes
+per density, the 512x512 32-bit Play icon, the 1024x500 feature graphic,
+screenshot sides and aspect ratio, file-size limits, and that the bytes
+really are the format the extension claims. Resource directories are also
+checked for names aapt rejects, for one resource shipped as both .png and
+.webp, and for launcher icons missing from some densities.
+
+Only image headers are read, never pixel data: the PNG IHDR (and the chunk
+headers before IDAT, to see a tRNS), the WebP VP8/VP8L/VP8X header, or the
+JPEG segments up to the frame header. Files are read on a thread pool, and
+the whole tree takes a few milliseconds. Only the standard library is used,
+so CI can run it without Pillow.
+
+The exit status is 1 when any problem is found, so it can gate a commit.
+
+Usage:
+    python scripts/validate_assets.py                   # check and print problems
+    python scripts/validate_assets.py --report out.json # also write a JSON report
+    python scripts/validate_assets.py store_graphics    # check only some paths
+"""
+
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import fnmatch
+import json
+import os
+import re
+import struct
+import sys
+import time
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+res_dir = os.path.join("android", "app", "src", "main", "res")
+
+# Trees scanned by default, relative to the project root
+SCAN_ROOTS = [res_dir, os.path.join("fastlane", "metadata"), "store_graphics"]
+
+IMAGE_EXTENSIONS = {".png": "png", ".webp": "webp", ".jpg": "jpeg", ".jpeg": "jpeg"}
+
+# Density scale factors for mipmap and drawable qualifiers
+DENSITY_SCALE = {"ldpi": 0.75, "mdpi": 1, "hdpi": 1.5, "xhdpi": 2, "xxhdpi": 3, "xxxhdpi": 4}
+
+# Launcher icon sizes in dp: legacy icons and adaptive icon layers
+LAUNCHER_DP = 48
+ADAPTIVE_LAYER_DP = 108
+
+# Resource file names aapt accepts (before the extension)
+RESOURCE_NAME = re.compile(r"[a-z0-9_]+\Z")
+
+MB = 1024 * 1024
+
+# Play Console listing graphics
+PLAY_ICON = {"name": "Play Store icon", "size": (512, 512), "formats": ("png",), "alpha": True,
+             "max_bytes": 1 * MB}
+FEATURE_GRAPHIC = {"name": "feature graphic", "size": (1024, 500), "formats": ("png", "jpeg"),
+                   "alpha": False, "max_bytes": 15 * MB}
+PROMO_GRAPHIC = {"name": "promo graphic", "size": (180, 120), "formats": ("png", "jpeg"),
+                 "alpha": False, "max_bytes": 15 * MB}
+TV_BANNER = {"name": "TV banner", "size": (1280, 720), "formats": ("png", "jpeg"),
+             "alpha": False, "max_bytes": 15 * MB}
+SCREENSHOT = {"name": "screenshot", "min_side": 320, "max_side": 3840, "max_aspect": 2,
+              "formats": ("png", "jpeg"), "alpha": False, "max_bytes": 8 * MB}
+
+# Listing rules by path pattern (relative, "/"-separated); the first match wins
+LISTING_RULES = [
+    ("fastlane/metadata/android/*/images/icon.*", PLAY_ICON),
+    ("fastlane/metadata/android/*/images/featureGraphic.*", FEATURE_GRAPHIC),
+    ("fastlane/metadata/android/*/images/promoGraphic.*", PROMO_GRAPHIC),
+    ("fastlane/metadata/android/*/images/tvBanner.*", TV_BANNER),
+    ("fastlane/metadata/android/*/images/*Screenshots/*", SCREENSHOT),
+    ("store_graphics/app_icon_512.*", PLAY_ICON),
+    ("store_graphics/feature_graphic.*", FEATURE_GRAPHIC),
+    ("store_graphics/screenshot_*", SCREENSHOT),
+    ("android/app/src/main/res/drawable*/ic_launcher_512.*", {"name": "512px icon", "size": (512, 512)}),
+]
+
+
+class HeaderError(Exception):
+    """An image header could not be parsed"""
+
+
+# Header readers. Each returns (format, width, height, has_alpha, details).
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+PNG_COLOR_NAMES = {0: "L", 2: "RGB", 3: "P", 4: "LA", 6: "RGBA"}
+
+
+def _png_header(f):
+    data = f.read(33)
+    if len(data) < 33 or data[12:16] != b"IHDR":
+        raise HeaderError("truncated PNG header")
+    width, height, depth, color_type = struct.unpack(">IIBB", data[16:26])
+    if color_type not in PNG_COLOR_NAMES:
+        raise HeaderError(f"unknown PNG color type {color_type}")
+    has_alpha = color_type in (4, 6)
+    if color_type in (0, 2, 3):
+        # Transparency for these types is a tRNS chunk, which comes before IDAT
+        while True:
+            chunk = f.read(8)
+            if len(chunk) < 8:
+                raise HeaderError("PNG ends before its image data")
+            length, kind = struct.unpack(">I4s", chunk)
+            if kind in (b"IDAT", b"IEND"):
+                break
+            if kind == b"tRNS":
+                has_alpha = True
+                break
+            f.seek(length + 4, os.SEEK_CUR)
+    details = {"bit_depth": depth, "color_type": PNG_COLOR_NAMES[color_type]}
+    return "png", width, height, has_alpha, details
+
+
+def _webp_header(f):
+    data = f.read(30)
+    if len(data) < 30:
+        raise HeaderError("truncated WebP header")
+    kind = data[12:16]
+    if kind == b"VP8X":
+        flags = data[20]
+        width = 1 + int.from_bytes(data[24:27], "little")
+        height = 1 + int.from_bytes(data[27:30], "little")
+        return "webp", width, height, bool(flags & 0x10), {"encoding": "extended"}
+    if kind == b"VP8L":
+        if data[20] != 0x2F:
+            raise HeaderError("bad VP8L signature")
+        bits = int.from_bytes(data[21:25], "little")
+        width = 1 + (bits & 0x3FFF)
+        height = 1 + ((bits >> 14) & 0x3FFF)
+        return "webp", width, height, bool(bits >> 28 & 1), {"encoding": "lossless"}
+    if kind == b"VP8 ":
+        if data[23:26] != b"\x9d\x01\x2a":
+            raise HeaderError("bad VP8 start code")
+        width, height = struct.unpack("<HH", data[26:30])
+        return "webp", width & 0x3FFF, height & 0x3FFF, False, {"encoding": "lossy"}
+    raise HeaderError(f"unknown WebP chunk {kind!r}")
+
+
+# JPEG start-of-frame markers (C4, C8 and CC are other segments)
+JPEG_SOF = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+def _jpeg_header(f):
+    f.seek(2)
+    while True:
+        marker = f.read(2)
+        if len(marker) < 2 or marker[0] != 0xFF:
+            raise HeaderError("JPEG has no frame header")
+        if marker[1] == 0xFF:
+            # Fill byte before a marker
+            f.seek(-1, os.SEEK_CUR)
+            continue
+        if marker[1] in (0x01, *range(0xD0, 0xD8)):
+            continue
+        length_bytes = f.read(2)
+        if len(length_bytes) < 2:
+            raise HeaderError("truncated JPEG segment")
+        (length,) = struct.unpack(">H", length_bytes)
+        if marker[1] in JPEG_SOF:
+            data = f.read(6)
+            if len(data) < 6:
+                raise HeaderError("truncated JPEG frame header")
+            precision, height, width, components = struct.unpack(">BHHB", data)
+            return "jpeg", width, height, False, {"bit_depth": precision, "components": components}
+        f.seek(length - 2, os.SEEK_CUR)
+
+
+def read_header(path):
+    """Return (format, width, height, has_alpha, details) from an image's header"""
+    with open(path, "rb") as f:
+        magic = f.read(12)
+        f.seek(0)
+        if magic.startswith(PNG_SIGNATURE):
+            return _png_header(f)
+        if magic[:4] == b"RIFF" and magic[8:12] == b"WEBP":
+            return _webp_header(f)
+        if magic.startswith(b"\xff\xd8"):
+            return _jpeg_header(f)
+    raise HeaderError("not a PNG, WebP or JPEG file")
+
+
+# Rules
+
+def _resource_dir(rel):
+    """(type, qualifiers) of the res/ directory rel is in, or None outside res/"""
+    parts = rel.split("/")
+    res_parts = res_dir.replace(os.sep, "/").split("/")
+    if parts[:len(res_parts)] != res_parts or len(parts) != len(res_parts) + 2:
+        return None
+    kind, *qualifiers = parts[len(res_parts)].split("-")
+    return kind, qualifiers
+
+
+def _density(qualifiers):
+    return next((q for q in qualifiers if q in DENSITY_SCALE), None)
+
+
+def rule_for(rel):
+    """The size and format rule for the image at rel, or None for header checks only"""
+    for pattern, rule in LISTING_RULES:
+        if fnmatch.fnmatchcase(rel, pattern):
+            return rule
+
+    resource = _resource_dir(rel)
+    if resource and resource[0] == "mipmap":
+        density = _density(resource[1])
+        if density:
+            name = os.path.splitext(os.path.basename(rel))[0]
+            layer = name.endswith(("_foreground", "_background", "_monochrome"))
+            dp = ADAPTIVE_LAYER_DP if layer else LAUNCHER_DP
+            side = round(dp * DENSITY_SCALE[density])
+            kind = "adaptive icon layer" if layer else "launcher icon"
+            return {"name": f"{density} {kind}", "size": (side, side)}
+    return None
+
+
+def check_image(rel, header, size_bytes):
+    """Problems with one image, given its header"""
+    fmt, width, height, has_alpha, details = header
+    problems = []
+
+    expected = IMAGE_EXTENSIONS[os.path.splitext(rel)[1].lower()]
+    if fmt != expected:
+        problems.append(f"file extension says {expected} but the content is {fmt}")
+
+    rule = rule_for(rel)
+    if rule is None:
+        return problems
+    name = rule["name"]
+
+    if "size" in rule and (width, height) != rule["size"]:
+        problems.append(f"{name} must be {rule['size'][0]}x{rule['size'][1]}, not {width}x{height}")
+    if "min_side" in rule:
+        short, long = sorted((width, height))
+        if short < rule["min_side"]:
+            problems.append(f"{name} sides must be at least {rule['min_side']}px, not {short}px")
+        if long > rule["max_side"]:
+            problems.append(f"{name} sides must be at most {rule['max_side']}px, not {long}px")
+        if long > short * rule["max_aspect"]:
+            problems.append(f"{name} long side must be at most {rule['max_aspect']}x the short side "
+                            f"({width}x{height})")
+
+    if fmt not in rule.get("formats", (fmt,)):
+        problems.append(f"{name} must be {' or '.join(f.upper() for f in rule['formats'])}, not {fmt.upper()}")
+    if rule.get("alpha") is True and not (fmt == "png" and details["color_type"] == "RGBA"
+                                          and details["bit_depth"] == 8):
+        kind = f"{details.get('bit_depth')}-bit {details.get('color_type')}" if fmt == "png" else fmt.upper()
+        problems.append(f"{name} must be a 32-bit RGBA PNG, not {kind}")
+    if rule.get("alpha") is False and has_alpha:
+        problems.append(f"{name} must not have an alpha channel")
+
+    if "max_bytes" in rule and size_bytes > rule["max_bytes"]:
+        problems.append(f"{name} must be at most {rule['max_bytes'] // 1024} KB, not {size_bytes // 1024} KB")
+    return problems
+
+
+def check_file(rel):
+    """Report entry for one file"""
+    path = os.path.join(project_root, rel)
+    size_bytes = os.path.getsize(path)
+    entry = {"path": rel, "bytes": size_bytes, "problems": []}
+
+    resource = _resource_dir(rel)
+    if resource and resource[0] != "values":
+        base = os.path.basename(rel).split(".")[0]
+        if not RESOURCE_NAME.match(base):
+            entry["problems"].append(f"resource name {base!r} may only contain a-z, 0-9 and _")
+
+    if os.path.splitext(rel)[1].lower() not in IMAGE_EXTENSIONS:
+        return entry
+
+    try:
+        header = read_header(path)
+    except (HeaderError, OSError) as e:
+        entry["problems"].append(f"unreadable image header: {e}")
+        return entry
+    fmt, width, height, has_alpha, details = header
+    entry.update(format=fmt, width=width, height=height, alpha=has_alpha, **details)
+    entry["problems"].extend(check_image(rel, header, size_bytes))
+    return entry
+
+
+def check_resource_sets(rels):
+    """Problems that span files: duplicate resources and launcher icons missing from a density"""
+    problems = []
+    by_dir = {}
+    for rel in rels:
+        if _resource_dir(rel):
+            directory, filename = rel.rsplit("/", 1)
+            by_dir.setdefault(directory, []).append(filename)
+
+    # One resource name may only have one file per directory
+    for directory, filenames in sorted(by_dir.items()):
+        names = {}
+        for filename in filenames:
+            names.setdefault(filename.split(".")[0], []).append(filename)
+        for name, files in sorted(names.items()):
+            if len(files) > 1:
+                problems.append({"path": directory,
+                                 "problem": f"duplicate resource {name}: {', '.join(sorted(files))}"})
+
+    # Every density that has launcher icons should have the same set
+    densities = {}
+    for directory, filenames in by_dir.items():
+        kind, qualifiers = _resource_dir(f"{directory}/x")
+        if kind == "mipmap" and _density(qualifiers):
+            densities[directory] = {filename.split(".")[0] for filename in filenames}
+    everything = set().union(*densities.values()) if densities else set()
+    for directory, names in sorted(densities.items()):
+        for name in sorted(everything - names):
+            problems.append({"path": directory, "problem": f"{name} is missing from this density"})
+    return problems
+
+
+def collect(paths):
+    """Relative paths of every file under paths"""
+    rels = []
+    for path in paths:
+        full = os.path.join(project_root, path)
+        if os.path.isfile(full):
+            rels.append(os.path.relpath(full, project_root))
+            continue
+        for dirpath, dirnames, filenames in os.walk(full):
+            dirnames.sort()
+            rels.extend(os.path.relpath(os.path.join(dirpath, name), project_root) for name in sorted(filenames))
+    return [rel.replace(os.sep, "/") for rel in rels]
+
+
+def validate(paths=SCAN_ROOTS, workers=None):
+    """Check every file under paths and return the report"""
+    start = time.perf_counter()
+    rels = collect(paths)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        files = list(pool.map(check_file, rels))
+
+    problems = [{"path": entry["path"], "problem": problem} for entry in files for problem in entry["problems"]]
+    problems.extend(check_resource_sets(rels))
+    return {
+        "roots": [path.replace(os.sep, "/") for path in paths],
+        "files": files,
+        "problems": problems,
+        "summary": {
+            "files": len(files),
+            "images": sum(1 for entry in files if "format" in entry),
+            "problems": len(problems),
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 2),
+        },
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Validate Linknode assets against Android and Play Console rules")
+    parser.add_argument("paths", nargs="*", help="files or directories to check, relative to the project root "
+                                                 "(default: res/, fastlane/metadata and store_graphics)")
+    parser.add_argument("--report", metavar="FILE", help="write the full report as JSON")
+    parser.add_argument("--workers", type=int, help="reader threads (default: chosen by the thread pool)")
+    args = parser.parse_args(argv)
+
+    report = validate(args.paths or SCAN_ROOTS, args.workers)
+
+    if args.report:
+        os.makedirs(os.path.dirname(os.path.abspath(args.report)), exist_ok=True)
+        with open(args.report, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+            f.write("\n")
+
+    summary = report["summary"]
+    if report["problems"]:
+        print(f"❌ {summary['problems']} problem(s) in {summary['files']} files:")
+        for problem in report["problems"]:
+            print(f"  {problem['path']}: {problem['problem']}")
+        return 1
+    print(f"✅ {summary['files']} files ({summary['images']} images) valid in {summary['elapsed_ms']:.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
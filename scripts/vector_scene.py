@@ -0,0 +1,259 @@
+"""
+Resolution-independent icon geometry
+
+A Scene is an ordered list of rectangles, circles and lines in a viewport
+coordinate space, filled with solid colors or linear/radial gradients. The
+same scene rasterizes through gradients and shapes, or serializes to an
+Android VectorDrawable or an SVG file, so the vector and PNG versions of an
+icon are drawn from one description and cannot drift apart.
+
+Coordinates are continuous: pixel i of a raster spans [i, i + 1], so a
+circle centered on (10, 10) covers the pixels 0-19 when its radius is 10.
+Colors are RGB or RGBA tuples of integers 0-255; anything else raises
+ValueError when the shape or gradient is created.
+"""
+
+from PIL import Image
+
+from gradients import linear_gradient, radial_gradient
+from shapes import circle, line
+
+
+class LinearGradient:
+    """Gradient from start_color at (x1, y1) to end_color at (x2, y2)"""
+
+    def __init__(self, x1, y1, x2, y2, start_color, end_color):
+        self.start = (x1, y1)
+        self.end = (x2, y2)
+        self.start_color = _color(start_color)
+        self.end_color = _color(end_color)
+
+
+class RadialGradient:
+    """Gradient from center_color at the shape's center to edge_color at its rim"""
+
+    def __init__(self, center_color, edge_color):
+        self.center_color = _color(center_color)
+        self.edge_color = _color(edge_color)
+
+
+class Rect:
+    def __init__(self, x, y, width, height, fill):
+        self.x, self.y, self.width, self.height = x, y, width, height
+        self.fill = _fill(fill)
+
+
+class Circle:
+    def __init__(self, cx, cy, radius, fill):
+        self.cx, self.cy, self.radius = cx, cy, radius
+        self.fill = _fill(fill)
+
+
+class Line:
+    """Straight stroke with butt caps"""
+
+    def __init__(self, x1, y1, x2, y2, width, color):
+        self.x1, self.y1, self.x2, self.y2 = x1, y1, x2, y2
+        self.width = width
+        self.color = _color(color)
+
+
+class Scene:
+    """Shapes drawn in order over a transparent width x height viewport"""
+
+    def __init__(self, width, height, shapes=()):
+        self.width = width
+        self.height = height
+        self.shapes = list(shapes)
+
+    def add(self, shape):
+        self.shapes.append(shape)
+        return shape
+
+    def render(self):
+        """Rasterize the scene to an RGBA image one pixel per viewport unit"""
+        img = Image.new("RGBA", (self.width, self.height), (0, 0, 0, 0))
+        for shape in self.shapes:
+            _render_shape(img, shape)
+        return img
+
+    def vector_drawable(self, width_dp, height_dp):
+        """Return the scene as Android VectorDrawable XML"""
+        body = "\n".join(_vector_drawable_path(shape) for shape in self.shapes)
+        return f"""<?xml version="1.0" encoding="utf-8"?>
+<vector xmlns:android="http://schemas.android.com/apk/res/android"
+    xmlns:aapt="http://schemas.android.com/aapt"
+    android:width="{_num(width_dp)}dp"
+    android:height="{_num(height_dp)}dp"
+    android:viewportWidth="{_num(self.width)}"
+    android:viewportHeight="{_num(self.height)}">
+{body}
+</vector>
+"""
+
+    def svg(self):
+        """Return the scene as a standalone SVG document"""
+        defs = []
+        elements = []
+        for index, shape in enumerate(self.shapes):
+            elements.append(_svg_element(shape, f"g{index}", defs))
+        defs_block = "  <defs>\n" + "\n".join(defs) + "\n  </defs>\n" if defs else ""
+        body = "\n".join(elements)
+        return f"""<?xml version="1.0" encoding="utf-8"?>
+<svg xmlns="http://www.w3.org/2000/svg" width="{_num(self.width)}" height="{_num(self.height)}" viewBox="0 0 {_num(self.width)} {_num(self.height)}">
+{defs_block}{body}
+</svg>
+"""
+
+
+def _num(value):
+    """Format a coordinate compactly: 54, 10.5, 0.333"""
+    text = f"{value:.3f}".rstrip("0").rstrip(".")
+    return "0" if text == "-0" else text
+
+
+def _color(color):
+    """Return color as a tuple, or raise ValueError if it is not RGB/RGBA in 0-255"""
+    color = tuple(color)
+    if len(color) not in (3, 4) or not all(
+            isinstance(c, int) and not isinstance(c, bool) and 0 <= c <= 255 for c in color):
+        raise ValueError(f"color must be 3 or 4 integers in 0-255, not {color!r}")
+    return color
+
+
+def _fill(fill):
+    if isinstance(fill, (LinearGradient, RadialGradient)):
+        return fill
+    return _color(fill)
+
+
+def _hex_argb(color):
+    """#AARRGGBB as used by Android resources"""
+    r, g, b, a = (color + (255,))[:4]
+    if a == 255:
+        return f"#{r:02X}{g:02X}{b:02X}"
+    return f"#{a:02X}{r:02X}{g:02X}{b:02X}"
+
+
+def _svg_color(color):
+    """(fill, opacity attribute) for an SVG color"""
+    r, g, b, a = (color + (255,))[:4]
+    opacity = "" if a == 255 else f' fill-opacity="{_num(a / 255)}"'
+    return f"#{r:02X}{g:02X}{b:02X}", opacity
+
+
+def _render_shape(img, shape):
+    if isinstance(shape, Rect):
+        x0, y0 = int(shape.x), int(shape.y)
+        width, height = int(shape.width), int(shape.height)
+        if isinstance(shape.fill, LinearGradient):
+            fill = shape.fill
+            if fill.start[0] != fill.end[0]:
+                raise ValueError("only top-to-bottom linear gradients are rasterized")
+            layer = linear_gradient(width, height, fill.start_color, fill.end_color)
+        else:
+            layer = Image.new("RGBA", (width, height), shape.fill)
+        img.alpha_composite(layer.convert("RGBA"), dest=(x0, y0))
+    elif isinstance(shape, Circle):
+        if isinstance(shape.fill, RadialGradient):
+            # Render the gradient on the circle's bounding box, then composite it
+            x0, y0 = int(shape.cx - shape.radius), int(shape.cy - shape.radius)
+            size = int(round(2 * shape.radius)) + 1
+            layer = radial_gradient(size, size, shape.fill.center_color, shape.fill.edge_color,
+                                    center=(shape.cx - x0, shape.cy - y0), radius=shape.radius,
+                                    clip=True)
+            img.alpha_composite(layer, dest=(x0, y0))
+        else:
+            circle(img, (shape.cx, shape.cy), shape.radius, shape.fill)
+    elif isinstance(shape, Line):
+        # shapes.line takes pixel-center end points
+        line(img, [(shape.x1 - 0.5, shape.y1 - 0.5), (shape.x2 - 0.5, shape.y2 - 0.5)],
+             fill=shape.color, width=shape.width)
+    else:
+        raise TypeError(f"unsupported shape {shape!r}")
+
+
+def _path_data(shape):
+    if isinstance(shape, Rect):
+        return (f"M{_num(shape.x)},{_num(shape.y)}h{_num(shape.width)}"
+                f"v{_num(shape.height)}h{_num(-shape.width)}z")
+    if isinstance(shape, Circle):
+        r = shape.radius
+        return (f"M{_num(shape.cx - r)},{_num(shape.cy)}"
+                f"a{_num(r)},{_num(r)} 0 1,0 {_num(2 * r)},0"
+                f"a{_num(r)},{_num(r)} 0 1,0 {_num(-2 * r)},0z")
+    return f"M{_num(shape.x1)},{_num(shape.y1)}L{_num(shape.x2)},{_num(shape.y2)}"
+
+
+def _vector_drawable_path(shape):
+    data = _path_data(shape)
+    if isinstance(shape, Line):
+        return (f'    <path\n        android:pathData="{data}"\n'
+                f'        android:strokeColor="{_hex_argb(shape.color)}"\n'
+                f'        android:strokeWidth="{_num(shape.width)}"\n'
+                f'        android:strokeLineCap="butt" />')
+
+    fill = shape.fill
+    if isinstance(fill, RadialGradient):
+        gradient = (f'android:type="radial"\n'
+                    f'                android:centerX="{_num(shape.cx)}"\n'
+                    f'                android:centerY="{_num(shape.cy)}"\n'
+                    f'                android:gradientRadius="{_num(shape.radius)}"\n'
+                    f'                android:startColor="{_hex_argb(fill.center_color)}"\n'
+                    f'                android:endColor="{_hex_argb(fill.edge_color)}"')
+    elif isinstance(fill, LinearGradient):
+        gradient = (f'android:type="linear"\n'
+                    f'                android:startX="{_num(fill.start[0])}"\n'
+                    f'                android:startY="{_num(fill.start[1])}"\n'
+                    f'                android:endX="{_num(fill.end[0])}"\n'
+                    f'                android:endY="{_num(fill.end[1])}"\n'
+                    f'                android:startColor="{_hex_argb(fill.start_color)}"\n'
+                    f'                android:endColor="{_hex_argb(fill.end_color)}"')
+    else:
+        return (f'    <path\n        android:pathData="{data}"\n'
+                f'        android:fillColor="{_hex_argb(fill)}" />')
+
+    return (f'    <path android:pathData="{data}">\n'
+            f'        <aapt:attr name="android:fillColor">\n'
+            f'            <gradient\n'
+            f'                {gradient} />\n'
+            f'        </aapt:attr>\n'
+            f'    </path>')
+
+
+def _svg_element(shape, gradient_id, defs):
+    if isinstance(shape, Line):
+        color, opacity = _svg_color(shape.color)
+        opacity = opacity.replace("fill-opacity", "stroke-opacity")
+        return (f'  <line x1="{_num(shape.x1)}" y1="{_num(shape.y1)}" '
+                f'x2="{_num(shape.x2)}" y2="{_num(shape.y2)}" stroke="{color}"{opacity} '
+                f'stroke-width="{_num(shape.width)}" stroke-linecap="butt"/>')
+
+    fill = shape.fill
+    if isinstance(fill, (RadialGradient, LinearGradient)):
+        start = fill.center_color if isinstance(fill, RadialGradient) else fill.start_color
+        end = fill.edge_color if isinstance(fill, RadialGradient) else fill.end_color
+        stops = []
+        for offset, color in (("0", start), ("1", end)):
+            hex_color, opacity = _svg_color(color)
+            stops.append(f'      <stop offset="{offset}" stop-color="{hex_color}"'
+                         f'{opacity.replace("fill-opacity", "stop-opacity")}/>')
+        if isinstance(fill, RadialGradient):
+            opening = (f'    <radialGradient id="{gradient_id}" gradientUnits="userSpaceOnUse" '
+                       f'cx="{_num(shape.cx)}" cy="{_num(shape.cy)}" r="{_num(shape.radius)}">')
+            closing = "    </radialGradient>"
+        else:
+            opening = (f'    <linearGradient id="{gradient_id}" gradientUnits="userSpaceOnUse" '
+                       f'x1="{_num(fill.start[0])}" y1="{_num(fill.start[1])}" '
+                       f'x2="{_num(fill.end[0])}" y2="{_num(fill.end[1])}">')
+            closing = "    </linearGradient>"
+        defs.append("\n".join([opening] + stops + [closing]))
+        paint = f'fill="url(#{gradient_id})"'
+    else:
+        color, opacity = _svg_color(fill)
+        paint = f'fill="{color}"{opacity}'
+
+    if isinstance(shape, Rect):
+        return (f'  <rect x="{_num(shape.x)}" y="{_num(shape.y)}" width="{_num(shape.width)}" '
+                f'height="{_num(shape.height)}" {paint}/>')
+    return f'  <circle cx="{_num(shape.cx)}" cy="{_num(shape.cy)}" r="{_num(shape.radius)}" {paint}/>'
@@ -0,0 +1,86 @@
+"""
+WebP encoding for Android resource images
+
+Launcher icons and their adaptive layers may ship as WebP since API 18. Two
+settings are supported, chosen with LINKNODE_WEBP_TOLERANCE:
+
+    0     lossless (the default): decodes to exactly the rendered pixels
+    N     near-lossless: color channels are rounded to steps of 2N + 1
+          before lossless encoding, so no channel moves by more than N;
+          alpha is kept exact
+
+Pillow does not expose libwebp's own near-lossless preprocessing, so the
+rounding above stands in for it. Every encoding is decoded again and
+compared with the source before it is used; color under fully transparent
+pixels is not compared, since it is never visible.
+"""
+
+import io
+import os
+
+import numpy as np
+from PIL import Image
+
+# Highest accepted LINKNODE_WEBP_TOLERANCE
+MAX_TOLERANCE = 16
+
+
+def webp_tolerance():
+    """Return the per-channel error allowed by LINKNODE_WEBP_TOLERANCE"""
+    value = os.environ.get("LINKNODE_WEBP_TOLERANCE", "").strip() or "0"
+    try:
+        tolerance = int(value)
+    except ValueError:
+        tolerance = -1
+    if not 0 <= tolerance <= MAX_TOLERANCE:
+        raise ValueError(f"LINKNODE_WEBP_TOLERANCE must be an integer from 0 to {MAX_TOLERANCE}, not {value!r}")
+    return tolerance
+
+
+def _pixels(img):
+    """Return img as an RGBA array"""
+    return np.asarray(img if img.mode == "RGBA" else img.convert("RGBA"))
+
+
+def near_lossless(img, tolerance):
+    """Round color channels so none moves by more than tolerance; alpha is unchanged"""
+    pixels = _pixels(img).copy()
+    step = 2 * tolerance + 1
+    color = pixels[:, :, :3].astype(np.int32)
+    color = np.clip((color + tolerance) // step * step, 0, 255)
+    pixels[:, :, :3] = color.astype(np.uint8)
+    return Image.fromarray(pixels)
+
+
+def encode_webp(img, tolerance=0, fast=False):
+    """Return lossless WebP bytes for img, after near-lossless rounding if tolerance > 0"""
+    if tolerance:
+        img = near_lossless(img, tolerance)
+    elif img.mode not in ("RGB", "RGBA"):
+        img = img.convert("RGBA")
+    buf = io.BytesIO()
+    # For lossless WebP, quality and method are encoder effort
+    img.save(buf, "WEBP", lossless=True, quality=25 if fast else 100, method=0 if fast else 6)
+    return buf.getvalue()
+
+
+def max_error(img, data):
+    """Largest per-channel difference between img and the decoded WebP data"""
+    with Image.open(io.BytesIO(data)) as decoded:
+        decoded = _pixels(decoded).astype(np.int16)
+    source = _pixels(img).astype(np.int16)
+    if decoded.shape != source.shape:
+        return 255
+    diff = np.abs(decoded - source)
+    # Color under fully transparent pixels is invisible and may be discarded
+    hidden = (source[:, :, 3] == 0) & (decoded[:, :, 3] == 0)
+    diff[hidden] = 0
+    return int(diff.max()) if diff.size else 0
+
+
+def verified_webp(img, tolerance=0, fast=False):
+    """Return WebP bytes for img, or None if the decoded result is out of tolerance"""
+    data = encode_webp(img, tolerance, fast)
+    if max_error(img, data) > tolerance:
+        return None
+    return data